@@ -1,12 +1,52 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from src.db import models
-from src.db.database import engine
-from src.api import auth_router, app_admin_router, college_admin_router, branch_admin_router, student_router
+import time
+from contextlib import asynccontextmanager
 
-models.Base.metadata.create_all(bind=engine)
+from src.core import startup
 
-app = FastAPI(title="College Management System")
+with startup.timed_import("fastapi"):
+    from fastapi import FastAPI, Request
+    from fastapi.concurrency import run_in_threadpool
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse
+    from sqlalchemy.exc import OperationalError
+with startup.timed_import("src.core"):
+    from src.core import prometheus_metrics, route_stats
+    from src.core.compression import CompressionMiddleware
+    from src.core.config import settings
+    from src.core.responses import FastJSONResponse
+    from src.core.hashing import HashingQueueFull
+with startup.timed_import("src.db"):
+    from src.db import migrations, replicas
+    from src.db.query_counter import count_queries
+    from src.db.database import engine
+with startup.timed_import("src.api.auth_router"):
+    from src.api import auth_router
+with startup.timed_import("src.api.app_admin_router"):
+    from src.api import app_admin_router
+with startup.timed_import("src.api.college_admin_router"):
+    from src.api import college_admin_router
+with startup.timed_import("src.api.branch_admin_router"):
+    from src.api import branch_admin_router
+with startup.timed_import("src.api.student_router"):
+    from src.api import student_router
+with startup.timed_import("src.api.metrics_router"):
+    from src.api import metrics_router
+
+# Tables are created by `python -m src.db.migrations upgrade`, not at import
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(startup.warm_up, [student_router.PDF_FILE_PATH])
+    yield
+    prometheus_metrics.mark_process_dead()
+
+
+app = FastAPI(
+    title="College Management System",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 # CORS settings
 origins = [
@@ -23,9 +63,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def schema_check_middleware(request: Request, call_next):
+    # Lazy and cached: after the first pass this is one boolean test
+    if not migrations.verified() and request.url.path != "/metrics":
+        try:
+            await run_in_threadpool(migrations.check, engine)
+        except migrations.SchemaOutOfDate as e:
+            return JSONResponse(status_code=503, content={"detail": str(e)})
+        except OperationalError:
+            return JSONResponse(
+                status_code=503, content={"detail": "Database unavailable"}, headers={"Retry-After": "1"}
+            )
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def instrumentation_middleware(request: Request, call_next):
+    prefix = prometheus_metrics.router_prefix(request.url.path)
+    in_flight = prometheus_metrics.http_in_flight.labels(prefix)
+    in_flight.inc()
+    status = 500
+    start = time.perf_counter()
+    try:
+        with count_queries(f"{request.method} {request.url.path}") as counter:
+            response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        in_flight.dec()
+        prometheus_metrics.observe_request(prefix, request.method, status, elapsed)
+
+    # Group by route template so /college-admins/1 and /college-admins/2 share histograms
+    route = request.scope.get("route")
+    route_stats.observe(f"{request.method} {route.path if route else 'unmatched'}", elapsed, counter)
+
+    replicas.remember_write(request, response)
+    response.headers["X-Query-Count"] = str(counter.count)
+    response.headers["Server-Timing"] = (
+        f'db;dur={counter.duration * 1000:.3f};desc="{counter.count} queries, {counter.rows} rows", '
+        f"app;dur={elapsed * 1000:.3f}"
+    )
+    return response
+
+
+# Added last so it is outermost: it sees the final headers and body
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+
+@app.exception_handler(HashingQueueFull)
+async def hashing_queue_full_handler(request: Request, exc: HashingQueueFull):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
 # Routers
 app.include_router(auth_router.router)
 app.include_router(app_admin_router.router)
 app.include_router(college_admin_router.router)
 app.include_router(branch_admin_router.router)
 app.include_router(student_router.router)
+app.include_router(metrics_router.router)
@@ -1,41 +1,42 @@
 # src/api/app_admin_router.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
-from src.db.models import User, UserRole, College, Student, Branch
-from src.db.database import get_db
+from typing import Optional
 from src.db.models import User, UserRole, College
+from src.core.auth import Principal, authorize, get_token_principal, revoke_user_tokens
+from src.db.database import get_db, get_read_db, get_session, async_capable, run_db
+from src.db import replicas, shards
+from src.db.pagination import keyset_page
+from src.db.pool_stats import pool_stats
+from src.core import college_counters, dashboard_snapshot, hashing, principal_cache, route_stats, startup, student_view
 from src.schemas.user_schema import AppAdminRegisterSchema, CollegeAdminCreateSchema
 from src.schemas.college_schema import CollegeCreateSchema
-from passlib.context import CryptContext
+from src.core.hashing import hash_password_async
 
 router = APIRouter(prefix="/app-admin", tags=["App Admin"])
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def get_app_admin(db: Session, app_admin_id: int) -> User:
-    user = db.query(User).filter(User.id == app_admin_id).first()
-    if not user or user.role != UserRole.APP_ADMIN:
-        raise HTTPException(status_code=403, detail="Only App Admin can perform this action")
-    return user
+def get_app_admin(
+    db: Session, app_admin_id: Optional[int], principal: Optional[Principal] = None
+) -> Principal:
+    return authorize(
+        db, UserRole.APP_ADMIN, principal, app_admin_id,
+        "Only App Admin can perform this action",
+    )
 
 
-@router.post("/register")
-def register_app_admin(payload: AppAdminRegisterSchema, db: Session = Depends(get_db)):
+def _check_new_app_admin(db: Session, payload: AppAdminRegisterSchema) -> None:
     existing = db.query(User).filter(User.email == payload.email).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
+
+def _insert_app_admin(db: Session, payload: AppAdminRegisterSchema, password_hash: str) -> dict:
     try:
         user = User(
             email=payload.email,
-            password_hash=hash_password(payload.password),
+            password_hash=password_hash,
             phone=payload.phone,
             role=UserRole.APP_ADMIN,
         )
@@ -49,13 +50,23 @@ def register_app_admin(payload: AppAdminRegisterSchema, db: Session = Depends(ge
     return {"message": "App admin registered", "user_id": user.id}
 
 
+@router.post("/register")
+async def register_app_admin(payload: AppAdminRegisterSchema, db: Session = Depends(get_session)):
+    # Checks and writes run off the event loop; the PBKDF2 hash is awaited
+    # from the hashing pool, so no request thread waits on it
+    await run_db(db, _check_new_app_admin, payload)
+    password_hash = await hash_password_async(payload.password)
+    return await run_db(db, _insert_app_admin, payload, password_hash)
+
+
 @router.post("/colleges")
 def create_college(
     payload: CollegeCreateSchema,
-    app_admin_id: int,
+    app_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
     db: Session = Depends(get_db),
 ):
-    _ = get_app_admin(db, app_admin_id)
+    _ = get_app_admin(db, app_admin_id, principal)
 
     # Duplicate college code check
     existing_college = db.query(College).filter(
@@ -88,13 +99,10 @@ def create_college(
     return {"message": "College created", "college_id": college.id}
 
 
-@router.post("/college-admins")
-def create_college_admin(
-    payload: CollegeAdminCreateSchema,
-    app_admin_id: int,
-    db: Session = Depends(get_db),
-):
-    _ = get_app_admin(db, app_admin_id)
+def _check_new_college_admin(
+    db: Session, payload: CollegeAdminCreateSchema, app_admin_id: Optional[int], principal: Optional[Principal]
+) -> None:
+    _ = get_app_admin(db, app_admin_id, principal)
 
     college = db.query(College).filter(College.id == payload.college_id).first()
     if not college:
@@ -105,10 +113,14 @@ def create_college_admin(
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
+
+def _assign_college_admin(db: Session, payload: CollegeAdminCreateSchema, password_hash: str) -> dict:
+    college = db.query(College).filter(College.id == payload.college_id).first()
+
     try:
         user = User(
             email=payload.email,
-            password_hash=hash_password(payload.password),
+            password_hash=password_hash,
             phone=payload.phone,
             role=UserRole.COLLEGE_ADMIN,
         )
@@ -116,6 +128,7 @@ def create_college_admin(
         db.commit()
         db.refresh(user)
 
+        previous_admin_id = college.college_admin_id
         college.college_admin_id = user.id
         db.commit()
     except IntegrityError:
@@ -124,34 +137,60 @@ def create_college_admin(
             status_code=500, detail="Failed to create college admin"
         )
 
+    principal_cache.invalidate(previous_admin_id, user.id)
+    if previous_admin_id is not None:
+        # Their tokens still carry this scope until they expire
+        revoke_user_tokens(db, previous_admin_id)
+    shards.mirror(db, payload.college_id, college)
+
     return {
         "message": "College admin created and assigned",
         "college_admin_id": user.id,
         "college_id": payload.college_id,
     }
 
+
+@router.post("/college-admins")
+async def create_college_admin(
+    payload: CollegeAdminCreateSchema,
+    app_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_session),
+):
+    await run_db(db, _check_new_college_admin, payload, app_admin_id, principal)
+    password_hash = await hash_password_async(payload.password)
+    return await run_db(db, _assign_college_admin, payload, password_hash)
+
+
 @router.get("/colleges")
-def list_colleges(app_admin_id: int, db: Session = Depends(get_db)):
-    _ = get_app_admin(db, app_admin_id)
-
-    colleges = (
-        db.query(
-            College.id,
-            College.college_name,
-            College.college_code,
-            College.city,
-            College.state,
-            College.phone,
-            College.email,
-            College.college_admin_id,
-            func.count(Student.id).label("total_students"),
-            func.count(Branch.id).label("total_branches")
-        )
-        .outerjoin(Student, Student.college_id == College.id)
-        .outerjoin(Branch, Branch.college_id == College.id)
-        .group_by(College.id)
-        .all()
+@async_capable
+def list_colleges(
+    app_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_read_db),
+):
+    _ = get_app_admin(db, app_admin_id, principal)
+
+    # Counts come from counter columns maintained by the create paths, so
+    # this never touches the student or branch tables
+    query = db.query(
+        College.id,
+        College.college_name,
+        College.college_code,
+        College.city,
+        College.state,
+        College.phone,
+        College.email,
+        College.college_admin_id,
+        College.total_students,
+        College.total_branches,
     )
+    if after is not None:
+        query = query.filter(College.id > after)
+
+    colleges, next_cursor = keyset_page(query.order_by(College.id).limit(limit + 1).all(), limit)
 
     response = []
     for c in colleges:
@@ -167,24 +206,50 @@ def list_colleges(app_admin_id: int, db: Session = Depends(get_db)):
             "college_admin_assigned": True if c.college_admin_id else False
         })
 
-    return {"colleges": response}
+    return {"colleges": response, "next_cursor": next_cursor}
 
 
-@router.get("/college-admins/{college_id}")
-def get_college_admin_info(college_id: int, app_admin_id: int, db: Session = Depends(get_db)):
-    _ = get_app_admin(db, app_admin_id)
+@router.post("/colleges/reconcile-counters")
+def reconcile_college_counters(
+    app_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_db),
+):
+    _ = get_app_admin(db, app_admin_id, principal)
 
-    college = db.query(College).filter(College.id == college_id).first()
+    updated = college_counters.reconcile(db)
+
+    return {"message": "College counters reconciled", "colleges_updated": updated}
+
+
+@router.get("/college-admins/{college_id}")
+@async_capable
+def get_college_admin_info(
+    college_id: int,
+    app_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_read_db),
+):
+    _ = get_app_admin(db, app_admin_id, principal)
+
+    college = db.query(
+        College.id,
+        College.college_name,
+        College.college_code,
+        User.id.label("admin_id"),
+        User.email,
+        User.phone,
+    ).outerjoin(User, User.id == College.college_admin_id)\
+     .filter(College.id == college_id).first()
     if not college:
         raise HTTPException(status_code=404, detail="College not found")
 
     admin_user = None
-    if college.college_admin_id:
-        user = db.query(User).filter(User.id == college.college_admin_id).first()
+    if college.admin_id:
         admin_user = {
-            "admin_id": user.id,
-            "email": user.email,
-            "phone": user.phone
+            "admin_id": college.admin_id,
+            "email": college.email,
+            "phone": college.phone
         }
 
     return {
@@ -193,3 +258,74 @@ def get_college_admin_info(college_id: int, app_admin_id: int, db: Session = Dep
         "college_code": college.college_code,
         "college_admin": admin_user
     }
+
+
+@router.get("/db/pool")
+def get_db_pool_stats(
+    app_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_db),
+):
+    _ = get_app_admin(db, app_admin_id, principal)
+
+    return {"pools": pool_stats(), "replicas": replicas.stats()}
+
+
+@router.get("/db/routes")
+def get_db_route_stats(
+    app_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_db),
+):
+    _ = get_app_admin(db, app_admin_id, principal)
+
+    return {"routes": route_stats.stats()}
+
+
+@router.get("/shards")
+def get_shard_stats(
+    app_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_db),
+):
+    _ = get_app_admin(db, app_admin_id, principal)
+
+    # Colleges and students per shard, counted on every shard in parallel
+    return {"shards": shards.shard_stats(db)}
+
+
+@router.get("/hashing")
+def get_hashing_stats(
+    app_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_db),
+):
+    _ = get_app_admin(db, app_admin_id, principal)
+
+    return {"hashing": hashing.stats()}
+
+
+@router.get("/startup")
+def get_startup_report(
+    app_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_db),
+):
+    _ = get_app_admin(db, app_admin_id, principal)
+
+    return {"startup": startup.report()}
+
+
+@router.get("/cache")
+def get_cache_stats(
+    app_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_db),
+):
+    _ = get_app_admin(db, app_admin_id, principal)
+
+    return {
+        "principal_cache": principal_cache.stats(),
+        "dashboard_snapshot": dashboard_snapshot.stats(),
+        "student_view": student_view.stats(),
+    }
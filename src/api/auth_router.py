@@ -1,47 +1,51 @@
 from fastapi import APIRouter, Depends, HTTPException
 
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials
 
-from passlib.context import CryptContext
+from sqlalchemy.orm import Session
 
 import datetime
- 
-from src.db.database import get_db
 
-from src.db.models import User, UserRole
+from typing import Optional
 
-from src.schemas.auth_schema import LoginSchema, LoginResponse
- 
-router = APIRouter(prefix="/auth", tags=["Auth"])
- 
-pwd_context = CryptContext(
+from src.core.auth import bearer_scheme, create_access_token, decode_access_token, revoke_token
 
-    schemes=["pbkdf2_sha256"],
+from src.core.hashing import verify_password_async
 
-    deprecated="auto"
+from src.db import shards
 
-)
- 
- 
-def verify_password(plain: str, hashed: str) -> bool:
+from src.db.database import get_db, get_session, run_db
 
-    return pwd_context.verify(plain, hashed)
- 
- 
-@router.post("/login", response_model=LoginResponse)
+from src.db.models import User, UserRole, College, Branch, Student
+
+from src.schemas.auth_schema import LoginSchema, LoginResponse
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
 
-def login(payload: LoginSchema, db: Session = Depends(get_db)):
 
-    user = db.query(User).filter(User.email == payload.email).first()
+def _load_login_user(db: Session, email: str):
+    # One projection instead of loading the User and then lazy-loading
+    # user.branch / user.college / user.student
+
+    user = db.query(
+        User.id,
+        User.email,
+        User.role,
+        User.password_hash,
+        College.id.label("admin_college_id"),
+        Branch.id.label("admin_branch_id"),
+        Branch.college_id.label("branch_college_id"),
+        Student.college_id.label("student_college_id"),
+        Student.branch_id.label("student_branch_id"),
+    ).outerjoin(College, College.college_admin_id == User.id)\
+     .outerjoin(Branch, Branch.branch_admin_id == User.id)\
+     .outerjoin(Student, Student.user_id == User.id)\
+     .filter(User.email == email).first()
 
     if not user:
 
-        raise HTTPException(status_code=401, detail="Invalid email or password")
- 
-    if not verify_password(payload.password, user.password_hash):
+        return None
 
-        raise HTTPException(status_code=401, detail="Invalid email or password")
- 
     response_data = {
 
         "user_id": user.id,
@@ -51,27 +55,108 @@ def login(payload: LoginSchema, db: Session = Depends(get_db)):
         "email": user.email,
 
     }
- 
+
     # If Branch Admin → include Branch & College details
 
-    if user.role == UserRole.BRANCH_ADMIN and user.branch:
+    if user.role == UserRole.BRANCH_ADMIN and user.admin_branch_id:
 
-        response_data["branch_id"] = user.branch.id
+        response_data["branch_id"] = user.admin_branch_id
+
+        response_data["college_id"] = user.branch_college_id
 
-        response_data["college_id"] = user.branch.college_id
- 
     # If College Admin → include college_id
 
-    if user.role == UserRole.COLLEGE_ADMIN and user.college:
+    if user.role == UserRole.COLLEGE_ADMIN and user.admin_college_id:
 
-        response_data["college_id"] = user.college.id
- 
-    # Update last login timestamp
+        response_data["college_id"] = user.admin_college_id
+
+    # Students carry their scope in the token too
+
+    if user.role == UserRole.STUDENT:
 
-    user.last_login = datetime.datetime.utcnow()
+        student = (user.student_college_id, user.student_branch_id)
+
+        if student[0] is None:
+
+            # Students of sharded colleges have no row on the primary
+
+            student = shards.find_student(user.id) or student
+
+        if student[1]:
+
+            response_data["college_id"], response_data["branch_id"] = student
+
+    return user.password_hash, response_data
+
+
+def _record_login(db: Session, user_id: int) -> None:
+
+    db.query(User).filter(User.id == user_id).update(
+
+        {User.last_login: datetime.datetime.utcnow()}, synchronize_session=False
+
+    )
 
     db.commit()
- 
+
+
+@router.post("/login", response_model=LoginResponse)
+
+async def login(payload: LoginSchema, db: Session = Depends(get_session)):
+
+    # DB work runs off the event loop and the PBKDF2 check runs in the
+
+    # hashing worker pool, so a login burst does not tie up request threads
+
+    found = await run_db(db, _load_login_user, payload.email)
+
+    if not found:
+
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    password_hash, response_data = found
+
+    if not await verify_password_async(payload.password, password_hash):
+
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    # Update last login timestamp
+
+    await run_db(db, _record_login, response_data["user_id"])
+
+    response_data["access_token"] = create_access_token(
+
+        response_data["user_id"],
+
+        UserRole(response_data["role"]),
+
+        college_id=response_data.get("college_id"),
+
+        branch_id=response_data.get("branch_id"),
+
+    )
+
+    response_data["token_type"] = "bearer"
+
     return response_data
 
- 
\ No newline at end of file
+
+@router.post("/logout")
+
+def logout(
+
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+
+    db: Session = Depends(get_db),
+
+):
+
+    if credentials is None:
+
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    claims = decode_access_token(credentials.credentials)
+
+    revoke_token(db, claims["jti"], datetime.datetime.utcfromtimestamp(claims["exp"]))
+
+    return {"message": "Logged out"}
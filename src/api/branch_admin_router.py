@@ -1,43 +1,51 @@
 # src/api/branch_admin_router.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-
-from src.db.database import get_db
-from src.db.models import User, UserRole, Branch, Course, Student
+from sqlalchemy import func
+from typing import Optional
+import os
+
+from src.core.auth import Principal, authorize, get_token_principal
+from src.db import ids, shards
+from src.db.database import get_db, get_read_db, get_session, async_capable, run_db
+from src.db.pagination import keyset_page
+from src.db.models import User, UserRole, Branch, Course, Student, Material
 from src.schemas.course_schema import CourseCreateSchema
+from src.schemas.material_schema import MaterialCreateSchema
 from src.schemas.student_schema import StudentCreateSchema
-from passlib.context import CryptContext
+from src.core.material_files import resolve_material_path
+from src.core import college_counters, dashboard_snapshot, marks_import, student_import, uploads
+from src.core.hashing import hash_many_async, hash_password_async
 
 router = APIRouter(prefix="/branch-admin", tags=["Branch Admin"])
 
-# Use pbkdf2_sha256 instead of bcrypt for Windows & length safety
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
-
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+def get_branch_admin(
+    db: Session, branch_admin_id: Optional[int], principal: Optional[Principal] = None
+) -> Principal:
+    return authorize(
+        db, UserRole.BRANCH_ADMIN, principal, branch_admin_id,
+        "Only Branch Admin can perform this action",
+    )
 
 
-def get_branch_admin(db: Session, branch_admin_id: int) -> User:
-    user = db.query(User).filter(User.id == branch_admin_id).first()
-    if not user or user.role != UserRole.BRANCH_ADMIN:
-        raise HTTPException(status_code=403, detail="Only Branch Admin can perform this action")
-    return user
+def owns_branch(admin: Principal, branch_id) -> bool:
+    # Schemas type some ids as str, so compare loosely
+    return admin.branch_id is not None and str(admin.branch_id) == str(branch_id)
 
 
 @router.post("/courses")
 def create_course(
     payload: CourseCreateSchema,
-    branch_admin_id: int,
+    branch_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
     db: Session = Depends(get_db),
 ):
-    admin = get_branch_admin(db, branch_admin_id)
+    admin = get_branch_admin(db, branch_admin_id, principal)
 
-    branch = db.query(Branch).filter(Branch.id == payload.branch_id).first()
-    if not branch:
-        raise HTTPException(status_code=404, detail="Branch not found")
-    if branch.branch_admin_id != admin.id:
+    if not owns_branch(admin, payload.branch_id):
         raise HTTPException(status_code=403, detail="You are not admin of this branch")
 
     # Prevent duplicate course for same year & name in same branch
@@ -67,70 +75,82 @@ def create_course(
         db.rollback()
         raise HTTPException(status_code=400, detail="Error inserting course")
 
+    shards.mirror(db, admin.college_id, course)
+
     return {"message": "Course created", "course_id": course.id}
 
 
-@router.post("/students")
-def create_student(
-    payload: StudentCreateSchema,
-    branch_admin_id: int,
-    db: Session = Depends(get_db),
-):
-    admin = get_branch_admin(db, branch_admin_id)
+def _check_new_student(
+    db: Session, payload: StudentCreateSchema, branch_admin_id: Optional[int], principal: Optional[Principal]
+) -> None:
+    admin = get_branch_admin(db, branch_admin_id, principal)
 
-    branch = db.query(Branch).filter(Branch.id == payload.branch_id).first()
-    if not branch:
-        raise HTTPException(status_code=404, detail="Branch not found")
-    if branch.branch_admin_id != admin.id:
+    if not owns_branch(admin, payload.branch_id):
         raise HTTPException(status_code=403, detail="You are not admin of this branch")
+    if payload.college_id != admin.college_id:
+        raise HTTPException(status_code=400, detail="Branch does not belong to this college")
 
     # Duplicate user email check
     existing_user = db.query(User).filter(User.email == payload.email).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # Duplicate roll number in same college check
-    existing_roll = db.query(Student).filter(
-        Student.college_id == payload.college_id,
-        Student.roll_number == payload.roll_number
-    ).first()
-    if existing_roll:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Roll number '{payload.roll_number}' already exists in this college"
-        )
-
-    try:
-        # Create User
-        user = User(
-            email=payload.email,
-            password_hash=hash_password(payload.password),
-            phone=payload.phone,
-            role=UserRole.STUDENT,
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-
-        # Create Student
-        student = Student(
-            user_id=user.id,
-            college_id=payload.college_id,
-            branch_id=payload.branch_id,
-            roll_number=payload.roll_number,
-            first_name=payload.first_name,
-            last_name=payload.last_name,
-            date_of_birth=payload.date_of_birth,
-            gender=payload.gender,
-            current_year=payload.current_year,
-        )
-        db.add(student)
-        db.commit()
-        db.refresh(student)
-
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(status_code=400, detail="Failed to create student")
+    # Student rows live on the college's shard (the primary unless sharded)
+    with shards.session(db, payload.college_id, write=True) as sdb:
+        # Duplicate roll number in same college check
+        existing_roll = sdb.query(Student).filter(
+            Student.college_id == payload.college_id,
+            Student.roll_number == payload.roll_number
+        ).first()
+        if existing_roll:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Roll number '{payload.roll_number}' already exists in this college"
+            )
+
+
+def _insert_student(db: Session, payload: StudentCreateSchema, password_hash: str) -> dict:
+    with shards.session(db, payload.college_id, write=True) as sdb:
+        try:
+            # Create User
+            user = User(
+                email=payload.email,
+                password_hash=password_hash,
+                phone=payload.phone,
+                role=UserRole.STUDENT,
+            )
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+
+            # Create Student, with an id unique across every shard
+            student = Student(
+                id=ids.allocate(db, ids.STUDENT)[0],
+                user_id=user.id,
+                college_id=payload.college_id,
+                branch_id=payload.branch_id,
+                roll_number=payload.roll_number,
+                first_name=payload.first_name,
+                last_name=payload.last_name,
+                date_of_birth=payload.date_of_birth,
+                gender=payload.gender,
+                current_year=payload.current_year,
+            )
+            sdb.add(student)
+            college_counters.increment(db, payload.college_id, students=1)
+            dashboard_snapshot.bump_generation(db, payload.college_id)
+            # On a shard the student commits first, so the primary's counters
+            # never include a row that failed to insert
+            sdb.commit()
+            db.commit()
+            sdb.refresh(student)
+
+        except IntegrityError:
+            sdb.rollback()
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Failed to create student")
+
+    dashboard_snapshot.invalidate(payload.college_id)
 
     return {
         "message": "Student registered successfully",
@@ -139,23 +159,178 @@ def create_student(
     }
 
 
+@router.post("/students")
+async def create_student(
+    payload: StudentCreateSchema,
+    branch_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_session),
+):
+    # Checks and writes run off the event loop; the PBKDF2 hash is awaited
+    # from the hashing pool, so no request thread waits on it
+    await run_db(db, _check_new_student, payload, branch_admin_id, principal)
+    password_hash = await hash_password_async(payload.password)
+    return await run_db(db, _insert_student, payload, password_hash)
+
+
+def _get_owned_branch(
+    db: Session, branch_admin_id: Optional[int], principal: Optional[Principal], branch_id: int
+) -> Branch:
+    admin = get_branch_admin(db, branch_admin_id, principal)
+
+    if not owns_branch(admin, branch_id):
+        raise HTTPException(status_code=403, detail="You are not admin of this branch")
+    branch = db.query(Branch).filter(Branch.id == branch_id).first()
+    if not branch:
+        raise HTTPException(status_code=404, detail="Branch not found")
+    return branch
+
+
+@router.post("/students/bulk")
+async def bulk_create_students(
+    request: Request,
+    branch_id: int,
+    branch_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+):
+    # Body is the raw file (text/csv or application/x-ndjson), read as a
+    # stream so the upload is never held in memory as a whole.
+    format = uploads.upload_format(request, format)
+
+    # DB work goes through the threadpool; the handler itself is async only
+    # so it can consume the request stream
+    branch = await run_in_threadpool(
+        _get_owned_branch, db, branch_admin_id, principal, branch_id
+    )
+
+    seen = {"emails": set(), "rolls": set()}
+    total_rows = 0
+    imported = 0
+    errors = []
+
+    async with shards.session_async(db, branch.college_id, write=True) as sdb:
+        async for chunk in uploads.iter_chunks(request, format, student_import.CHUNK_SIZE):
+            total_rows += len(chunk)
+            accepted, chunk_errors = await run_in_threadpool(
+                student_import.check_chunk, db, sdb, branch, chunk, seen
+            )
+            errors.extend(chunk_errors)
+            hashes = await hash_many_async([s.password for _, s in accepted])
+            count, insert_errors = await run_in_threadpool(
+                student_import.insert_chunk, db, sdb, branch, accepted, hashes
+            )
+            imported += count
+            errors.extend(insert_errors)
+
+    errors.sort(key=lambda e: e["line"])
+
+    return {
+        "message": "Bulk import finished",
+        "total_rows": total_rows,
+        "imported": imported,
+        "failed": len(errors),
+        "errors": errors,
+    }
+
+
+@router.post("/marks/bulk")
+async def bulk_upload_marks(
+    request: Request,
+    branch_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+):
+    # Rows: student_id or roll_number, subject_id, marks_obtained
+    format = uploads.upload_format(request, format)
+
+    admin = await run_in_threadpool(get_branch_admin, db, branch_admin_id, principal)
+    if admin.branch_id is None:
+        raise HTTPException(status_code=404, detail="Branch not found for this admin")
+
+    total_rows = 0
+    upserted = 0
+    errors = []
+    affected = set()
+
+    async with shards.session_async(db, admin.college_id, write=True) as sdb:
+        try:
+            async for chunk in uploads.iter_chunks(request, format, marks_import.CHUNK_SIZE):
+                total_rows += len(chunk)
+                count, chunk_errors, chunk_students = await run_in_threadpool(
+                    marks_import.import_chunk, sdb, admin.branch_id, chunk
+                )
+                upserted += count
+                errors.extend(chunk_errors)
+                affected |= chunk_students
+        finally:
+            # Percentages and CGPA are recomputed once, for the touched students
+            # only. Each chunk commits on its own, so this also runs when a later
+            # chunk fails: committed marks never keep a stale CGPA or rank.
+            if affected:
+                await run_in_threadpool(marks_import.recompute, db, sdb, admin.college_id, affected)
+
+    errors.sort(key=lambda e: e["line"])
+
+    return {
+        "message": "Marks upload finished",
+        "total_rows": total_rows,
+        "upserted": upserted,
+        "students_recomputed": len(affected),
+        "failed": len(errors),
+        "errors": errors,
+    }
+
+
 @router.get("/courses")
+@async_capable
 def get_branch_courses(
-    branch_admin_id: int,
-    db: Session = Depends(get_db),
+    branch_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[int] = Query(None, ge=0),
+    year: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    db: Session = Depends(get_read_db),
 ):
-    admin = get_branch_admin(db, branch_admin_id)
+    admin = get_branch_admin(db, branch_admin_id, principal)
 
-    branch = admin.branch
+    if admin.branch_id is None:
+        raise HTTPException(status_code=404, detail="Branch not found for this admin")
+    branch = db.query(Branch.id, Branch.branch_name).filter(Branch.id == admin.branch_id).first()
     if not branch:
         raise HTTPException(status_code=404, detail="Branch not found for this admin")
 
-    courses = db.query(Course).filter(Course.branch_id == branch.id).all()
+    filters = [Course.branch_id == branch.id]
+    if year is not None:
+        filters.append(Course.year == year)
+    if is_active is not None:
+        filters.append(Course.is_active == is_active)
+
+    # Counting walks the whole filtered set, so only the first page pays for it
+    total_courses = None
+    if after is None:
+        total_courses = db.query(func.count(Course.id)).filter(*filters).scalar()
+
+    query = db.query(
+        Course.id,
+        Course.course_name,
+        Course.year,
+        Course.description,
+        Course.is_active,
+    ).filter(*filters)
+    if after is not None:
+        query = query.filter(Course.id > after)
+
+    courses, next_cursor = keyset_page(query.order_by(Course.id).limit(limit + 1).all(), limit)
 
     return {
         "branch_id": branch.id,
         "branch_name": branch.branch_name,
-        "total_courses": len(courses),
+        "total_courses": total_courses,
+        "next_cursor": next_cursor,
         "courses": [
             {
                 "course_id": c.id,
@@ -170,22 +345,60 @@ def get_branch_courses(
 
 
 @router.get("/students")
+@async_capable
 def get_branch_students(
-    branch_admin_id: int,
-    db: Session = Depends(get_db),
+    branch_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[int] = Query(None, ge=0),
+    current_year: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    gender: Optional[str] = None,
+    db: Session = Depends(get_read_db),
 ):
-    admin = get_branch_admin(db, branch_admin_id)
+    admin = get_branch_admin(db, branch_admin_id, principal)
 
-    branch = admin.branch
+    if admin.branch_id is None:
+        raise HTTPException(status_code=404, detail="Branch not found for this admin")
+    branch = db.query(Branch.id, Branch.branch_name).filter(Branch.id == admin.branch_id).first()
     if not branch:
         raise HTTPException(status_code=404, detail="Branch not found for this admin")
 
-    students = db.query(Student).filter(Student.branch_id == branch.id).all()
+    filters = [Student.branch_id == branch.id]
+    if current_year is not None:
+        filters.append(Student.current_year == current_year)
+    if is_active is not None:
+        filters.append(Student.is_active == is_active)
+    if gender is not None:
+        filters.append(Student.gender == gender)
+
+    with shards.session(db, admin.college_id) as sdb:
+        # Counting walks the whole filtered set, so only the first page pays for it
+        total_students = None
+        if after is None:
+            total_students = sdb.query(func.count(Student.id)).filter(*filters).scalar()
+
+        # idx_student_branch_id carries the primary key, so (branch_id, id > after)
+        # is an index range scan rather than an OFFSET walk
+        query = sdb.query(
+            Student.id,
+            Student.roll_number,
+            Student.first_name,
+            Student.last_name,
+            Student.current_year,
+            Student.gender,
+            Student.is_active,
+        ).filter(*filters)
+        if after is not None:
+            query = query.filter(Student.id > after)
+
+        students, next_cursor = keyset_page(query.order_by(Student.id).limit(limit + 1).all(), limit)
 
     return {
         "branch_id": branch.id,
         "branch_name": branch.branch_name,
-        "total_students": len(students),
+        "total_students": total_students,
+        "next_cursor": next_cursor,
         "students": [
             {
                 "student_id": s.id,
@@ -198,3 +411,79 @@ def get_branch_students(
             for s in students
         ],
     }
+
+
+@router.post("/materials")
+def create_material(
+    payload: MaterialCreateSchema,
+    branch_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_db),
+):
+    admin = get_branch_admin(db, branch_admin_id, principal)
+
+    if not owns_branch(admin, payload.branch_id):
+        raise HTTPException(status_code=403, detail="You are not admin of this branch")
+
+    if payload.course_id is not None:
+        course = db.query(Course).filter(
+            Course.id == payload.course_id,
+            Course.branch_id == admin.branch_id,
+        ).first()
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found in this branch")
+
+    try:
+        full_path = resolve_material_path(payload.file_path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not os.path.isfile(full_path):
+        raise HTTPException(status_code=404, detail="Material file not found")
+
+    try:
+        material = Material(
+            branch_id=admin.branch_id,
+            course_id=payload.course_id,
+            title=payload.title,
+            file_path=payload.file_path,
+            content_type=payload.content_type,
+        )
+        db.add(material)
+        db.commit()
+        db.refresh(material)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Failed to register material")
+
+    return {"message": "Material registered", "material_id": material.id}
+
+
+@router.get("/materials")
+@async_capable
+def get_branch_materials(
+    branch_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_read_db),
+):
+    admin = get_branch_admin(db, branch_admin_id, principal)
+
+    if admin.branch_id is None:
+        raise HTTPException(status_code=404, detail="Branch not found for this admin")
+
+    materials = db.query(Material).filter(Material.branch_id == admin.branch_id).all()
+
+    return {
+        "branch_id": admin.branch_id,
+        "total_materials": len(materials),
+        "materials": [
+            {
+                "material_id": m.id,
+                "course_id": m.course_id,
+                "title": m.title,
+                "file_path": m.file_path,
+                "content_type": m.content_type,
+                "is_active": m.is_active,
+            }
+            for m in materials
+        ],
+    }
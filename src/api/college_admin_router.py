@@ -1,48 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from typing import Optional
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import func
 
-from src.db.database import get_db
+from src.core.auth import Principal, authorize, get_token_principal, revoke_user_tokens
+from src.db import shards
+from src.db.database import get_db, get_read_db, get_session, async_capable, run_db
 from src.db.models import User, UserRole, College, Branch, Student
 from src.schemas.branch_schema import BranchCreateSchema
+from src.schemas.college_schema import CollegeDashboardResponse, LeaderboardResponse
 from src.schemas.user_schema import BranchAdminCreateSchema
-from passlib.context import CryptContext
+from src.core import college_counters, dashboard_snapshot, exports, leaderboard, principal_cache
+from src.core.config import settings
+from src.core.hashing import hash_password_async
 
 router = APIRouter(prefix="/college-admin", tags=["College Admin"])
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+def get_college_admin(
+    db: Session, college_admin_id: Optional[int], principal: Optional[Principal] = None
+) -> Principal:
+    return authorize(
+        db, UserRole.COLLEGE_ADMIN, principal, college_admin_id,
+        "Only College Admin can perform this action",
+    )
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
 
-
-def get_college_admin(db: Session, college_admin_id: int) -> User:
-    user = db.query(User).filter(User.id == college_admin_id).first()
-    if not user or user.role != UserRole.COLLEGE_ADMIN:
-        raise HTTPException(status_code=403, detail="Only College Admin can perform this action")
-    return user
+def get_admin_college(db: Session, admin: Principal) -> College:
+    if admin.college_id is None:
+        raise HTTPException(status_code=404, detail="College not found")
+    college = db.query(College).filter(College.id == admin.college_id).first()
+    if not college:
+        raise HTTPException(status_code=404, detail="College not found")
+    return college
 
 
 # Create Branch
 @router.post("/branches")
 def create_branch(
     payload: BranchCreateSchema,
-    college_admin_id: int,
+    college_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
     db: Session = Depends(get_db),
 ):
-    admin = get_college_admin(db, college_admin_id)
+    admin = get_college_admin(db, college_admin_id, principal)
 
-    college = db.query(College).filter(College.id == payload.college_id).first()
-    if not college:
-        raise HTTPException(status_code=404, detail="College not found")
-    if college.college_admin_id != admin.id:
+    if admin.college_id is None or str(admin.college_id) != str(payload.college_id):
         raise HTTPException(status_code=403, detail="Not authorized for this college")
 
     # Duplicate branch validation
     existing_branch = db.query(Branch).filter(
-        Branch.college_id == payload.college_id,
+        Branch.college_id == admin.college_id,
         Branch.branch_type == payload.branch_type
     ).first()
 
@@ -54,35 +64,36 @@ def create_branch(
 
     try:
         branch = Branch(
-            college_id=payload.college_id,
+            college_id=admin.college_id,
             branch_type=payload.branch_type,
             branch_name=payload.branch_name,
             hod_name=payload.hod_name,
             hod_email=payload.hod_email,
         )
         db.add(branch)
+        college_counters.increment(db, admin.college_id, branches=1)
+        dashboard_snapshot.bump_generation(db, admin.college_id)
         db.commit()
         db.refresh(branch)
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="Failed to create branch")
 
+    shards.mirror(db, admin.college_id, branch)
+    dashboard_snapshot.invalidate(admin.college_id)
+
     return {"message": "Branch created successfully", "branch_id": branch.id}
 
 
-# Create Branch Admin
-@router.post("/branch-admins")
-def create_branch_admin(
-    payload: BranchAdminCreateSchema,
-    college_admin_id: int,
-    db: Session = Depends(get_db),
-):
-    admin = get_college_admin(db, college_admin_id)
+def _check_new_branch_admin(
+    db: Session, payload: BranchAdminCreateSchema, college_admin_id: Optional[int], principal: Optional[Principal]
+) -> None:
+    admin = get_college_admin(db, college_admin_id, principal)
 
     branch = db.query(Branch).filter(Branch.id == payload.branch_id).first()
     if not branch:
         raise HTTPException(status_code=404, detail="Branch not found")
-    if branch.college.college_admin_id != admin.id:
+    if branch.college_id != admin.college_id:
         raise HTTPException(status_code=403, detail="Not authorized for this branch")
 
     # Duplicate email check
@@ -90,10 +101,14 @@ def create_branch_admin(
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already exists")
 
+
+def _assign_branch_admin(db: Session, payload: BranchAdminCreateSchema, password_hash: str) -> dict:
+    branch = db.query(Branch).filter(Branch.id == payload.branch_id).first()
+
     try:
         user = User(
             email=payload.email,
-            password_hash=hash_password(payload.password),
+            password_hash=password_hash,
             phone=payload.phone,
             role=UserRole.BRANCH_ADMIN,
         )
@@ -101,6 +116,7 @@ def create_branch_admin(
         db.commit()
         db.refresh(user)
 
+        previous_admin_id = branch.branch_admin_id
         branch.branch_admin_id = user.id
         db.commit()
 
@@ -108,6 +124,12 @@ def create_branch_admin(
         db.rollback()
         raise HTTPException(status_code=400, detail="Failed to create branch admin")
 
+    principal_cache.invalidate(previous_admin_id, user.id)
+    if previous_admin_id is not None:
+        # Their tokens still carry this scope until they expire
+        revoke_user_tokens(db, previous_admin_id)
+    shards.mirror(db, branch.college_id, branch)
+
     return {
         "message": "Branch admin added successfully",
         "branch_admin_id": user.id,
@@ -115,93 +137,125 @@ def create_branch_admin(
     }
 
 
+# Create Branch Admin
+@router.post("/branch-admins")
+async def create_branch_admin(
+    payload: BranchAdminCreateSchema,
+    college_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_session),
+):
+    # Checks and writes run off the event loop; the PBKDF2 hash is awaited
+    # from the hashing pool, so no request thread waits on it
+    await run_db(db, _check_new_branch_admin, payload, college_admin_id, principal)
+    password_hash = await hash_password_async(payload.password)
+    return await run_db(db, _assign_branch_admin, payload, password_hash)
+
+
 # College Dashboard API
-@router.get("/dashboard")
+@router.get("/dashboard", response_model=CollegeDashboardResponse)
+@async_capable
 def college_dashboard(
-    college_admin_id: int,
-    db: Session = Depends(get_db)
+    college_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_read_db)
 ):
-    admin = get_college_admin(db, college_admin_id)
+    admin = get_college_admin(db, college_admin_id, principal)
 
-    college = db.query(College).filter(College.college_admin_id == admin.id).first()
-    if not college:
-        raise HTTPException(status_code=404, detail="College not found")
+    college = get_admin_college(db, admin)
 
-    # Total students in the college
-    total_students = db.query(func.count(Student.id))\
-        .filter(Student.college_id == college.id).scalar()
+    snapshot = dashboard_snapshot.get(college.id, college.dashboard_generation)
+    if snapshot is not None:
+        return snapshot
 
-    # Student Performance List
-    students_query = db.query(
-        Student.first_name,
-        Student.last_name,
-        Student.roll_number,
-        Branch.branch_name,
-        Student.current_year,
-        Student.cgpa
-    ).join(Branch, Branch.id == Student.branch_id)\
-     .filter(Student.college_id == college.id)\
-     .order_by(Student.cgpa.desc()).all()
-
-    student_performance = [
-        {
-            "student_name": f"{fn} {ln}",
-            "roll_number": roll,
-            "branch_name": branch,
-            "current_year": year,
-            "cgpa": cgpa
-        }
-        for fn, ln, roll, branch, year, cgpa in students_query
-    ]
-
-    # Students per Branch
-    students_per_branch_query = db.query(
-        Branch.branch_name,
-        func.count(Student.id)
-    ).outerjoin(Student, Branch.id == Student.branch_id)\
-     .filter(Branch.college_id == college.id)\
-     .group_by(Branch.id).all()
-
-    students_per_branch = [
-        {"branch_name": b, "student_count": c} for b, c in students_per_branch_query
-    ]
-
-    # Students per Year
-    students_per_year_query = db.query(
-        Student.current_year,
-        func.count(Student.id)
-    ).filter(Student.college_id == college.id)\
-     .group_by(Student.current_year).all()
-
-    students_per_year = [
-        {"year": y, "student_count": c} for y, c in students_per_year_query
-    ]
-
-    # Overall college CGPA
-    average_cgpa = db.query(func.avg(Student.cgpa))\
-        .filter(Student.college_id == college.id).scalar() or 0.0
+    # Student rows live on the college's shard, which also mirrors its branches
+    with shards.session(db, college.id) as sdb:
+        # Total students in the college
+        total_students = sdb.query(func.count(Student.id))\
+            .filter(Student.college_id == college.id).scalar()
 
-    return {
+        # Student Performance List: only the top of the leaderboard
+        student_performance = leaderboard.top(sdb, college.id, settings.DASHBOARD_TOP_N)
+
+        # Students per Branch
+        students_per_branch_query = sdb.query(
+            Branch.branch_name,
+            func.count(Student.id)
+        ).outerjoin(Student, Branch.id == Student.branch_id)\
+         .filter(Branch.college_id == college.id)\
+         .group_by(Branch.id).all()
+
+        students_per_branch = [
+            {"branch_name": b, "student_count": c} for b, c in students_per_branch_query
+        ]
+
+        # Students per Year
+        students_per_year_query = sdb.query(
+            Student.current_year,
+            func.count(Student.id)
+        ).filter(Student.college_id == college.id)\
+         .group_by(Student.current_year).all()
+
+        students_per_year = [
+            {"year": y, "student_count": c} for y, c in students_per_year_query
+        ]
+
+        # Overall college CGPA
+        average_cgpa = sdb.query(func.avg(Student.cgpa))\
+            .filter(Student.college_id == college.id).scalar() or 0.0
+
+    snapshot = {
         "college_name": college.college_name,
         "collage_id" : college.id,
+        "generation": college.dashboard_generation,
         "total_students": total_students,
         "average_cgpa": round(average_cgpa, 2),
         "students_per_branch": students_per_branch,
         "students_per_year": students_per_year,
         "student_performance_list": student_performance,
     }
+    dashboard_snapshot.put(college.id, snapshot)
+    return snapshot
  
 
+@router.get("/leaderboard", response_model=LeaderboardResponse)
+@async_capable
+def college_leaderboard(
+    college_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    branch_id: Optional[int] = None,
+    year: Optional[int] = Query(None, ge=1),
+    limit: int = Query(10, ge=1, le=settings.LEADERBOARD_MAX_N),
+    db: Session = Depends(get_read_db)
+):
+    admin = get_college_admin(db, college_admin_id, principal)
+
+    college = get_admin_college(db, admin)
+
+    with shards.session(db, college.id) as sdb:
+        leaders = leaderboard.top(
+            sdb, college.id, limit, branch_id=branch_id, year=year
+        )
+
+    return {
+        "college_id": college.id,
+        "branch_id": branch_id,
+        "year": year,
+        "total_students": college.total_students,
+        "leaders": leaders,
+    }
+
+
 @router.get("/branches")
+@async_capable
 def get_college_branches(
-    college_admin_id: int,
-    db: Session = Depends(get_db)
+    college_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_read_db)
 ):
-    admin = get_college_admin(db, college_admin_id)
+    admin = get_college_admin(db, college_admin_id, principal)
 
-    college = db.query(College).filter(College.college_admin_id == admin.id).first()
-    if not college:
-        raise HTTPException(status_code=404, detail="College not found")
+    college = get_admin_college(db, admin)
 
     branches = db.query(Branch).filter(Branch.college_id == college.id).all()
 
@@ -222,33 +276,41 @@ def get_college_branches(
     }
 
 @router.get("/branch-admins")
+@async_capable
 def get_all_branch_admins(
-    college_admin_id: int,
-    db: Session = Depends(get_db)
+    college_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_read_db)
 ):
-    admin = get_college_admin(db, college_admin_id)
+    admin = get_college_admin(db, college_admin_id, principal)
 
-    college = db.query(College).filter(College.college_admin_id == admin.id).first()
-    if not college:
-        raise HTTPException(status_code=404, detail="College not found")
+    college = get_admin_college(db, admin)
 
-    branches = db.query(Branch).filter(Branch.college_id == college.id).all()
+    # Admins come back in the same query instead of one lookup per branch
+    rows = db.query(
+        Branch.id,
+        Branch.branch_name,
+        Branch.branch_type,
+        User.id.label("admin_id"),
+        User.email,
+        User.phone,
+    ).outerjoin(User, User.id == Branch.branch_admin_id)\
+     .filter(Branch.college_id == college.id).all()
 
     data = []
-    for branch in branches:
+    for row in rows:
         admin_user = None
-        if branch.branch_admin_id:
-            user = db.query(User).filter(User.id == branch.branch_admin_id).first()
+        if row.admin_id:
             admin_user = {
-                "admin_id": user.id,
-                "email": user.email,
-                "phone": user.phone
+                "admin_id": row.admin_id,
+                "email": row.email,
+                "phone": row.phone
             }
 
         data.append({
-            "branch_id": branch.id,
-            "branch_name": branch.branch_name,
-            "branch_type": branch.branch_type.value,
+            "branch_id": row.id,
+            "branch_name": row.branch_name,
+            "branch_type": row.branch_type.value,
             "branch_admin": admin_user
         })
 
@@ -257,3 +319,30 @@ def get_all_branch_admins(
         "college_name": college.college_name,
         "branches_with_admins": data
     }
+
+
+@router.get("/export/{dataset}")
+def export_college_data(
+    dataset: str = Path(..., pattern="^(students|marks|courses)$"),
+    college_admin_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    db: Session = Depends(get_read_db),
+):
+    admin = get_college_admin(db, college_admin_id, principal)
+
+    college = get_admin_college(db, admin)
+
+    if format == "parquet" and not exports.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow installed")
+
+    # The stream outlives the request's session, so it gets its own
+    session = shards.open_session(db, college.id)
+
+    return StreamingResponse(
+        exports.stream(session, dataset, college.id, format),
+        media_type=exports.CONTENT_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{college.college_code}-{dataset}.{format}"'
+        },
+    )
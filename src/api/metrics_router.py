@@ -0,0 +1,12 @@
+# src/api/metrics_router.py
+from fastapi import APIRouter, Response
+
+from src.core import prometheus_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = prometheus_metrics.render()
+    return Response(content=body, media_type=content_type)
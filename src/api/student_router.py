@@ -1,109 +1,293 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Boolean, Integer, func, literal, null, select, type_coerce, union_all
 import os
-import PyPDF2
+from typing import Optional
 from fastapi import Query
-from src.db.database import get_db
-from src.db.models import User, UserRole, Student, Branch, College, StudentMarks, Subject, StudentCourse
+from src.core import leaderboard, material_cache, material_search, student_view
+from src.core.material_files import etag_matches, material_file_response, resolve_material_path
+from src.core.auth import Principal, authorize, get_token_principal
+from src.db import shards
+from src.db.database import get_read_db, async_capable
+from src.db.models import User, UserRole, Student, Branch, College, StudentMarks, Subject, StudentCourse, Material
 from src.db.models import Student, Branch
 from src.db.models import User, UserRole, College, Student, Branch
+from src.schemas.material_schema import MaterialPagesResponse
+from src.schemas.student_schema import StudentDashboardResponse
 router = APIRouter(prefix="/student", tags=["Student"])
 
 
-def get_student_user(db: Session, user_id: int) -> User:
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user or user.role != UserRole.STUDENT:
-        raise HTTPException(status_code=403, detail="Only Student can access this dashboard")
-    return user
+def get_student_user(
+    db: Session, user_id: Optional[int], principal: Optional[Principal] = None
+) -> Principal:
+    return authorize(
+        db, UserRole.STUDENT, principal, user_id,
+        "Only Student can access this dashboard",
+    )
 
 
-@router.get("/dashboard")
+@router.get("/dashboard", response_model=StudentDashboardResponse)
+@async_capable
 def student_dashboard(
-    user_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    user_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_read_db)
 ):
-    user = get_student_user(db, user_id)
+    user = get_student_user(db, user_id, principal)
 
-    student = db.query(Student).filter(Student.user_id == user_id).first()
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
+    # Student, marks and enrollments live on the college's shard, which
+    # also mirrors the college, branch and subject rows they join
+    with shards.session(db, user.college_id) as sdb:
+        # Student, branch and college in one joined projection
+        student = sdb.query(
+            Student.id,
+            Student.first_name,
+            Student.last_name,
+            Student.roll_number,
+            Student.current_year,
+            Student.cgpa,
+            Student.dashboard_generation,
+            Branch.branch_name,
+            College.college_name,
+            College.city,
+            College.state,
+        ).join(Branch, Branch.id == Student.branch_id)\
+         .join(College, College.id == Student.college_id)\
+         .filter(Student.user_id == user.user_id).first()
+        if not student:
+            raise HTTPException(status_code=404, detail="Student not found")
+
+        etag = student_view.etag(user.college_id, student.id, student.dashboard_generation)
+        headers = {"etag": etag, "cache-control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
 
-    branch = db.query(Branch).filter(Branch.id == student.branch_id).first()
-    college = db.query(College).filter(College.id == student.college_id).first()
+        dashboard = student_view.get(user.college_id, student.id, student.dashboard_generation)
+        if dashboard is not None:
+            return dashboard
 
-    # Marks per subject
-    subject_marks = db.query(
-        Subject.subject_name,
-        Subject.total_marks,
-        StudentMarks.marks_obtained,
-        StudentMarks.percentage
-    ).join(StudentMarks, Subject.id == StudentMarks.subject_id)\
-     .filter(StudentMarks.student_id == student.id).all()
+        # Marks per subject and course progress in one round trip
+        marks = select(
+            literal("mark").label("kind"),
+            Subject.subject_name.label("subject"),
+            Subject.total_marks,
+            StudentMarks.marks_obtained,
+            StudentMarks.percentage,
+            type_coerce(null(), Integer).label("course_id"),
+            type_coerce(null(), Boolean).label("completed"),
+        ).join_from(StudentMarks, Subject, Subject.id == StudentMarks.subject_id)\
+         .where(StudentMarks.student_id == student.id)
+        progress = select(
+            literal("course"),
+            null(),
+            null(),
+            null(),
+            StudentCourse.course_percentage,
+            StudentCourse.course_id,
+            StudentCourse.is_completed,
+        ).where(StudentCourse.student_id == student.id)
+        rows = sdb.execute(union_all(marks, progress)).all()
 
     marks_list = [
         {
-            "subject": sub,
-            "marks_obtained": mo,
-            "total_marks": tm,
-            "percentage": pct
+            "subject": r.subject,
+            "marks_obtained": r.marks_obtained,
+            "total_marks": r.total_marks,
+            "percentage": r.percentage
         }
-        for sub, tm, mo, pct in subject_marks
+        for r in rows if r.kind == "mark"
     ]
 
-    # Course Progress
-    course_progress = db.query(
-        StudentCourse.course_id,
-        StudentCourse.is_completed,
-        StudentCourse.course_percentage
-    ).filter(StudentCourse.student_id == student.id).all()
-
     course_stats = [
-        {"course_id": c_id, "completed": completed, "percentage": pct}
-        for c_id, completed, pct in course_progress
+        {"course_id": r.course_id, "completed": r.completed, "percentage": r.percentage}
+        for r in rows if r.kind == "course"
     ]
 
-    return {
+    dashboard = {
         "student_name": f"{student.first_name} {student.last_name}",
         "roll_number": student.roll_number,
-        "branch": branch.branch_name,
-        "college": college.college_name,
-        "collage_city":college.city,
-        "collage_state":college.state,        
+        "branch": student.branch_name,
+        "college": student.college_name,
+        "collage_city": student.city,
+        "collage_state": student.state,
+        "generation": student.dashboard_generation,
         "current_year": student.current_year,
         "cgpa": student.cgpa,
         "total_subjects": len(marks_list),
         "subject_marks": marks_list,
         "course_progress": course_stats,
     }
+    student_view.put(user.college_id, student.id, dashboard)
+    return dashboard
+
+
+@router.get("/rank")
+@async_capable
+def student_rank(
+    user_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_read_db)
+):
+    user = get_student_user(db, user_id, principal)
 
+    # The college's student counter lives on the primary
+    college = db.query(College.id, College.total_students)\
+        .filter(College.id == user.college_id).first()
+    if not college:
+        raise HTTPException(status_code=404, detail="College not found")
 
+    with shards.session(db, college.id) as sdb:
+        student = sdb.query(
+            Student.id, Student.college_id, Student.cgpa, Student.cgpa_rank
+        ).filter(Student.user_id == user.user_id).first()
+        if not student:
+            raise HTTPException(status_code=404, detail="Student not found")
 
+        result = leaderboard.standing(sdb, student, college.total_students)
 
+    return {"student_id": student.id, "cgpa": student.cgpa, **result}
 
 
 PDF_FILE_PATH = r"BE_Complete_Documentation.pdf"
 
 
-@router.get("/read-material")
-def read_pdf_material():
+@router.get("/read-material", response_model=MaterialPagesResponse)
+def read_pdf_material(
+    page_from: int = Query(1, ge=1),
+    page_to: Optional[int] = Query(None, ge=1),
+):
     file_path = PDF_FILE_PATH
 
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="PDF not found")
 
     try:
-        with open(file_path, "rb") as pdf_file:
-            reader = PyPDF2.PdfReader(pdf_file)
-            extracted_text = ""
-
-            for page in reader.pages:
-                extracted_text += page.extract_text() or ""
+        pages = material_cache.get_pages(file_path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading PDF: {str(e)}")
 
+    total_pages = len(pages)
+    if total_pages == 0:
+        # Nothing extractable (e.g. a scanned PDF): no range to be invalid
         return {
             "file_name": "BE_Complete_Documentation.pdf",
-            "content": extracted_text.strip()
+            "total_pages": 0,
+            "page_from": 0,
+            "page_to": 0,
+            "content": "",
         }
+    if page_to is None or page_to > total_pages:
+        page_to = total_pages
+    if page_from > page_to:
+        raise HTTPException(status_code=400, detail="Invalid page range")
+
+    return {
+        "file_name": "BE_Complete_Documentation.pdf",
+        "total_pages": total_pages,
+        "page_from": page_from,
+        "page_to": page_to,
+        "content": "".join(pages[page_from - 1:page_to]).strip()
+    }
+
 
+@router.get("/material/search")
+def search_pdf_material(
+    q: str = Query(..., min_length=1),
+    k: int = Query(5, ge=1, le=50),
+):
+    file_path = PDF_FILE_PATH
+
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail="PDF not found")
+
+    try:
+        result = material_search.search(file_path, q, top_k=k)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading PDF: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching PDF: {str(e)}")
+
+    return {
+        "file_name": "BE_Complete_Documentation.pdf",
+        "query": q,
+        **result,
+    }
+
+
+@router.get("/material/file")
+def download_pdf_material(request: Request):
+    file_path = PDF_FILE_PATH
+
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail="PDF not found")
+
+    return material_file_response(
+        request, file_path, "BE_Complete_Documentation.pdf", "application/pdf"
+    )
+
+
+@router.get("/materials")
+@async_capable
+def list_student_materials(
+    user_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_read_db)
+):
+    user = get_student_user(db, user_id, principal)
+
+    # The principal already carries the student's branch
+    if user.branch_id is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    materials = db.query(Material).filter(
+        Material.branch_id == user.branch_id,
+        Material.is_active == True,
+    ).all()
+
+    return {
+        "total_materials": len(materials),
+        "materials": [
+            {
+                "material_id": m.id,
+                "course_id": m.course_id,
+                "title": m.title,
+                "content_type": m.content_type,
+            }
+            for m in materials
+        ],
+    }
+
+
+@router.get("/materials/{material_id}/file")
+def download_student_material(
+    material_id: int,
+    request: Request,
+    user_id: Optional[int] = None,
+    principal: Optional[Principal] = Depends(get_token_principal),
+    db: Session = Depends(get_read_db)
+):
+    user = get_student_user(db, user_id, principal)
+
+    if user.branch_id is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    material = db.query(Material).filter(
+        Material.id == material_id,
+        Material.branch_id == user.branch_id,
+        Material.is_active == True,
+    ).first()
+    if not material:
+        raise HTTPException(status_code=404, detail="Material not found")
+
+    try:
+        file_path = resolve_material_path(material.file_path)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Material file not found")
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Material file not found")
+
+    return material_file_response(
+        request, file_path, os.path.basename(file_path), material.content_type
+    )
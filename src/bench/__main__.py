@@ -0,0 +1,149 @@
+# src/bench/__main__.py
+"""Load-test the API in-process and compare runs.
+
+    python -m src.bench run --students 500 --requests 300 --concurrency 16
+    python -m src.bench compare bench-results/OLD.json bench-results/NEW.json
+
+`run` builds the schema from src/db/models.py on a throwaway database (a
+fresh database on --mysql-url / BENCH_MYSQL_URL when that server answers,
+otherwise SQLite), seeds it, drives every endpoint through an ASGI client
+and writes the results as JSON: latency, queries and bytes on the wire per
+endpoint, plus the JSON rendering CPU and compressed sizes of one response
+of each. Run it from the repository root.
+
+--writes adds every write endpoint except those listed, with the reason,
+in scenarios.EXCLUDED. A run exits non-zero when any endpoint answered
+with a non-2xx status, since its timings then measure the error path.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from src.bench import environment
+
+RESULTS_DIR = "bench-results"
+
+
+def _run(args) -> int:
+    with environment.database(args.mysql_url) as (url, workdir):
+        environment.configure(url, os.path.join(workdir, "materials"))
+
+        # Imported only now: the app reads the environment set above
+        from src.bench import runner
+        from src.bench.seed import Volumes
+
+        volumes = Volumes(
+            colleges=args.colleges,
+            branches=args.branches,
+            courses=args.courses,
+            subjects=args.subjects,
+            students=args.students,
+            marked_subjects=args.marks,
+        )
+        print(f"Benchmarking against {url.split('://')[0]} with {volumes}", flush=True)
+        report = runner.run(
+            os.path.join(workdir, "materials"), volumes, args.requests, args.concurrency,
+            args.warmup, args.writes, args.only, args.seed, args.accept_encoding,
+        )
+
+    out = args.out or os.path.join(
+        RESULTS_DIR,
+        f"{datetime.utcnow():%Y%m%dT%H%M%S}-{report['meta']['commit'] or 'nocommit'}.json",
+    )
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+    failed = [name for name, result in report["endpoints"].items() if result["errors"]]
+    if failed:
+        print(f"error: non-2xx responses from {', '.join(failed)}; their timings are not valid")
+        return 1
+    return 0
+
+
+def _change(old: float, new: float) -> str:
+    if not old:
+        return "     n/a"
+    return f"{(new - old) * 100.0 / old:+7.1f}%"
+
+
+def _compare(args) -> None:
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    print(f"{old['meta']['commit'] or '?'} -> {new['meta']['commit'] or '?'}")
+    for key in ("database", "volumes", "concurrency", "requests_per_endpoint", "accept_encoding"):
+        if old["meta"].get(key) != new["meta"].get(key):
+            print(f"warning: {key} differs ({old['meta'].get(key)} vs {new['meta'].get(key)})")
+
+    print(f"{'endpoint':32} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9} {'q/req':>9} {'wire B':>9}")
+    for name, now in new["endpoints"].items():
+        before = old["endpoints"].get(name)
+        if before is None:
+            print(f"{name:32} (new)")
+            continue
+        # Results from before compression recorded only the decoded size
+        wire_before = before.get("wire_bytes_per_request", before["bytes_per_request"])
+        print(
+            f"{name:32} "
+            f"{_change(before['latency_ms']['p50'], now['latency_ms']['p50'])} "
+            f"{_change(before['latency_ms']['p95'], now['latency_ms']['p95'])} "
+            f"{_change(before['latency_ms']['p99'], now['latency_ms']['p99'])} "
+            f"{_change(before['throughput_rps'], now['throughput_rps'])} "
+            f"{_change(before['queries_per_request'], now['queries_per_request'])} "
+            f"{_change(wire_before, now['wire_bytes_per_request'])}"
+        )
+
+    serialization = new.get("serialization")
+    if serialization:
+        print(f"\n{'serialization':32} {'json ms':>9} {'fast ms':>9} {'cpu':>9} {'bytes':>9} {'gzip':>9} {'br':>9}")
+        for name, now in serialization.items():
+            saved = now["bytes_saved_pct"]
+            print(
+                f"{name:32} {now['cpu_ms']['stdlib']:9.3f} {now['cpu_ms']['fast']:9.3f} "
+                f"{-now['cpu_ms']['saved_pct']:+8.1f}% {now['bytes']['identity']:9d} "
+                + " ".join(f"{-saved[c]:+8.1f}%" if c in saved else f"{'n/a':>9}" for c in ("gzip", "br"))
+            )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.bench", description="API load-test suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="seed a throwaway database and benchmark every endpoint")
+    run.add_argument("--mysql-url", default=os.environ.get("BENCH_MYSQL_URL", ""),
+                     help="MySQL server URL to create the throwaway database on; SQLite otherwise")
+    run.add_argument("--colleges", type=int, default=2)
+    run.add_argument("--branches", type=int, default=3, help="per college (max 5)")
+    run.add_argument("--courses", type=int, default=4, help="per branch")
+    run.add_argument("--subjects", type=int, default=5, help="per course")
+    run.add_argument("--students", type=int, default=250, help="per branch")
+    run.add_argument("--marks", type=int, default=10, help="marked subjects per student")
+    run.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    run.add_argument("--concurrency", type=int, default=8)
+    run.add_argument("--warmup", type=int, default=20, help="unmeasured requests per endpoint")
+    run.add_argument("--writes", action="store_true", help="also benchmark write endpoints")
+    run.add_argument("--only", nargs="*", default=[], help="endpoint name prefixes to run")
+    run.add_argument("--seed", type=int, default=1, help="random seed for data and request mix")
+    run.add_argument("--accept-encoding", default="br, gzip",
+                     help="Accept-Encoding sent with every request; empty for uncompressed responses")
+    run.add_argument("--out", help=f"results file (default: {RESULTS_DIR}/<time>-<commit>.json)")
+
+    compare = commands.add_parser("compare", help="per-endpoint change between two result files")
+    compare.add_argument("old")
+    compare.add_argument("new")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        return _run(args)
+    _compare(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# src/bench/environment.py
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+# Nothing under src.core / src.db may be imported before configure(): their
+# settings, engines and pools are built at import time.
+
+# Only filled in when the environment (or .env) does not already set them
+DEFAULTS = {
+    "DB_USERNAME": "bench",
+    "DB_PASSWORD": "bench",
+    "DB_HOST": "localhost",
+    "DB_PORT": "3306",
+    "DB_NAME": "bench",
+    "SECRET_KEY": "bench-secret-key",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "120",
+    "SMTP_EMAIL": "bench@example.com",
+    "SMTP_PASSWORD": "bench",
+}
+
+
+def configure(db_url: str, materials_dir: str) -> None:
+    for key, value in DEFAULTS.items():
+        os.environ.setdefault(key, value)
+    os.environ["DB_URL"] = db_url
+    # One database: no replicas or shards behind the app under test
+    os.environ["DB_REPLICA_URLS"] = ""
+    os.environ["DB_SHARD_URLS"] = ""
+    os.environ["MATERIALS_DIR"] = materials_dir
+
+
+@contextmanager
+def _sqlite_database(workdir: str):
+    yield f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+
+@contextmanager
+def _mysql_database(server_url: str):
+    """A throwaway database on `server_url`, dropped when the run ends."""
+    name = f"crt_bench_{uuid.uuid4().hex[:12]}"
+    server = create_engine(server_url, isolation_level="AUTOCOMMIT")
+    try:
+        with server.connect() as conn:
+            conn.execute(text(f"CREATE DATABASE `{name}` CHARACTER SET utf8mb4"))
+        try:
+            yield make_url(server_url).set(database=name).render_as_string(hide_password=False)
+        finally:
+            with server.connect() as conn:
+                conn.execute(text(f"DROP DATABASE IF EXISTS `{name}`"))
+    finally:
+        server.dispose()
+
+
+def mysql_available(server_url: str) -> bool:
+    if not server_url:
+        return False
+    engine = create_engine(server_url)
+    try:
+        with engine.connect():
+            return True
+    except Exception:
+        return False
+    finally:
+        engine.dispose()
+
+
+@contextmanager
+def database(mysql_url: str = ""):
+    """(database URL, work directory) for one run.
+
+    Uses a disposable database on `mysql_url` when that server answers,
+    otherwise a SQLite file. Both are removed afterwards.
+    """
+    with tempfile.TemporaryDirectory(prefix="crt-bench-") as workdir:
+        if mysql_available(mysql_url):
+            with _mysql_database(mysql_url) as url:
+                yield url, workdir
+        else:
+            with _sqlite_database(workdir) as url:
+                yield url, workdir
@@ -0,0 +1,403 @@
+# src/bench/generate.py
+"""Generate large volumes of consistent college data.
+
+    python -m src.bench.generate --colleges 20 --branches 5 --students 20000 --workers 8
+    python -m src.bench.generate --mode load-data --url mysql+pymysql://root:pw@localhost/crt
+
+Colleges, branches, courses, subjects and admin users are inserted by the
+parent process. Students, their users, enrollments and marks are built in
+numpy batches by a pool of worker processes and loaded either by
+executemany inserts or, on MySQL, by writing tab-separated files and running
+LOAD DATA LOCAL INFILE on them.
+
+Ids continue after the largest ones already in the database, so a run can
+add to existing data. Every row respects the model's unique keys
+(uq_college_branch, uq_college_student_roll, uq_student_subject_marks,
+uq_student_course, user email) and BranchType. CGPA, mark and course
+percentages are computed the way the marks recompute does, and ranks are
+rewritten per college at the end.
+
+Passwords come from a small pre-hashed pool: user `id` has the password
+f"{PASSWORD_PREFIX}{id % pool_size}". Rows go to one database; to fill a
+shard, point --url at it.
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from src.core import leaderboard
+from src.db import ids as id_sequences, migrations
+from src.db.models import (
+    Branch, BranchType, College, Course, Student, StudentCourse, StudentMarks, Subject,
+    User, UserRole,
+)
+
+PASSWORD_PREFIX = "Gen@pass"
+TOTAL_MARKS = 100.0
+MIN_MARKS = 20
+INSERT_BATCH = 5000
+
+BRANCH_TYPES = list(BranchType)
+
+# Column order of the generated rows, and of the LOAD DATA column lists
+COLUMNS = {
+    User: ("id", "email", "password_hash", "phone", "role", "is_active", "created_at", "updated_at"),
+    Student: (
+        "id", "user_id", "college_id", "branch_id", "roll_number", "first_name", "last_name",
+        "gender", "current_year", "cgpa", "is_active", "dashboard_generation", "created_at",
+        "updated_at",
+    ),
+    StudentCourse: (
+        "student_id", "course_id", "enrolled_at", "is_completed", "course_percentage", "updated_at",
+    ),
+    StudentMarks: (
+        "student_id", "subject_id", "marks_obtained", "percentage", "created_at", "updated_at",
+    ),
+}
+
+
+@dataclass
+class Layout:
+    colleges: int
+    branches: int   # per college, one per BranchType
+    courses: int    # per branch
+    subjects: int   # per course
+    students: int   # per branch
+    marks: int      # marked subjects per student
+    seed: int
+    # Largest id of each table before this run
+    bases: dict = field(default_factory=dict)
+    password_hashes: list = field(default_factory=list)
+    now: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def total_students(self) -> int:
+        return self.colleges * self.branches * self.students
+
+    @property
+    def subjects_per_branch(self) -> int:
+        return self.courses * self.subjects
+
+    @property
+    def student_user_base(self) -> int:
+        # Admin users come first: one per college, then one per branch
+        return self.bases["user"] + self.colleges + self.colleges * self.branches
+
+    def password_hash(self, user_id: int) -> str:
+        return self.password_hashes[user_id % len(self.password_hashes)]
+
+
+# ---- reference rows (parent process) ----
+
+def existing_bases(db: Session) -> dict:
+    return {
+        model.__tablename__: db.scalar(select(func.coalesce(func.max(model.id), 0)))
+        for model in (User, College, Branch, Course, Subject, Student)
+    }
+
+
+def insert_reference(db: Session, layout: Layout) -> None:
+    now = layout.now
+    stamps = {"created_at": now, "updated_at": now}
+    bases = layout.bases
+    users, colleges, branches, courses, subjects = [], [], [], [], []
+
+    def admin(user_id: int, role: UserRole) -> dict:
+        return {
+            "id": user_id, "email": f"u{user_id}@gen.local", "password_hash": layout.password_hash(user_id),
+            "phone": "9000000000", "role": role, "is_active": True, **stamps,
+        }
+
+    for c in range(layout.colleges):
+        college_id = bases["college"] + c + 1
+        college_admin_id = bases["user"] + c + 1
+        users.append(admin(college_admin_id, UserRole.COLLEGE_ADMIN))
+        colleges.append({
+            "id": college_id, "college_name": f"Generated College {college_id}",
+            "college_code": f"GEN{college_id:07d}", "city": "Gen City", "state": "Gen State",
+            "college_admin_id": college_admin_id, "total_students": layout.branches * layout.students,
+            "total_branches": layout.branches, "is_active": True, **stamps,
+        })
+
+        for b in range(layout.branches):
+            branch_index = c * layout.branches + b
+            branch_id = bases["branch"] + branch_index + 1
+            branch_admin_id = bases["user"] + layout.colleges + branch_index + 1
+            users.append(admin(branch_admin_id, UserRole.BRANCH_ADMIN))
+            branches.append({
+                "id": branch_id, "college_id": college_id, "branch_type": BRANCH_TYPES[b],
+                "branch_name": BRANCH_TYPES[b].value.upper(), "hod_name": "HOD",
+                "branch_admin_id": branch_admin_id, "is_active": True, **stamps,
+            })
+
+            for k in range(layout.courses):
+                course_index = branch_index * layout.courses + k
+                course_id = bases["course"] + course_index + 1
+                courses.append({
+                    "id": course_id, "branch_id": branch_id, "course_name": f"Course {k + 1}",
+                    "year": k % 4 + 1, "is_active": True, **stamps,
+                })
+                for s in range(layout.subjects):
+                    subjects.append({
+                        "id": bases["subject"] + course_index * layout.subjects + s + 1,
+                        "course_id": course_id, "subject_name": f"Subject {s + 1}",
+                        "total_marks": TOTAL_MARKS, "is_active": True, **stamps,
+                    })
+
+    for model, rows in ((User, users), (College, colleges), (Branch, branches), (Course, courses), (Subject, subjects)):
+        for i in range(0, len(rows), INSERT_BATCH):
+            db.execute(insert(model), rows[i:i + INSERT_BATCH])
+    db.commit()
+
+
+# ---- student batches (worker processes) ----
+
+def build_batch(layout: Layout, start: int, stop: int) -> dict:
+    """Rows for students [start, stop) of the run, {model: list of tuples}.
+
+    Student g is number g % students of branch g // students; the branch's
+    subjects and courses are numbered the same way insert_reference laid
+    them out. Each batch seeds its own generator, so output does not depend
+    on how batches are spread over workers.
+    """
+    rng = np.random.default_rng([layout.seed, start])
+    bases = layout.bases
+    now = layout.now
+
+    g = np.arange(start, stop)
+    n = len(g)
+    branch = g // layout.students                      # run-wide branch index
+    college = branch // layout.branches
+    seq = g % layout.students
+    student_ids = bases["student"] + g + 1
+    user_ids = layout.student_user_base + g + 1
+    current_year = rng.integers(1, 5, size=n)
+    gender = rng.integers(0, 2, size=n)
+
+    # K distinct subjects per student: the K smallest of a random row
+    per_branch = layout.subjects_per_branch
+    k = min(layout.marks, per_branch)
+    if k:
+        picks = np.argpartition(rng.random((n, per_branch)), k - 1, axis=1)[:, :k]
+    else:
+        picks = np.empty((n, 0), dtype=np.int64)
+    obtained = rng.integers(MIN_MARKS, int(TOTAL_MARKS) + 1, size=(n, k)).astype(np.float64)
+    subject_ids = bases["subject"] + branch[:, None] * per_branch + picks + 1
+    percentage = np.round(obtained * 100.0 / TOTAL_MARKS, 2)
+    cgpa = np.round(obtained.sum(axis=1) * 10.0 / (k * TOTAL_MARKS), 2) if k else np.zeros(n)
+
+    # Enrollments: each course the student has a marked subject in, with the
+    # course percentage over those subjects
+    keys = (np.arange(n)[:, None] * layout.courses + picks // layout.subjects).ravel()
+    enrolled, inverse = np.unique(keys, return_inverse=True)
+    course_sums = np.bincount(inverse, weights=obtained.ravel(), minlength=len(enrolled))
+    course_counts = np.bincount(inverse, minlength=len(enrolled))
+    enrolled_row = enrolled // layout.courses
+    course_ids = bases["course"] + branch[enrolled_row] * layout.courses + enrolled % layout.courses + 1
+    course_percentage = np.round(course_sums * 100.0 / (course_counts * TOTAL_MARKS), 2)
+
+    branch_ids = bases["branch"] + branch + 1
+    college_ids = bases["college"] + college + 1
+    prefixes = [t.value.upper() for t in BRANCH_TYPES]
+    genders = ("male", "female")
+
+    user_list = user_ids.tolist()
+    student_list = student_ids.tolist()
+    return {
+        User: [
+            (u, f"u{u}@gen.local", layout.password_hash(u), "9000000000", UserRole.STUDENT, True, now, now)
+            for u in user_list
+        ],
+        Student: [
+            (s, u, c, b, f"{prefixes[bl]}{q + 1:07d}", "Student", str(s), genders[gd], y, cg, True, 0, now, now)
+            for s, u, c, b, bl, q, gd, y, cg in zip(
+                student_list, user_list, college_ids.tolist(), branch_ids.tolist(),
+                (branch % layout.branches).tolist(), seq.tolist(), gender.tolist(),
+                current_year.tolist(), cgpa.tolist(),
+            )
+        ],
+        StudentCourse: [
+            (s, c, now, False, p, now)
+            for s, c, p in zip(
+                student_ids[enrolled_row].tolist(), course_ids.tolist(), course_percentage.tolist()
+            )
+        ],
+        StudentMarks: [
+            (s, sub, m, p, now, now)
+            for s, sub, m, p in zip(
+                np.repeat(student_ids, k).tolist(), subject_ids.ravel().tolist(),
+                obtained.ravel().tolist(), percentage.ravel().tolist(),
+            )
+        ],
+    }
+
+
+def _tsv_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, UserRole):
+        # SQLAlchemy's Enum column stores the member name
+        return value.name
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+
+def _load_data(conn, model, rows: list, workdir: str) -> None:
+    path = os.path.join(workdir, f"{model.__tablename__}-{os.getpid()}.tsv")
+    # Generated values never contain tabs, newlines or backslashes
+    with open(path, "w") as f:
+        f.writelines("\t".join(_tsv_value(v) for v in row) + "\n" for row in rows)
+    try:
+        conn.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE `{model.__tablename__}` "
+            f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+            f"({', '.join(COLUMNS[model])})"
+        )
+    finally:
+        os.remove(path)
+
+
+_engine = None
+
+
+def _worker_engine(url: str, mode: str):
+    global _engine
+    if _engine is None:
+        connect_args = {}
+        if mode == "load-data":
+            connect_args["local_infile"] = True
+        elif url.startswith("sqlite"):
+            # SQLite takes one writer at a time; the others wait their turn
+            connect_args["timeout"] = 300
+        _engine = create_engine(url, poolclass=NullPool, connect_args=connect_args)
+    return _engine
+
+
+def write_batch(url: str, mode: str, layout: Layout, start: int, stop: int) -> dict:
+    """Build and load one batch in its own transaction; returns rows per table."""
+    rows = build_batch(layout, start, stop)
+    engine = _worker_engine(url, mode)
+    with tempfile.TemporaryDirectory(prefix="crt-gen-") as workdir, engine.begin() as conn:
+        # Parents before children, so foreign keys hold at every step
+        for model in (User, Student, StudentCourse, StudentMarks):
+            if mode == "load-data":
+                _load_data(conn, model, rows[model], workdir)
+            else:
+                columns = COLUMNS[model]
+                table = model.__table__
+                for i in range(0, len(rows[model]), INSERT_BATCH):
+                    conn.execute(
+                        insert(table),
+                        [dict(zip(columns, row)) for row in rows[model][i:i + INSERT_BATCH]],
+                    )
+    return {model.__tablename__: len(table_rows) for model, table_rows in rows.items()}
+
+
+# ---- CLI ----
+
+def generate(
+    url: str, layout: Layout, mode: str, workers: int, batch_size: int, password_pool: int, ranks: bool
+) -> dict:
+    from src.core.hashing import pwd_context
+
+    engine = create_engine(url, poolclass=NullPool)
+    started = time.perf_counter()
+    layout.password_hashes = [pwd_context.hash(f"{PASSWORD_PREFIX}{i}") for i in range(password_pool)]
+
+    with Session(engine) as db:
+        layout.bases = existing_bases(db)
+        insert_reference(db, layout)
+    engine.dispose()
+
+    totals = {}
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(write_batch, url, mode, layout, start, min(start + batch_size, layout.total_students))
+            for start in range(0, layout.total_students, batch_size)
+        ]
+        for future in as_completed(futures):
+            for table, count in future.result().items():
+                totals[table] = totals.get(table, 0) + count
+            done += 1
+            elapsed = time.perf_counter() - started
+            print(
+                f"batch {done}/{len(futures)}: {totals.get('student', 0)} students, "
+                f"{totals.get('student_marks', 0)} marks in {elapsed:.1f}s "
+                f"({totals.get('student_marks', 0) / elapsed:.0f} marks/s)",
+                flush=True,
+            )
+
+    # Students created later take ids after the generated ones
+    with engine.begin() as conn:
+        id_sequences.advance(conn, id_sequences.STUDENT, layout.bases["student"] + layout.total_students)
+
+    if ranks:
+        with Session(engine) as db:
+            for c in range(layout.colleges):
+                leaderboard.recompute_ranks(db, layout.bases["college"] + c + 1)
+                db.commit()
+        engine.dispose()
+
+    return {"rows": totals, "seconds": round(time.perf_counter() - started, 2)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.bench.generate", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="SQLAlchemy URL to load into (default: the app's database)")
+    parser.add_argument("--create-schema", action="store_true", help="run the schema migrations first")
+    parser.add_argument("--colleges", type=int, default=10)
+    parser.add_argument("--branches", type=int, default=len(BRANCH_TYPES), help="per college")
+    parser.add_argument("--courses", type=int, default=8, help="per branch")
+    parser.add_argument("--subjects", type=int, default=6, help="per course")
+    parser.add_argument("--students", type=int, default=2000, help="per branch")
+    parser.add_argument("--marks", type=int, default=24, help="marked subjects per student")
+    parser.add_argument("--mode", choices=("insert", "load-data"), default="insert",
+                        help="executemany inserts, or LOAD DATA LOCAL INFILE files (MySQL)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=20000, help="students per worker batch")
+    parser.add_argument("--password-pool", type=int, default=16, help="distinct pre-hashed passwords")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skip-ranks", action="store_true", help="do not recompute CGPA ranks")
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.branches <= len(BRANCH_TYPES):
+        parser.error(f"--branches must be between 1 and {len(BRANCH_TYPES)} (one per BranchType)")
+    if args.students > 9_999_999:
+        parser.error("--students must fit the 7-digit roll number")
+
+    url = args.url
+    if not url:
+        from src.db.database import DATABASE_URL as url
+    if args.mode == "load-data" and not url.startswith("mysql"):
+        parser.error("--mode load-data needs a MySQL database")
+    if args.create_schema:
+        engine = create_engine(url)
+        migrations.upgrade(engine)
+        engine.dispose()
+
+    layout = Layout(
+        colleges=args.colleges, branches=args.branches, courses=args.courses,
+        subjects=args.subjects, students=args.students, marks=args.marks, seed=args.seed,
+    )
+    result = generate(
+        url, layout, args.mode, args.workers, args.batch_size, args.password_pool, not args.skip_ranks
+    )
+    print(result)
+    print(f"Passwords: user id N logs in with '{PASSWORD_PREFIX}{{N % {args.password_pool}}}'")
+
+
+if __name__ == "__main__":
+    main()
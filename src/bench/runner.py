@@ -0,0 +1,230 @@
+# src/bench/runner.py
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from dataclasses import asdict
+from datetime import datetime
+
+import httpx
+from fastapi.routing import APIRoute
+
+from src.bench import scenarios, serialization
+from src.bench.seed import Dataset, Volumes, seed, write_material_file
+from src.core.auth import create_access_token
+from src.db import migrations
+from src.db.models import UserRole
+
+ROLES = {
+    "app_admin": UserRole.APP_ADMIN,
+    "college_admin": UserRole.COLLEGE_ADMIN,
+    "branch_admin": UserRole.BRANCH_ADMIN,
+    "student": UserRole.STUDENT,
+}
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    # Nearest-rank: the smallest value with at least p% of samples at or below it
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def _tokens(data: Dataset) -> dict:
+    # Signed tokens carry the scope, so minting them needs no database
+    return {
+        who.user_id: create_access_token(who.user_id, ROLES[role], who.college_id, who.branch_id)
+        for role in ROLES
+        for who in scenarios.identities(data, role)
+    }
+
+
+def _summary(
+    latencies: list, queries: list, sizes: list, wire_sizes: list, statuses: Counter, elapsed: float
+) -> dict:
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "requests": count,
+        # Anything but 2xx: the endpoint's real work was not measured
+        "errors": sum(n for status, n in statuses.items() if not 200 <= status < 300),
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "mean": round(sum(latencies) / count * 1000, 3) if count else 0.0,
+            "max": round(latencies[-1] * 1000, 3) if count else 0.0,
+        },
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "queries_per_request": round(sum(queries) / count, 2) if count else 0.0,
+        "bytes_per_request": round(sum(sizes) / count) if count else 0,
+        # As sent, after any Content-Encoding
+        "wire_bytes_per_request": round(sum(wire_sizes) / count) if count else 0,
+    }
+
+
+async def _drive(
+    client, scenario, data, tokens, rng, requests: int, concurrency: int, samples: dict
+) -> dict:
+    callers = scenarios.identities(data, scenario.role)
+    latencies, queries, sizes, wire_sizes = [], [], [], []
+    statuses = Counter()
+    # Workers share one iterator; the event loop hands out each slot once
+    slots = iter(range(requests))
+
+    async def worker():
+        for _ in slots:
+            request = scenario.build(rng.choice(callers), data, rng)
+            headers = {}
+            if request.token is not None:
+                headers["authorization"] = f"Bearer {request.token}"
+            elif request.identity is not None:
+                headers["authorization"] = f"Bearer {tokens[request.identity.user_id]}"
+            if request.content_type:
+                headers["content-type"] = request.content_type
+
+            start = time.perf_counter()
+            response = await client.request(
+                request.method, request.path, content=request.body, headers=headers
+            )
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+            queries.append(int(response.headers.get("x-query-count", 0)))
+            sizes.append(len(response.content))
+            wire_sizes.append(response.num_bytes_downloaded)
+            if response.status_code == 200 and response.headers.get("content-type", "").startswith("application/json"):
+                samples[scenario.name] = (
+                    request.method, response.request.url.path, response.content
+                )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summary(latencies, queries, sizes, wire_sizes, statuses, time.perf_counter() - start)
+
+
+async def _run_all(app, data, selected, requests, concurrency, warmup, rng, accept_encoding, samples) -> dict:
+    tokens = _tokens(data)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    headers = {"accept-encoding": accept_encoding or "identity"}
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            for scenario in selected:
+                if warmup:
+                    await _drive(client, scenario, data, tokens, rng, warmup, concurrency, samples)
+                result = results[scenario.name] = await _drive(
+                    client, scenario, data, tokens, rng, requests, concurrency, samples
+                )
+                print(
+                    f"{scenario.name:32} p50 {result['latency_ms']['p50']:9.2f} ms  "
+                    f"p99 {result['latency_ms']['p99']:9.2f} ms  "
+                    f"{result['throughput_rps']:9.1f} req/s  "
+                    f"{result['queries_per_request']:6.2f} q/req  "
+                    f"{result['wire_bytes_per_request']:9d} B/req  errors {result['errors']}"
+                    + ("  FAILED: non-2xx responses" if result["errors"] else ""),
+                    flush=True,
+                )
+    return results
+
+
+def _response_model(app, method: str, path: str):
+    for route in app.routes:
+        if isinstance(route, APIRoute) and method in route.methods and route.path_regex.match(path):
+            return route.response_model
+    return None
+
+
+def _serialization(app, samples: dict) -> dict:
+    """Time the old and new JSON paths and the codings on one real response per endpoint."""
+    results = {}
+    for name, (method, path, body) in samples.items():
+        result = results[name] = serialization.measure(json.loads(body), _response_model(app, method, path))
+        print(
+            f"{name:32} json {result['cpu_ms']['stdlib']:8.3f} ms -> "
+            f"{result['renderer']} {result['cpu_ms']['fast']:8.3f} ms "
+            f"({result['cpu_ms']['saved_pct']:5.1f}% saved)  "
+            f"{result['bytes']['identity']:9d} B, "
+            + ", ".join(f"{coding} {-pct:+.1f}%" for coding, pct in result["bytes_saved_pct"].items()),
+            flush=True,
+        )
+    return results
+
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(
+    materials_dir: str,
+    volumes: Volumes,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    writes: bool,
+    only: list,
+    rng_seed: int,
+    accept_encoding: str = "br, gzip",
+) -> dict:
+    """Build the schema, seed it and drive every selected endpoint in-process.
+
+    Must be called after environment.configure(): importing the app builds
+    its engines from the environment. Run from the repository root, where
+    the student material PDF lives.
+    """
+    from main import app
+    from src.db.database import SessionLocal, engine
+
+    rng = random.Random(rng_seed)
+
+    migrations.upgrade(engine)
+    write_material_file(materials_dir)
+
+    seed_started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        data = seed(db, volumes, rng)
+    finally:
+        db.close()
+    seed_seconds = time.perf_counter() - seed_started
+
+    selected = [
+        s for s in scenarios.SCENARIOS
+        if (writes or not s.writes) and (not only or any(s.name.startswith(o) for o in only))
+    ]
+    samples = {}
+    results = asyncio.run(_run_all(
+        app, data, selected, requests, concurrency, warmup, rng, accept_encoding, samples
+    ))
+    print("Serialization and compression, one response per endpoint:", flush=True)
+    serialized = _serialization(app, samples)
+
+    return {
+        "meta": {
+            "commit": _git("rev-parse", "--short", "HEAD"),
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name,
+            "volumes": asdict(volumes),
+            "requests_per_endpoint": requests,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "seed": rng_seed,
+            "seed_seconds": round(seed_seconds, 3),
+            "accept_encoding": accept_encoding,
+            "excluded": scenarios.EXCLUDED,
+        },
+        "endpoints": results,
+        "serialization": serialized,
+    }
@@ -0,0 +1,220 @@
+# src/bench/scenarios.py
+import itertools
+import json
+import random
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from src.bench.seed import MATERIAL_FILE, PASSWORD, Dataset, Identity
+from src.core.auth import create_access_token
+from src.db.models import UserRole
+
+# Each request picks its caller at random from the role's identities and
+# builds its path (and body) from that caller and the seeded dataset.
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    identity: Optional[Identity] = None
+    body: Optional[bytes] = None
+    content_type: Optional[str] = None
+    # Sent instead of the identity's shared token
+    token: Optional[str] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    role: str
+    build: Callable[[Identity, Dataset, random.Random], Request]
+    writes: bool = False
+
+
+def _get(path: str):
+    return lambda who, data, rng: Request("GET", path, who)
+
+
+def _post(path: str):
+    return lambda who, data, rng: Request("POST", path, who)
+
+
+def _college_admin_view(who, data, rng):
+    return Request("GET", f"/app-admin/college-admins/{rng.choice(data.college_ids)}", who)
+
+
+def _student_material_file(who, data, rng):
+    return Request("GET", f"/student/materials/{data.materials_by_branch[who.branch_id]}/file", who)
+
+
+def _login(who, data, rng):
+    body = json.dumps({"email": who.email, "password": PASSWORD}).encode()
+    # Login is anonymous: the identity only supplies the credentials
+    return Request("POST", "/auth/login", None, body, "application/json")
+
+
+def _marks_upload(who, data, rng):
+    subjects = data.subjects_by_branch[who.branch_id]
+    students = [s for s in data.students if s.branch_id == who.branch_id]
+    lines = [
+        json.dumps({
+            "student_id": student.student_id,
+            "subject_id": rng.choice(subjects),
+            "marks_obtained": float(rng.randint(20, 100)),
+        })
+        for student in rng.sample(students, min(20, len(students)))
+    ]
+    return Request(
+        "POST", "/branch-admin/marks/bulk", who, "\n".join(lines).encode(), "application/x-ndjson"
+    )
+
+
+# Unique suffixes for rows the write scenarios create
+_created = itertools.count(1)
+
+
+def _email(prefix: str, n: int, rng) -> str:
+    # EmailStr rejects reserved names such as .local
+    return f"{prefix}{n}-{rng.getrandbits(32):08x}@example.com"
+
+
+def _json(method: str, path: str, who, payload: dict) -> Request:
+    return Request(method, path, who, json.dumps(payload).encode(), "application/json")
+
+
+def _new_student(who, n: int, rng) -> dict:
+    return {
+        "email": _email("student", n, rng),
+        "password": PASSWORD,
+        "phone": "9000000000",
+        "college_id": who.college_id,
+        "branch_id": who.branch_id,
+        "roll_number": f"NEW{n:07d}{rng.getrandbits(16):04x}",
+        "first_name": "New",
+        "last_name": str(n),
+        "current_year": 1,
+    }
+
+
+def _create_student(who, data, rng):
+    return _json("POST", "/branch-admin/students", who, _new_student(who, next(_created), rng))
+
+
+def _bulk_students(who, data, rng):
+    lines = [json.dumps(_new_student(who, next(_created), rng)) for _ in range(20)]
+    return Request(
+        "POST", f"/branch-admin/students/bulk?branch_id={who.branch_id}", who,
+        "\n".join(lines).encode(), "application/x-ndjson",
+    )
+
+
+def _create_course(who, data, rng):
+    n = next(_created)
+    return _json("POST", "/branch-admin/courses", who, {
+        "branch_id": str(who.branch_id), "course_name": f"Bench Course {n}", "year": rng.randint(1, 4),
+    })
+
+
+def _create_material(who, data, rng):
+    n = next(_created)
+    return _json("POST", "/branch-admin/materials", who, {
+        "branch_id": who.branch_id, "title": f"Bench Material {n}", "file_path": MATERIAL_FILE,
+    })
+
+
+def _create_college(who, data, rng):
+    n = next(_created)
+    return _json("POST", "/app-admin/colleges", who, {
+        "college_name": f"New College {n}", "college_code": f"NEW{n:06d}{rng.getrandbits(16):04x}",
+    })
+
+
+def _register(who, data, rng):
+    body = json.dumps({"email": _email("admin", next(_created), rng), "password": PASSWORD}).encode()
+    return Request("POST", "/app-admin/register", None, body, "application/json")
+
+
+def _logout(who, data, rng):
+    # Logging out revokes the token, so each request brings a fresh one
+    token = create_access_token(who.user_id, UserRole.STUDENT, who.college_id, who.branch_id)
+    return Request("POST", "/auth/logout", who, token=token)
+
+
+def _create_branch_admin(who, data, rng):
+    branch_ids = [b.branch_id for b in data.branch_admins if b.college_id == who.college_id]
+    return _json("POST", "/college-admin/branch-admins", who, {
+        "branch_id": str(rng.choice(branch_ids)),
+        "email": _email("branchadmin", next(_created), rng),
+        "password": PASSWORD,
+    })
+
+
+def _create_college_admin(who, data, rng):
+    return _json("POST", "/app-admin/college-admins", who, {
+        "college_id": str(rng.choice(data.college_ids)),
+        "email": _email("collegeadmin", next(_created), rng),
+        "password": PASSWORD,
+    })
+
+
+SCENARIOS = [
+    Scenario("auth.login", "student", _login),
+
+    Scenario("app_admin.colleges", "app_admin", _get("/app-admin/colleges")),
+    Scenario("app_admin.college_admin", "app_admin", _college_admin_view),
+    Scenario("app_admin.db_pool", "app_admin", _get("/app-admin/db/pool")),
+    Scenario("app_admin.db_routes", "app_admin", _get("/app-admin/db/routes")),
+    Scenario("app_admin.shards", "app_admin", _get("/app-admin/shards")),
+    Scenario("app_admin.hashing", "app_admin", _get("/app-admin/hashing")),
+    Scenario("app_admin.cache", "app_admin", _get("/app-admin/cache")),
+    Scenario("app_admin.startup", "app_admin", _get("/app-admin/startup")),
+
+    Scenario("college_admin.dashboard", "college_admin", _get("/college-admin/dashboard")),
+    Scenario("college_admin.leaderboard", "college_admin", _get("/college-admin/leaderboard?limit=50")),
+    Scenario("college_admin.branches", "college_admin", _get("/college-admin/branches")),
+    Scenario("college_admin.branch_admins", "college_admin", _get("/college-admin/branch-admins")),
+    Scenario("college_admin.export_csv", "college_admin", _get("/college-admin/export/students?format=csv")),
+
+    Scenario("branch_admin.courses", "branch_admin", _get("/branch-admin/courses")),
+    Scenario("branch_admin.students", "branch_admin", _get("/branch-admin/students?limit=100")),
+    Scenario("branch_admin.materials", "branch_admin", _get("/branch-admin/materials")),
+
+    Scenario("student.dashboard", "student", _get("/student/dashboard")),
+    Scenario("student.rank", "student", _get("/student/rank")),
+    Scenario("student.read_material", "student", _get("/student/read-material?page_from=1&page_to=5")),
+    Scenario("student.material_search", "student", _get("/student/material/search?q=database+index")),
+    Scenario("student.material_file", "student", _get("/student/material/file")),
+    Scenario("student.materials", "student", _get("/student/materials")),
+    Scenario("student.material_download", "student", _student_material_file),
+
+    Scenario("metrics", "app_admin", _get("/metrics")),
+
+    Scenario("auth.logout", "student", _logout, writes=True),
+    Scenario("app_admin.register", "app_admin", _register, writes=True),
+    Scenario("app_admin.create_college", "app_admin", _create_college, writes=True),
+    Scenario("app_admin.reconcile_counters", "app_admin", _post("/app-admin/colleges/reconcile-counters"), writes=True),
+    Scenario("branch_admin.marks_upload", "branch_admin", _marks_upload, writes=True),
+    Scenario("branch_admin.create_student", "branch_admin", _create_student, writes=True),
+    Scenario("branch_admin.bulk_students", "branch_admin", _bulk_students, writes=True),
+    Scenario("branch_admin.create_course", "branch_admin", _create_course, writes=True),
+    Scenario("branch_admin.create_material", "branch_admin", _create_material, writes=True),
+    # Last: each request replaces a seeded admin (and revokes its tokens),
+    # so nothing after them may run as a branch or college admin
+    Scenario("college_admin.create_branch_admin", "college_admin", _create_branch_admin, writes=True),
+    Scenario("app_admin.create_college_admin", "app_admin", _create_college_admin, writes=True),
+]
+
+# Endpoints no scenario drives, and why
+EXCLUDED = {
+    "POST /college-admin/branches": (
+        "a college holds one branch per BranchType, so after at most five "
+        "requests every one is a 400"
+    ),
+}
+
+
+def identities(data: Dataset, role: str) -> list:
+    if role == "app_admin":
+        return [data.app_admin]
+    return getattr(data, f"{role}s")
@@ -0,0 +1,186 @@
+# src/bench/seed.py
+import itertools
+import os
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from src.core import marks_import
+from src.core.hashing import pwd_context
+from src.db import ids as id_sequences
+from src.db.models import (
+    Branch, BranchType, College, Course, Material, Student, StudentCourse, StudentMarks,
+    Subject, User, UserRole,
+)
+
+PASSWORD = "Bench@12345"
+INSERT_BATCH = 5000
+MATERIAL_FILE = "bench-material.pdf"
+MATERIAL_SIZE = 256 * 1024
+
+
+@dataclass
+class Volumes:
+    colleges: int = 2
+    branches: int = 3          # per college, at most one per BranchType
+    courses: int = 4           # per branch
+    subjects: int = 5          # per course
+    students: int = 250        # per branch
+    marked_subjects: int = 10  # per student, drawn from the branch's subjects
+
+
+@dataclass
+class Identity:
+    user_id: int
+    email: str
+    college_id: Optional[int] = None
+    branch_id: Optional[int] = None
+    student_id: Optional[int] = None
+
+
+@dataclass
+class Dataset:
+    app_admin: Identity
+    college_admins: list = field(default_factory=list)
+    branch_admins: list = field(default_factory=list)
+    students: list = field(default_factory=list)
+    subjects_by_branch: dict = field(default_factory=dict)
+    materials_by_branch: dict = field(default_factory=dict)
+    college_ids: list = field(default_factory=list)
+
+
+def _insert(db: Session, model, rows: list) -> None:
+    for i in range(0, len(rows), INSERT_BATCH):
+        db.execute(insert(model), rows[i:i + INSERT_BATCH])
+
+
+def write_material_file(materials_dir: str) -> None:
+    os.makedirs(materials_dir, exist_ok=True)
+    with open(os.path.join(materials_dir, MATERIAL_FILE), "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        f.write(os.urandom(MATERIAL_SIZE))
+
+
+def seed(db: Session, volumes: Volumes, rng: random.Random) -> Dataset:
+    """Fill an empty schema with `volumes` of data and return who can log in.
+
+    Rows go in with explicit ids through executemany inserts, one college
+    at a time, and every account shares one pre-hashed password. Marks are
+    then run through the same recompute the marks upload uses, so course
+    percentages, CGPAs and ranks are consistent.
+    """
+    now = datetime.utcnow()
+    password_hash = pwd_context.hash(PASSWORD)
+    ids = {model: itertools.count(1) for model in (User, College, Branch, Course, Subject, Student, Material)}
+    stamps = {"created_at": now, "updated_at": now}
+
+    def user(email: str, role: UserRole) -> dict:
+        return {
+            "id": next(ids[User]), "email": email, "password_hash": password_hash,
+            "phone": "9000000000", "role": role, "is_active": True, **stamps,
+        }
+
+    app_admin = user("admin@bench.local", UserRole.APP_ADMIN)
+    _insert(db, User, [app_admin])
+    dataset = Dataset(app_admin=Identity(app_admin["id"], app_admin["email"]))
+
+    branch_types = list(BranchType)[:volumes.branches]
+
+    for _ in range(volumes.colleges):
+        users, branches, courses, subjects, students, enrollments, marks, materials = ([] for _ in range(8))
+
+        college_id = next(ids[College])
+        code = f"BENCH{college_id:04d}"
+        college_admin = user(f"college{college_id}@bench.local", UserRole.COLLEGE_ADMIN)
+        users.append(college_admin)
+        dataset.college_ids.append(college_id)
+        dataset.college_admins.append(Identity(college_admin["id"], college_admin["email"], college_id))
+
+        for branch_type in branch_types:
+            branch_id = next(ids[Branch])
+            branch_admin = user(f"branch{branch_id}@bench.local", UserRole.BRANCH_ADMIN)
+            users.append(branch_admin)
+            dataset.branch_admins.append(
+                Identity(branch_admin["id"], branch_admin["email"], college_id, branch_id)
+            )
+            branches.append({
+                "id": branch_id, "college_id": college_id, "branch_type": branch_type,
+                "branch_name": f"{branch_type.value.upper()} {code}", "hod_name": "HOD",
+                "branch_admin_id": branch_admin["id"], "is_active": True, **stamps,
+            })
+
+            branch_subjects = []
+            for k in range(volumes.courses):
+                course_id = next(ids[Course])
+                courses.append({
+                    "id": course_id, "branch_id": branch_id, "course_name": f"Course {k + 1}",
+                    "year": k % 4 + 1, "is_active": True, **stamps,
+                })
+                for s in range(volumes.subjects):
+                    subject_id = next(ids[Subject])
+                    subjects.append({
+                        "id": subject_id, "course_id": course_id, "subject_name": f"Subject {s + 1}",
+                        "total_marks": 100.0, "is_active": True, **stamps,
+                    })
+                    branch_subjects.append((subject_id, course_id))
+            dataset.subjects_by_branch[branch_id] = [s for s, _ in branch_subjects]
+
+            material_id = next(ids[Material])
+            materials.append({
+                "id": material_id, "branch_id": branch_id, "title": "Bench material",
+                "file_path": MATERIAL_FILE, "content_type": "application/pdf",
+                "is_active": True, **stamps,
+            })
+            dataset.materials_by_branch[branch_id] = material_id
+
+            for n in range(volumes.students):
+                student_id = next(ids[Student])
+                student_user = user(f"student{student_id}@bench.local", UserRole.STUDENT)
+                users.append(student_user)
+                students.append({
+                    "id": student_id, "user_id": student_user["id"], "college_id": college_id,
+                    "branch_id": branch_id, "roll_number": f"{branch_type.value.upper()}{n + 1:06d}",
+                    "first_name": "Student", "last_name": str(student_id),
+                    "gender": rng.choice(("male", "female")), "current_year": rng.randint(1, 4),
+                    "cgpa": 0.0, "is_active": True, **stamps,
+                })
+                dataset.students.append(
+                    Identity(student_user["id"], student_user["email"], college_id, branch_id, student_id)
+                )
+
+                picked = rng.sample(branch_subjects, min(volumes.marked_subjects, len(branch_subjects)))
+                for subject_id, _ in picked:
+                    obtained = float(rng.randint(20, 100))
+                    marks.append({
+                        "student_id": student_id, "subject_id": subject_id,
+                        "marks_obtained": obtained, "percentage": obtained, **stamps,
+                    })
+                enrollments.extend(
+                    {"student_id": student_id, "course_id": course_id, "enrolled_at": now, "updated_at": now}
+                    for course_id in {course_id for _, course_id in picked}
+                )
+
+        _insert(db, User, users)
+        _insert(db, College, [{
+            "id": college_id, "college_name": f"Bench College {college_id}", "college_code": code,
+            "city": "Bench City", "state": "Bench State", "college_admin_id": college_admin["id"],
+            "total_students": len(students), "total_branches": len(branches),
+            "is_active": True, **stamps,
+        }])
+        for model, rows in (
+            (Branch, branches), (Course, courses), (Subject, subjects), (Student, students),
+            (StudentCourse, enrollments), (StudentMarks, marks), (Material, materials),
+        ):
+            _insert(db, model, rows)
+        db.commit()
+
+        marks_import.recompute(db, db, college_id, {s["id"] for s in students})
+
+    # Students created through the API take ids after the seeded ones
+    id_sequences.advance(db, id_sequences.STUDENT, next(ids[Student]) - 1)
+    db.commit()
+    return dataset
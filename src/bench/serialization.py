@@ -0,0 +1,73 @@
+# src/bench/serialization.py
+import gzip
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from src.core import compression, responses
+from src.core.config import settings
+
+# Each timing repeats the call until it has used at least this much CPU
+MIN_CPU_SECONDS = 0.2
+
+
+def _cpu_ms(fn, payload) -> float:
+    calls = 0
+    start = time.process_time()
+    while True:
+        fn(payload)
+        calls += 1
+        used = time.process_time() - start
+        if used >= MIN_CPU_SECONDS:
+            return used * 1000 / calls
+
+
+def _stdlib(payload) -> bytes:
+    # FastAPI's default path: jsonable_encoder, then JSONResponse's json.dumps
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _fast(response_model):
+    # What the app does now: FastAPI's serialize_response (pydantic validate
+    # and dump for routes with a response_model, jsonable_encoder for the
+    # rest), then FastJSONResponse.render
+    if response_model is None:
+        return lambda payload: responses.render_json(jsonable_encoder(payload))
+    adapter = TypeAdapter(response_model)
+    return lambda payload: responses.render_json(
+        adapter.dump_python(adapter.validate_python(payload), mode="json")
+    )
+
+
+def measure(payload, response_model=None) -> dict:
+    """CPU per response of the old and new JSON paths, and the body size per coding.
+
+    `response_model` is the route's, if it declares one.
+    """
+    stdlib_ms = _cpu_ms(_stdlib, payload)
+    fast_ms = _cpu_ms(_fast(response_model), payload)
+
+    body = responses.render_json(payload)
+    sizes = {"identity": len(body)}
+    sizes["gzip"] = len(gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL))
+    if "br" in compression.available():
+        sizes["br"] = len(compression.brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY))
+
+    return {
+        "renderer": "orjson" if responses.orjson_available() else "json",
+        "response_model": response_model.__name__ if response_model is not None else None,
+        "cpu_ms": {
+            "stdlib": round(stdlib_ms, 4),
+            "fast": round(fast_ms, 4),
+            "saved_pct": round((stdlib_ms - fast_ms) * 100 / stdlib_ms, 1) if stdlib_ms else 0.0,
+        },
+        "bytes": sizes,
+        "bytes_saved_pct": {
+            coding: round((sizes["identity"] - size) * 100 / sizes["identity"], 1)
+            for coding, size in sizes.items() if coding != "identity" and sizes["identity"]
+        },
+    }
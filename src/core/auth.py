@@ -0,0 +1,210 @@
+# src/core/auth.py
+import calendar
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+import jwt
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import Session
+
+from src.core import principal_cache
+from src.core.config import settings
+from src.db.models import RevokedToken, UserRole
+from src.db.upsert import upsert
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: int
+    role: UserRole
+    college_id: Optional[int] = None
+    branch_id: Optional[int] = None
+    token_id: Optional[str] = None
+
+
+def create_access_token(user_id: int, role: UserRole, college_id=None, branch_id=None) -> str:
+    now = datetime.utcnow()
+    claims = {
+        "sub": str(user_id),
+        "role": role.value,
+        "college_id": college_id,
+        "branch_id": branch_id,
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+# ---- revocation ----
+# Revoked token ids are written to the revoked_token table and mirrored in
+# memory. Each worker reloads the table at most every
+# TOKEN_REVOCATION_REFRESH_SECONDS, so checking a token never costs a query
+# and a logout reaches every worker within that window. A "user:<id>" row
+# revokes every token that user was issued up to its not_before time; it is
+# written when an admin is replaced, since the old admin's tokens still
+# carry the college or branch scope.
+
+USER_REVOCATION_PREFIX = "user:"
+
+_revoked = {}
+# user_id -> epoch seconds; tokens issued at or before it are revoked
+_user_not_before = {}
+_revoked_lock = threading.Lock()
+_revoked_loaded_at = 0.0
+
+
+def _refresh_revocations() -> None:
+    global _revoked_loaded_at
+    if time.monotonic() - _revoked_loaded_at < settings.TOKEN_REVOCATION_REFRESH_SECONDS:
+        return
+
+    from src.db.database import SessionLocal
+
+    with _revoked_lock:
+        if time.monotonic() - _revoked_loaded_at < settings.TOKEN_REVOCATION_REFRESH_SECONDS:
+            return
+        db = SessionLocal()
+        try:
+            rows = db.query(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.not_before).filter(
+                RevokedToken.expires_at > datetime.utcnow()
+            ).all()
+        finally:
+            db.close()
+        _revoked.clear()
+        _revoked.update((row.jti, row.expires_at) for row in rows if row.not_before is None)
+        _user_not_before.clear()
+        _user_not_before.update(
+            (int(row.jti[len(USER_REVOCATION_PREFIX):]), calendar.timegm(row.not_before.utctimetuple()))
+            for row in rows
+            if row.not_before is not None and row.jti.startswith(USER_REVOCATION_PREFIX)
+        )
+        _revoked_loaded_at = time.monotonic()
+
+
+def is_revoked(token_id: str, user_id: Optional[int] = None, issued_at: Optional[int] = None) -> bool:
+    _refresh_revocations()
+    if token_id in _revoked:
+        return True
+    not_before = _user_not_before.get(user_id)
+    return not_before is not None and (issued_at is None or issued_at <= not_before)
+
+
+def revoke_token(db: Session, token_id: str, expires_at: datetime) -> None:
+    # Upsert rather than merge: concurrent logouts of one token must not race
+    upsert(
+        db, RevokedToken, [{"jti": token_id, "expires_at": expires_at, "not_before": None}],
+        conflict_columns=["jti"], update_columns=["expires_at"],
+    )
+    # Expired entries can never match again, so prune them on the way
+    db.query(RevokedToken).filter(RevokedToken.expires_at <= datetime.utcnow()).delete(
+        synchronize_session=False
+    )
+    db.commit()
+    with _revoked_lock:
+        _revoked[token_id] = expires_at
+
+
+def revoke_user_tokens(db: Session, user_id: int) -> None:
+    """Revoke every token issued to `user_id` so far. Commits."""
+    now = datetime.utcnow()
+    # Upsert rather than merge: two admin replacements may revoke the same
+    # user at once
+    upsert(
+        db, RevokedToken,
+        [{
+            "jti": f"{USER_REVOCATION_PREFIX}{user_id}",
+            # By then every token issued before now has expired by itself
+            "expires_at": now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+            "not_before": now,
+        }],
+        conflict_columns=["jti"], update_columns=["expires_at", "not_before"],
+    )
+    db.commit()
+    with _revoked_lock:
+        _user_not_before[user_id] = calendar.timegm(now.utctimetuple())
+
+
+def decode_access_token(token: str) -> dict:
+    try:
+        return jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM],
+            options={"require": ["sub", "role", "jti", "exp"]},
+        )
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+def get_token_principal(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Optional[Principal]:
+    """Principal from the bearer token, or None when the request has no token."""
+    if credentials is None:
+        return None
+
+    claims = decode_access_token(credentials.credentials)
+    try:
+        user_id = int(claims["sub"])
+        role = UserRole(claims["role"])
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    if is_revoked(claims["jti"], user_id, claims.get("iat")):
+        raise HTTPException(status_code=401, detail="Token revoked")
+
+    return Principal(
+        user_id=user_id,
+        role=role,
+        college_id=claims.get("college_id"),
+        branch_id=claims.get("branch_id"),
+        token_id=claims["jti"],
+    )
+
+
+def authorize(
+    db: Session,
+    role: UserRole,
+    principal: Optional[Principal],
+    user_id: Optional[int],
+    detail: str,
+) -> Principal:
+    """Check the caller has `role` and return it with its college/branch scope.
+
+    A bearer token is authoritative for the role. Requests that still pass
+    a raw id query parameter are resolved through the principal cache, as
+    are tokens issued before the user was given a college or branch. A
+    token's scope stays trustworthy because replacing an admin revokes the
+    previous admin's tokens (revoke_user_tokens).
+    """
+    if principal is not None:
+        if principal.role != role:
+            raise HTTPException(status_code=403, detail=detail)
+        if principal.college_id is not None or role == UserRole.APP_ADMIN:
+            return principal
+        user_id = principal.user_id
+
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    scope = principal_cache.get_scope(db, user_id)
+    if not scope or scope.role != role or not scope.active:
+        raise HTTPException(status_code=403, detail=detail)
+
+    return Principal(
+        user_id=user_id,
+        role=scope.role,
+        college_id=scope.college_id,
+        branch_id=scope.branch_id,
+        token_id=principal.token_id if principal else None,
+    )
@@ -0,0 +1,81 @@
+# src/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+from src.core import prometheus_metrics
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    Anything with the same get/get_current/set/delete/clear/stats methods
+    (e.g. a thin Redis wrapper) can stand in for it where a shared backend
+    is needed.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, name: str = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        # Named caches also report lookups to /metrics
+        self._hit_counter = self._miss_counter = None
+        if name:
+            self._hit_counter = prometheus_metrics.cache_requests.labels(name, "hit")
+            self._miss_counter = prometheus_metrics.cache_requests.labels(name, "miss")
+
+    def get(self, key, default=None):
+        return self.get_current(key, None, default)
+
+    def get_current(self, key, is_current, default=None):
+        """get(), where an entry failing `is_current(value)` is dropped and
+        counted as a stale miss, checked and counted under the cache's lock."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                hit = False
+            elif is_current is not None and not is_current(item[1]):
+                del self._data[key]
+                self.misses += 1
+                self.stale += 1
+                hit = False
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                hit = True
+
+        if self._hit_counter is not None:
+            (self._hit_counter if hit else self._miss_counter).inc()
+        return item[1] if hit else default
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_reads": self.stale,
+            }
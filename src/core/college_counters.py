@@ -0,0 +1,74 @@
+# src/core/college_counters.py
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from src.db import shards
+from src.db.models import College, Branch, Student
+
+
+def increment(db: Session, college_id: int, students: int = 0, branches: int = 0) -> None:
+    # Call before the writer's commit so the counters move with the row they count
+    values = {}
+    if students:
+        values[College.total_students] = College.total_students + students
+    if branches:
+        values[College.total_branches] = College.total_branches + branches
+    if values:
+        db.query(College).filter(College.id == college_id).update(
+            values, synchronize_session=False
+        )
+
+
+def _reconcile_sharded(db: Session, branch_count) -> int:
+    # Student counts are gathered from every shard in parallel, then written
+    # back in one executemany
+    counts = {}
+    for rows in shards.owned_counts(db).values():
+        counts.update(rows)
+
+    college_ids = db.scalars(select(College.id)).all()
+    if college_ids:
+        # Core table: an ORM update with a parameter list means bulk-by-primary-key
+        college = College.__table__
+        db.execute(
+            update(college)
+            .where(college.c.id == bindparam("college_id"))
+            .values(total_students=bindparam("students"), total_branches=branch_count),
+            [{"college_id": c, "students": counts.get(c, 0)} for c in college_ids],
+        )
+    db.commit()
+    return len(college_ids)
+
+
+def reconcile(db: Session) -> int:
+    """Recompute every college's counters from the source tables in one statement."""
+    branch_count = (
+        select(func.count(Branch.id))
+        .where(Branch.college_id == College.id)
+        .scalar_subquery()
+    )
+    if shards.enabled():
+        return _reconcile_sharded(db, branch_count)
+
+    student_count = (
+        select(func.count(Student.id))
+        .where(Student.college_id == College.id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(College)
+        .values(total_students=student_count, total_branches=branch_count)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from src.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Reconciled counters for {reconcile(db)} colleges")
+    finally:
+        db.close()
@@ -0,0 +1,172 @@
+# src/core/compression.py
+"""Negotiated gzip/brotli compression of response bodies.
+
+The coding is picked from the request's Accept-Encoding (q-values and `*`
+honoured): brotli when the `brotli` package is installed, else gzip. A
+response is compressed when its content type is text-like and either its
+body is at least `minimum_size` bytes or it is streamed (exports), in which
+case every chunk is flushed through the compressor as it arrives. Files
+(PDFs, Parquet), range responses and already-encoded bodies pass through.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from src.core import prometheus_metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def available() -> tuple:
+    # In order of preference when the client accepts several equally
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _accepted(accept_encoding: str) -> dict:
+    codings = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[name] = q
+    return codings
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The best coding both sides support, or None to send the body as is."""
+    codings = _accepted(accept_encoding)
+    wildcard = codings.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in available():
+        q = codings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").lower()
+    return (
+        content_type.startswith(COMPRESSIBLE_TYPES)
+        and "content-encoding" not in headers
+        and "content-range" not in headers
+    )
+
+
+class Encoder:
+    def __init__(self, coding: str, gzip_level: int = 6, brotli_quality: int = 4):
+        self.coding = coding
+        self.raw_bytes = 0
+        self.sent_bytes = 0
+        if coding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._process = self._compressor.process
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+        else:
+            # wbits 16 + 15: a gzip header and trailer around the deflate stream
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._process = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+
+    def chunk(self, data: bytes, last: bool) -> bytes:
+        """Compress one piece of the body; `last` ends the stream."""
+        out = self._process(data) + (self._finish() if last else self._flush())
+        self.raw_bytes += len(data)
+        self.sent_bytes += len(out)
+        if last:
+            prometheus_metrics.http_compression_bytes.labels(self.coding, "raw").inc(self.raw_bytes)
+            prometheus_metrics.http_compression_bytes.labels(self.coding, "sent").inc(self.sent_bytes)
+        return out
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start = None
+        encoder = None
+
+        async def send_compressed(message):
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows how large the body is
+                start = message
+                return
+
+            if message["type"] != "http.response.body":
+                # pathsend and friends: the server writes the file itself
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                if compressible(headers):
+                    headers.add_vary_header("Accept-Encoding")
+                    if coding is not None and (more_body or len(body) >= self.minimum_size):
+                        encoder = Encoder(coding, self.gzip_level, self.brotli_quality)
+                        headers["Content-Encoding"] = coding
+                        if "content-length" in headers:
+                            del headers["content-length"]
+                        # Byte-for-byte identity no longer holds; If-None-Match
+                        # still matches it (see material_files.etag_matches)
+                        etag = headers.get("etag")
+                        if etag and not etag.startswith("W/"):
+                            headers["ETag"] = f"W/{etag}"
+                        if not more_body:
+                            body = encoder.chunk(body, last=True)
+                            headers["Content-Length"] = str(len(body))
+                            await send(start)
+                            start = None
+                            await send({"type": "http.response.body", "body": body})
+                            return
+                await send(start)
+                start = None
+
+            if encoder is not None:
+                message = {
+                    "type": "http.response.body",
+                    "body": encoder.chunk(body, last=not more_body),
+                    "more_body": more_body,
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -9,14 +9,64 @@ class Settings(BaseSettings):
     DB_HOST: str
     DB_PORT: int
     DB_NAME: str
+    DB_ASYNC: bool = False
+    # Full SQLAlchemy URL overriding the DB_* parts above, e.g. sqlite:///local.db
+    DB_URL: str = ""
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Open each pool's connections and fill the caches before serving
+    STARTUP_WARM_UP: bool = True
+
+    # Comma-separated SQLAlchemy URLs of read replicas
+    DB_REPLICA_URLS: str = ""
+    DB_REPLICA_HEALTH_INTERVAL: int = 10
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    # Comma-separated name=url pairs; colleges not mapped to one stay on the primary
+    DB_SHARD_URLS: str = ""
+    SHARD_MAP_TTL_SECONDS: int = 30
+    SHARD_SCATTER_WORKERS: int = 8
+
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_EXPLAIN: bool = True
 
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = 30
+
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
 
     SMTP_EMAIL: str
     SMTP_PASSWORD: str
 
+    MATERIALS_DIR: str = "materials"
+
+    # Worker processes serving the app (uvicorn/gunicorn --workers)
+    WEB_CONCURRENCY: int = 1
+    HASH_WORKERS: int = 0
+    HASH_MAX_PENDING: int = 64
+    HASH_QUEUE_TIMEOUT: float = 5.0
+
+    DASHBOARD_CACHE_TTL_SECONDS: int = 300
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 1024
+    DASHBOARD_TOP_N: int = 10
+    STUDENT_DASHBOARD_CACHE_TTL_SECONDS: int = 300
+    STUDENT_DASHBOARD_CACHE_MAX_ENTRIES: int = 20000
+    LEADERBOARD_MAX_N: int = 100
+
+    PROMETHEUS_MULTIPROC_DIR: str = ""
+
+    # Bodies smaller than this are sent uncompressed; streamed ones always are
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,47 @@
+# src/core/dashboard_snapshot.py
+from sqlalchemy.orm import Session
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.db.models import College
+
+# Snapshots are tagged with College.dashboard_generation. Writers bump that
+# column in the same transaction as their change, so any worker holding an
+# older snapshot sees the mismatch on its next read, even if the in-process
+# delete below only reached the worker that handled the write.
+backend = TTLCache(
+    maxsize=settings.DASHBOARD_CACHE_MAX_ENTRIES,
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    name="dashboard_snapshot",
+)
+
+
+def set_backend(new_backend) -> None:
+    global backend
+    backend = new_backend
+
+
+def get(college_id: int, generation: int):
+    # Checked under the cache's lock, so a stale read can neither be counted
+    # as a hit nor drop a fresh snapshot another thread just put
+    return backend.get_current(college_id, lambda snapshot: snapshot["generation"] == generation)
+
+
+def put(college_id: int, snapshot: dict) -> None:
+    backend.set(college_id, snapshot)
+
+
+def bump_generation(db: Session, college_id: int) -> None:
+    # Call before the writer's commit so the bump is part of its transaction
+    db.query(College).filter(College.id == college_id).update(
+        {College.dashboard_generation: College.dashboard_generation + 1},
+        synchronize_session=False,
+    )
+
+
+def invalidate(college_id: int) -> None:
+    backend.delete(college_id)
+
+
+def stats() -> dict:
+    return backend.stats()
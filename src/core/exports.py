@@ -0,0 +1,225 @@
+# src/core/exports.py
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, func, select
+from sqlalchemy.orm import Session
+
+from src.db.models import Branch, Course, Student, StudentCourse, StudentMarks, Subject
+
+# Rows are pulled off a server-side cursor BATCH_SIZE at a time and each
+# batch is encoded and handed to the response before the next is fetched,
+# so memory stays flat however large the college is.
+BATCH_SIZE = 1000
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _students(college_id: int):
+    return (
+        select(
+            Student.id.label("student_id"),
+            Student.roll_number,
+            Student.first_name,
+            Student.last_name,
+            Student.gender,
+            Student.date_of_birth,
+            Student.current_year,
+            Student.cgpa,
+            Student.is_active,
+            Branch.id.label("branch_id"),
+            Branch.branch_name,
+        )
+        .join(Branch, Branch.id == Student.branch_id)
+        .where(Student.college_id == college_id)
+        .order_by(Student.id)
+    )
+
+
+def _marks(college_id: int):
+    # (student id, subject id) order follows uq_student_subject_marks
+    return (
+        select(
+            Student.id.label("student_id"),
+            Student.roll_number,
+            Course.id.label("course_id"),
+            Course.course_name,
+            Subject.id.label("subject_id"),
+            Subject.subject_name,
+            Subject.total_marks,
+            StudentMarks.marks_obtained,
+            StudentMarks.percentage,
+            StudentMarks.updated_at,
+        )
+        .join(StudentMarks, StudentMarks.student_id == Student.id)
+        .join(Subject, Subject.id == StudentMarks.subject_id)
+        .join(Course, Course.id == Subject.course_id)
+        .where(Student.college_id == college_id)
+        .order_by(Student.id, StudentMarks.subject_id)
+    )
+
+
+def _courses(college_id: int):
+    subject_count = (
+        select(func.count(Subject.id)).where(Subject.course_id == Course.id).scalar_subquery()
+    )
+    enrolled = (
+        select(func.count(StudentCourse.id)).where(StudentCourse.course_id == Course.id).scalar_subquery()
+    )
+    return (
+        select(
+            Course.id.label("course_id"),
+            Course.course_name,
+            Course.year,
+            Course.is_active,
+            Branch.id.label("branch_id"),
+            Branch.branch_name,
+            subject_count.label("subject_count"),
+            enrolled.label("enrolled_students"),
+        )
+        .join(Branch, Branch.id == Course.branch_id)
+        .where(Branch.college_id == college_id)
+        .order_by(Course.id)
+    )
+
+
+DATASETS = {
+    "students": _students,
+    "marks": _marks,
+    "courses": _courses,
+}
+
+
+def _plain(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv(result, query):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(result.keys())
+    for rows in result.partitions():
+        writer.writerows([_plain(v) for v in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header only: the college has no rows
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson(result, query):
+    keys = list(result.keys())
+    for rows in result.partitions():
+        yield "".join(
+            json.dumps(dict(zip(keys, map(_plain, row))), default=_json_default) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+# ---- parquet ----
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _Sink:
+    """Write-only file object that ParquetWriter fills and the response drains."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_type(pa, column_type):
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def _parquet(result, query):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # The schema comes from the query, not from the first batch, so a batch
+    # of all-NULL values cannot change a column's type
+    schema = pa.schema([(c.name, _arrow_type(pa, c.type)) for c in query.selected_columns])
+    sink = _Sink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in result.partitions():
+            columns = list(zip(*rows))
+            batch = pa.RecordBatch.from_arrays(
+                [
+                    pa.array([_plain(v) for v in values], type=field.type)
+                    for values, field in zip(columns, schema)
+                ],
+                schema=schema,
+            )
+            # One row group per batch, written through to the sink
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+WRITERS = {
+    "csv": _csv,
+    "ndjson": _ndjson,
+    "parquet": _parquet,
+}
+
+
+def stream(session: Session, dataset: str, college_id: int, format: str):
+    """Encoded chunks of `dataset` for a college; closes `session` when done."""
+    query = DATASETS[dataset](college_id)
+    try:
+        result = session.execute(query.execution_options(yield_per=BATCH_SIZE))
+        yield from WRITERS[format](result, query)
+    finally:
+        session.close()
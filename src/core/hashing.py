@@ -0,0 +1,211 @@
+# src/core/hashing.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+from src.core.config import settings
+from src.core.metrics import Histogram
+
+# Use pbkdf2_sha256 instead of bcrypt for Windows & length safety
+pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+
+class HashingQueueFull(Exception):
+    pass
+
+
+# ---- runs in the worker processes ----
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+
+def _hash_batch(passwords: list) -> list:
+    return [pwd_context.hash(p) for p in passwords]
+
+
+# ---- parent side ----
+
+# Every web worker process starts its own pool; together they share the cores
+_workers = settings.HASH_WORKERS or max((os.cpu_count() or 1) // max(settings.WEB_CONCURRENCY, 1), 1)
+_executor = None
+_executor_lock = threading.Lock()
+# Queue slots. Handlers wait for one on the event loop; the threading
+# semaphore is only for sync callers (warm_up), which may block
+_slots = threading.BoundedSemaphore(settings.HASH_MAX_PENDING)
+_async_slots = None
+_async_slots_loop = None
+
+_stats_lock = threading.Lock()
+_pending = 0
+_completed = 0
+_rejected = 0
+queue_wait_histogram = Histogram()
+latency_histogram = Histogram()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=_workers)
+    return _executor
+
+
+def _reject():
+    global _rejected
+    with _stats_lock:
+        _rejected += 1
+    raise HashingQueueFull("Too many password operations queued, try again shortly")
+
+
+def _submit(release, fn, *args):
+    # Caller must already hold a slot; `release` frees it when the job finishes
+    global _pending
+    submitted_at = time.perf_counter()
+    with _stats_lock:
+        _pending += 1
+
+    def _done(future):
+        global _pending, _completed
+        elapsed = time.perf_counter() - submitted_at
+        with _stats_lock:
+            _pending -= 1
+            _completed += 1
+        release()
+        latency_histogram.observe(elapsed)
+        if not future.cancelled() and future.exception() is None:
+            queue_wait_histogram.observe(max(elapsed - future.result()[1], 0.0))
+
+    try:
+        future = _get_executor().submit(_timed, fn, *args)
+    except Exception:
+        with _stats_lock:
+            _pending -= 1
+        release()
+        raise
+    future.add_done_callback(_done)
+    return future
+
+
+def _get_async_slots() -> asyncio.Semaphore:
+    # An asyncio.Semaphore belongs to one event loop
+    global _async_slots, _async_slots_loop
+    loop = asyncio.get_running_loop()
+    if _async_slots_loop is not loop:
+        _async_slots = asyncio.Semaphore(settings.HASH_MAX_PENDING)
+        _async_slots_loop = loop
+    return _async_slots
+
+
+async def _acquire_async():
+    """Wait on the event loop for a queue slot; returns its release callback.
+
+    Waiting holds no thread, so a burst of logins cannot take over the
+    threadpool the sync routes run in.
+    """
+    slots = _get_async_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), settings.HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _reject()
+    loop = asyncio.get_running_loop()
+
+    def release():
+        # Jobs finish on the executor's thread
+        try:
+            loop.call_soon_threadsafe(slots.release)
+        except RuntimeError:
+            pass  # loop already closed
+
+    return release
+
+
+async def _run_async(fn, *args):
+    release = await _acquire_async()
+    result, _ = await asyncio.wrap_future(_submit(release, fn, *args))
+    return result
+
+
+# Handlers await these; nothing on a request path blocks on the pool
+
+async def hash_password_async(password: str) -> str:
+    return await _run_async(_hash, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _run_async(_verify, plain, hashed)
+
+
+def _batches(passwords: list) -> list:
+    # One job per worker process
+    size = -(-len(passwords) // _workers)
+    return [passwords[i:i + size] for i in range(0, len(passwords), size)]
+
+
+async def hash_many_async(passwords: list) -> list:
+    """Hash a batch, split into one job per worker process."""
+    if not passwords:
+        return []
+
+    futures = []
+    try:
+        for batch in _batches(passwords):
+            release = await _acquire_async()
+            futures.append(_submit(release, _hash_batch, batch))
+    except HashingQueueFull:
+        for future in futures:
+            future.cancel()
+        raise
+
+    hashes = []
+    for result, _ in await asyncio.gather(*(asyncio.wrap_future(f) for f in futures)):
+        hashes.extend(result)
+    return hashes
+
+
+def warm_up() -> None:
+    """Start every worker process now rather than on the first logins.
+
+    Runs at startup, off the event loop, so it may block on the pool.
+    """
+    futures = []
+    for _ in range(_workers):
+        if not _slots.acquire(timeout=settings.HASH_QUEUE_TIMEOUT):
+            _reject()
+        futures.append(_submit(_slots.release, _hash, "warm-up"))
+    for future in futures:
+        future.result()
+
+
+def stats() -> dict:
+    with _stats_lock:
+        pending = _pending
+        completed = _completed
+        rejected = _rejected
+
+    return {
+        "workers": _workers,
+        "max_pending": settings.HASH_MAX_PENDING,
+        "pending": pending,
+        "queue_depth": max(pending - _workers, 0),
+        "completed": completed,
+        "rejected": rejected,
+        "queue_wait_seconds": queue_wait_histogram.snapshot(),
+        "latency_seconds": latency_histogram.snapshot(),
+    }
@@ -0,0 +1,152 @@
+# src/core/leaderboard.py
+from typing import Optional
+
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from src.db.models import Branch, Student
+
+RANK_BATCH = 1000
+
+# Backward scan of the (…, cgpa) indexes, whose entries end in the primary key
+ORDER = (Student.cgpa.desc(), Student.id.desc())
+
+
+def _scope(college_id: int, branch_id: Optional[int] = None, year: Optional[int] = None) -> list:
+    filters = [Student.college_id == college_id]
+    if branch_id is not None:
+        filters.append(Student.branch_id == branch_id)
+    if year is not None:
+        filters.append(Student.current_year == year)
+    return filters
+
+
+def top(
+    db: Session, college_id: int, limit: int,
+    branch_id: Optional[int] = None, year: Optional[int] = None,
+) -> list:
+    """Top `limit` students of a college, optionally within one branch and/or year.
+
+    `rank` is the competition rank within the requested scope (exact, since
+    the list starts at the top); `college_rank` is the precomputed rank
+    across the whole college. `db` is a session on the college's shard.
+    """
+    rows = db.query(
+        Student.first_name,
+        Student.last_name,
+        Student.roll_number,
+        Branch.branch_name,
+        Student.current_year,
+        Student.cgpa,
+        Student.cgpa_rank,
+    ).join(Branch, Branch.id == Student.branch_id)\
+     .filter(*_scope(college_id, branch_id, year))\
+     .order_by(*ORDER).limit(limit).all()
+
+    leaders = []
+    rank = 0
+    previous = None
+    for position, row in enumerate(rows, 1):
+        if position == 1 or row.cgpa != previous:
+            rank = position
+            previous = row.cgpa
+        leaders.append({
+            "rank": rank,
+            "college_rank": row.cgpa_rank,
+            "student_name": f"{row.first_name} {row.last_name}",
+            "roll_number": row.roll_number,
+            "branch_name": row.branch_name,
+            "current_year": row.current_year,
+            "cgpa": row.cgpa,
+        })
+    return leaders
+
+
+def _ranks_in_sql(db: Session) -> bool:
+    # RANK() OVER and a joined UPDATE: SQLite 3.33+, MySQL 8+, MariaDB 10.2+
+    dialect = db.get_bind().dialect
+    version = dialect.server_version_info or ()
+    if dialect.name == "sqlite":
+        return version >= (3, 33)
+    if dialect.name == "mysql":
+        return version >= ((10, 2) if dialect.is_mariadb else (8, 0))
+    return True
+
+
+def recompute_ranks(db: Session, college_id: int) -> int:
+    """Rewrite Student.cgpa_rank for a college after its CGPAs changed.
+
+    One UPDATE joined to a RANK() OVER (cgpa) derived table, touching only
+    the rows whose rank moved; nothing is read back into Python. Databases
+    without window functions fall back to ranking in Python. The caller
+    commits. Returns the number of rows updated.
+    """
+    if not _ranks_in_sql(db):
+        return _recompute_ranks_in_python(db, college_id)
+
+    ranked = select(
+        Student.id.label("student_id"),
+        func.rank().over(order_by=Student.cgpa.desc()).label("rank"),
+    ).where(Student.college_id == college_id).subquery("ranked")
+
+    # Core table: UPDATE ... FROM (UPDATE student, (...) ranked on MySQL)
+    student = Student.__table__
+    result = db.execute(
+        update(student)
+        .where(
+            student.c.id == ranked.c.student_id,
+            or_(student.c.cgpa_rank.is_(None), student.c.cgpa_rank != ranked.c.rank),
+        )
+        .values(cgpa_rank=ranked.c.rank)
+    )
+    return result.rowcount
+
+
+def _recompute_ranks_in_python(db: Session, college_id: int) -> int:
+    # Reads (id, cgpa) in index order and updates only the rows whose rank
+    # moved, in executemany batches
+    rows = db.query(Student.id, Student.cgpa, Student.cgpa_rank)\
+        .filter(Student.college_id == college_id)\
+        .order_by(*ORDER).all()
+
+    changes = []
+    rank = 0
+    previous = None
+    for position, row in enumerate(rows, 1):
+        if position == 1 or row.cgpa != previous:
+            rank = position
+            previous = row.cgpa
+        if row.cgpa_rank != rank:
+            changes.append({"student_id": row.id, "rank": rank})
+
+    # Core table: an ORM update with a parameter list means bulk-by-primary-key
+    student = Student.__table__
+    stmt = update(student)\
+        .where(student.c.id == bindparam("student_id"))\
+        .values(cgpa_rank=bindparam("rank"))
+    for i in range(0, len(changes), RANK_BATCH):
+        db.execute(stmt, changes[i:i + RANK_BATCH])
+    return len(changes)
+
+
+def standing(db: Session, student, total_students: int) -> dict:
+    """Rank and percentile of one student within their college.
+
+    `total_students` is the college's maintained counter. Students added
+    since the last recompute have no stored rank yet; theirs is counted
+    from the (college_id, cgpa) index instead.
+    """
+    rank = student.cgpa_rank
+    if rank is None:
+        rank = db.query(func.count(Student.id)).filter(
+            Student.college_id == student.college_id,
+            Student.cgpa > (student.cgpa or 0.0),
+        ).scalar() + 1
+
+    total_students = max(total_students, rank)
+    return {
+        "rank": rank,
+        "total_students": total_students,
+        # Share of the college ranked at or below the student
+        "percentile": round((total_students - rank + 1) * 100.0 / total_students, 2),
+    }
@@ -0,0 +1,180 @@
+# src/core/marks_import.py
+from datetime import datetime
+
+from pydantic import ValidationError
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from src.core import dashboard_snapshot, leaderboard, student_view
+from src.core.student_import import format_validation_error
+from src.db.models import Course, Student, StudentCourse, StudentMarks, Subject
+from src.db.upsert import insert_ignore, upsert
+from src.schemas.marks_schema import MarksRowSchema
+
+CHUNK_SIZE = 2000
+RECOMPUTE_BATCH = 1000
+
+
+def import_chunk(db: Session, branch_id: int, rows: list) -> tuple:
+    """Upsert one chunk of (line_no, row) marks rows for a branch.
+
+    `db` is a session on the college's shard. Returns (upserted_count,
+    errors, affected_student_ids).
+    """
+    errors = []
+    valid = []
+
+    for line_no, row in rows:
+        if isinstance(row, Exception):
+            errors.append({"line": line_no, "error": str(row)})
+            continue
+        try:
+            valid.append((line_no, MarksRowSchema(**row)))
+        except ValidationError as e:
+            errors.append({"line": line_no, "error": format_validation_error(e)})
+
+    if not valid:
+        return 0, errors, set()
+
+    # Resolve students (by id or roll number) and subjects for the whole
+    # chunk in one query each, scoped to the admin's branch
+    ids = {r.student_id for _, r in valid if r.student_id is not None}
+    rolls = {r.roll_number for _, r in valid if r.student_id is None}
+    students = db.query(Student.id, Student.roll_number).filter(
+        Student.branch_id == branch_id,
+        or_(Student.id.in_(ids), Student.roll_number.in_(rolls)),
+    ).all()
+    known_ids = {s.id for s in students}
+    id_by_roll = {s.roll_number: s.id for s in students}
+
+    subjects = {
+        s.id: s
+        for s in db.query(Subject.id, Subject.total_marks, Subject.course_id)
+        .join(Course, Course.id == Subject.course_id)
+        .filter(
+            Course.branch_id == branch_id,
+            Subject.id.in_({r.subject_id for _, r in valid}),
+        )
+        .all()
+    }
+
+    now = datetime.utcnow()
+    marks_rows = {}
+    for line_no, r in valid:
+        student_id = r.student_id if r.student_id is not None else id_by_roll.get(r.roll_number)
+        if student_id is None or student_id not in known_ids:
+            errors.append({"line": line_no, "error": "Student not found in this branch"})
+            continue
+        subject = subjects.get(r.subject_id)
+        if subject is None:
+            errors.append({"line": line_no, "error": "Subject not found in this branch"})
+            continue
+        if not subject.total_marks or subject.total_marks <= 0:
+            errors.append({"line": line_no, "error": "Subject has no positive total_marks"})
+            continue
+        if r.marks_obtained > subject.total_marks:
+            errors.append({"line": line_no, "error": "marks_obtained exceeds total_marks"})
+            continue
+
+        # A later line for the same student/subject replaces an earlier one
+        marks_rows[(student_id, r.subject_id)] = {
+            "student_id": student_id,
+            "subject_id": r.subject_id,
+            "marks_obtained": r.marks_obtained,
+            "percentage": round(r.marks_obtained * 100.0 / subject.total_marks, 2),
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    if not marks_rows:
+        return 0, errors, set()
+
+    try:
+        upsert(
+            db, StudentMarks, list(marks_rows.values()),
+            conflict_columns=["student_id", "subject_id"],
+            update_columns=["marks_obtained", "percentage", "updated_at"],
+        )
+        # Marks imply enrollment; existing enrollments are left untouched
+        enrollments = {
+            (student_id, subjects[subject_id].course_id)
+            for student_id, subject_id in marks_rows
+        }
+        insert_ignore(
+            db, StudentCourse,
+            [
+                {"student_id": s, "course_id": c, "enrolled_at": now, "updated_at": now}
+                for s, c in enrollments
+            ],
+            conflict_columns=["student_id", "course_id"],
+        )
+        db.commit()
+    except Exception:
+        # Leaves the session usable for recomputing earlier, committed chunks
+        db.rollback()
+        raise
+
+    return len(marks_rows), errors, {student_id for student_id, _ in marks_rows}
+
+
+def recompute(db: Session, sdb: Session, college_id: int, student_ids: set) -> None:
+    """Recompute course percentage and CGPA for the given students only.
+
+    Both are weighted by Subject.total_marks: course percentage is
+    sum(obtained) / sum(total) * 100 over the course's subjects, and CGPA
+    is the same ratio over all subjects on a 10-point scale. Any CGPA change
+    can move other students' ranks, so the college's ranks are rewritten
+    too. The updates run on the shard session `sdb`; the dashboard
+    generation lives on `db`.
+    """
+    student_ids = sorted(student_ids)
+    now = datetime.utcnow()
+
+    for i in range(0, len(student_ids), RECOMPUTE_BATCH):
+        batch = student_ids[i:i + RECOMPUTE_BATCH]
+
+        course_percentage = (
+            select(func.coalesce(func.round(
+                func.sum(StudentMarks.marks_obtained) * 100.0 / func.sum(Subject.total_marks), 2
+            ), 0.0))
+            .select_from(StudentMarks)
+            .join(Subject, Subject.id == StudentMarks.subject_id)
+            .where(
+                StudentMarks.student_id == StudentCourse.student_id,
+                Subject.course_id == StudentCourse.course_id,
+            )
+            .scalar_subquery()
+        )
+        sdb.execute(
+            update(StudentCourse)
+            .where(StudentCourse.student_id.in_(batch))
+            .values(course_percentage=course_percentage, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+        cgpa = (
+            select(func.coalesce(func.round(
+                func.sum(StudentMarks.marks_obtained) * 10.0 / func.sum(Subject.total_marks), 2
+            ), 0.0))
+            .select_from(StudentMarks)
+            .join(Subject, Subject.id == StudentMarks.subject_id)
+            .where(StudentMarks.student_id == Student.id)
+            .scalar_subquery()
+        )
+        sdb.execute(
+            update(Student)
+            .where(Student.id.in_(batch))
+            .values(
+                cgpa=cgpa,
+                dashboard_generation=Student.dashboard_generation + 1,
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    leaderboard.recompute_ranks(sdb, college_id)
+    dashboard_snapshot.bump_generation(db, college_id)
+    sdb.commit()
+    db.commit()
+    dashboard_snapshot.invalidate(college_id)
+    student_view.invalidate(college_id, *student_ids)
@@ -0,0 +1,82 @@
+# src/core/material_cache.py
+import json
+import os
+import threading
+
+import PyPDF2
+
+from src.core import prometheus_metrics
+
+SIDECAR_SUFFIX = ".pages.json"
+
+_hits = prometheus_metrics.cache_requests.labels("material_pages", "hit")
+_misses = prometheus_metrics.cache_requests.labels("material_pages", "miss")
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def file_key(file_path: str):
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _extract_pages(file_path: str) -> list:
+    with open(file_path, "rb") as pdf_file:
+        reader = PyPDF2.PdfReader(pdf_file)
+        return [page.extract_text() or "" for page in reader.pages]
+
+
+def read_sidecar(sidecar_path: str):
+    try:
+        with open(sidecar_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_sidecar(sidecar_path: str, data: dict) -> None:
+    tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, sidecar_path)
+    except OSError:
+        # Read-only deploy dirs are fine, we just keep the in-memory copy
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def get_pages(file_path: str) -> list:
+    """Per-page text of a PDF, extracted once per (path, mtime, size)."""
+    key = file_key(file_path)
+
+    entry = _cache.get(file_path)
+    if entry and entry[0] == key:
+        _hits.inc()
+        return entry[1]
+
+    _misses.inc()
+    with _lock:
+        # Another thread may have finished the extraction while we waited
+        entry = _cache.get(file_path)
+        if entry and entry[0] == key:
+            return entry[1]
+
+        sidecar = read_sidecar(file_path + SIDECAR_SUFFIX)
+        if sidecar and (sidecar.get("mtime_ns"), sidecar.get("size")) == key:
+            pages = sidecar["pages"]
+        else:
+            pages = _extract_pages(file_path)
+            write_sidecar(
+                file_path + SIDECAR_SUFFIX,
+                {"mtime_ns": key[0], "size": key[1], "pages": pages},
+            )
+
+        _cache[file_path] = (key, pages)
+        return pages
+
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
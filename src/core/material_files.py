@@ -0,0 +1,56 @@
+# src/core/material_files.py
+import os
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+from src.core.config import settings
+
+
+def resolve_material_path(relative_path: str) -> str:
+    """Absolute path of a registered material, refusing anything outside MATERIALS_DIR."""
+    base = os.path.realpath(settings.MATERIALS_DIR)
+    full_path = os.path.realpath(os.path.join(base, relative_path))
+    if not full_path.startswith(base + os.sep):
+        raise ValueError("Material path must be inside the materials directory")
+    return full_path
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def material_file_response(request: Request, file_path: str, filename: str, content_type: str) -> Response:
+    # FileResponse handles Range/If-Range itself and streams the file in
+    # chunks (or hands it to the server via pathsend), so the worker never
+    # holds the whole file in memory.
+    stat_result = os.stat(file_path)
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+
+    if _not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers={"etag": etag, "last-modified": last_modified})
+
+    return FileResponse(
+        file_path,
+        media_type=content_type,
+        filename=filename,
+        stat_result=stat_result,
+        headers={"etag": etag, "last-modified": last_modified},
+    )
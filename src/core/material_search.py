@@ -0,0 +1,156 @@
+# src/core/material_search.py
+import hashlib
+import html
+import math
+import re
+import threading
+
+from src.core import material_cache
+
+INDEX_SUFFIX = ".index.json"
+# Bumped when stored offsets change meaning; older sidecars are rebuilt
+INDEX_VERSION = 2
+SNIPPET_RADIUS = 80
+
+TOKEN_RE = re.compile(r"\w+")
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def tokenize(text: str):
+    # Offsets index the original text: lowercasing can change its length
+    for match in TOKEN_RE.finditer(text):
+        yield match.group().lower(), match.start()
+
+
+def _page_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _build(pages: list, previous) -> dict:
+    # postings: term -> {page_no: [char offsets]}; page numbers are 1-based
+    # strings so the structure survives a JSON round trip unchanged.
+    hashes = [_page_hash(text) for text in pages]
+    lengths = [0] * len(pages)
+    postings = {}
+    changed = set(range(len(pages)))
+
+    if previous:
+        old_hashes = previous["page_hashes"]
+        changed = {
+            i for i, h in enumerate(hashes)
+            if i >= len(old_hashes) or old_hashes[i] != h
+        }
+        for i in range(len(pages)):
+            if i not in changed:
+                lengths[i] = previous["page_lengths"][i]
+        for term, by_page in previous["postings"].items():
+            kept = {
+                p: offsets for p, offsets in by_page.items()
+                if int(p) <= len(pages) and int(p) - 1 not in changed
+            }
+            if kept:
+                postings[term] = kept
+
+    for i in changed:
+        page_no = str(i + 1)
+        count = 0
+        for term, offset in tokenize(pages[i]):
+            postings.setdefault(term, {}).setdefault(page_no, []).append(offset)
+            count += 1
+        lengths[i] = count
+
+    return {"page_hashes": hashes, "page_lengths": lengths, "postings": postings}
+
+
+def get_index(file_path: str) -> dict:
+    key = material_cache.file_key(file_path)
+
+    entry = _indexes.get(file_path)
+    if entry and entry[0] == key:
+        return entry[1]
+
+    with _lock:
+        entry = _indexes.get(file_path)
+        if entry and entry[0] == key:
+            return entry[1]
+
+        stored = material_cache.read_sidecar(file_path + INDEX_SUFFIX)
+        if stored and stored.get("version") != INDEX_VERSION:
+            stored = None
+        if stored and (stored.get("mtime_ns"), stored.get("size")) == key:
+            index = stored["index"]
+        else:
+            # File changed: only pages whose text differs get re-tokenized
+            previous = entry[1] if entry else (stored or {}).get("index")
+            index = _build(material_cache.get_pages(file_path), previous)
+            material_cache.write_sidecar(
+                file_path + INDEX_SUFFIX,
+                {"version": INDEX_VERSION, "mtime_ns": key[0], "size": key[1], "index": index},
+            )
+
+        _indexes[file_path] = (key, index)
+        return index
+
+
+def _snippet(text: str, offset: int, terms: set) -> str:
+    start = max(0, offset - SNIPPET_RADIUS)
+    end = min(len(text), offset + SNIPPET_RADIUS)
+    window = text[start:end]
+
+    # Page text is untrusted: escape every segment, only the marks are markup
+    pattern = re.compile(
+        r"(?<!\w)(?:" + "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)) + r")(?!\w)",
+        re.IGNORECASE,
+    )
+    parts = []
+    last = 0
+    for match in pattern.finditer(window):
+        parts.append(html.escape(window[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        last = match.end()
+    parts.append(html.escape(window[last:]))
+
+    snippet = "".join(parts).replace("\n", " ").strip()
+    if start > 0:
+        snippet = "..." + snippet
+    if end < len(text):
+        snippet = snippet + "..."
+    return snippet
+
+
+def search(file_path: str, query: str, top_k: int = 5) -> dict:
+    index = get_index(file_path)
+    postings = index["postings"]
+    lengths = index["page_lengths"]
+    total_pages = len(lengths)
+
+    terms = {term for term, _ in tokenize(query)}
+    scores = {}
+    first_offset = {}
+
+    for term in terms:
+        by_page = postings.get(term)
+        if not by_page:
+            continue
+        idf = math.log(1 + total_pages / len(by_page))
+        for page_no, offsets in by_page.items():
+            length = lengths[int(page_no) - 1] or 1
+            scores[page_no] = scores.get(page_no, 0.0) + len(offsets) / math.sqrt(length) * idf
+            first_offset[page_no] = min(first_offset.get(page_no, offsets[0]), offsets[0])
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], int(item[0])))[:top_k]
+    pages = material_cache.get_pages(file_path)
+
+    return {
+        "total_hits": len(scores),
+        "results": [
+            {
+                "page": int(page_no),
+                "score": round(score, 4),
+                "snippet": _snippet(pages[int(page_no) - 1], first_offset[page_no], terms),
+            }
+            for page_no, score in ranked
+        ],
+    }
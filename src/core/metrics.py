@@ -0,0 +1,36 @@
+# src/core/metrics.py
+import bisect
+import threading
+
+# Seconds; shared by the DB and request timing histograms
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram: observe() is a bisect plus two adds under a lock."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+
+        # Cumulative counts, the way Prometheus "le" buckets are reported
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative.append(("+Inf" if bound == float("inf") else bound, running))
+
+        return {"count": running, "sum": round(total, 6), "buckets": cumulative}
@@ -0,0 +1,75 @@
+# src/core/principal_cache.py
+from collections import namedtuple
+
+from sqlalchemy.orm import Session
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.db import shards
+from src.db.models import Branch, College, Student, User, UserRole
+
+Scope = namedtuple("Scope", ["role", "college_id", "branch_id", "active"])
+
+_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    name="principal",
+)
+
+
+def _load(db: Session, user_id: int):
+    # One round trip for the role and whichever college/branch the user owns
+    # or belongs to
+    row = (
+        db.query(
+            User.role,
+            User.is_active,
+            College.id.label("admin_college_id"),
+            Branch.id.label("admin_branch_id"),
+            Branch.college_id.label("branch_college_id"),
+            Student.college_id.label("student_college_id"),
+            Student.branch_id.label("student_branch_id"),
+        )
+        .outerjoin(College, College.college_admin_id == User.id)
+        .outerjoin(Branch, Branch.branch_admin_id == User.id)
+        .outerjoin(Student, Student.user_id == User.id)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None:
+        return None
+
+    student_college_id, student_branch_id = row.student_college_id, row.student_branch_id
+    if row.role == UserRole.STUDENT and student_college_id is None:
+        # Students of sharded colleges have no row on the primary
+        student = shards.find_student(user_id)
+        if student is not None:
+            student_college_id, student_branch_id = student
+
+    return Scope(
+        role=row.role,
+        college_id=row.admin_college_id or row.branch_college_id or student_college_id,
+        branch_id=row.admin_branch_id or student_branch_id,
+        active=bool(row.is_active),
+    )
+
+
+def get_scope(db: Session, user_id: int):
+    scope = _cache.get(user_id)
+    if scope is None:
+        scope = _load(db, user_id)
+        # Unknown ids are not cached, so a user created a moment later is
+        # seen straight away
+        if scope is not None:
+            _cache.set(user_id, scope)
+    return scope
+
+
+def invalidate(*user_ids) -> None:
+    for user_id in user_ids:
+        if user_id is not None:
+            _cache.delete(user_id)
+
+
+def stats() -> dict:
+    return _cache.stats()
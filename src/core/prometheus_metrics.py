@@ -0,0 +1,141 @@
+# src/core/prometheus_metrics.py
+import os
+
+from src.core.config import settings
+
+# prometheus_client chooses between in-memory and mmap-file values when it
+# is imported, so the shared directory must be in the environment first.
+# With several uvicorn workers point every worker at the same (emptied on
+# deploy) directory and any worker's /metrics reports the merged totals.
+if settings.PROMETHEUS_MULTIPROC_DIR:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.PROMETHEUS_MULTIPROC_DIR)
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+from src.core.metrics import DEFAULT_BUCKETS
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+ROUTER_PREFIXES = ("/auth", "/app-admin", "/college-admin", "/branch-admin", "/student")
+
+# ---- HTTP ----
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by router prefix, method and status code",
+    ["prefix", "method", "status"],
+)
+http_errors = Counter(
+    "http_request_errors_total", "Requests answered with a 5xx or an unhandled exception",
+    ["prefix"],
+)
+http_latency = Histogram(
+    "http_request_duration_seconds", "Request latency by router prefix",
+    ["prefix"], buckets=DEFAULT_BUCKETS,
+)
+http_in_flight = Gauge(
+    "http_requests_in_flight", "Requests currently being handled",
+    ["prefix"], multiprocess_mode="livesum",
+)
+http_compression_bytes = Counter(
+    "http_compression_bytes_total", "Compressed response bytes before (raw) and after (sent) encoding",
+    ["coding", "stage"],
+)
+
+# ---- DB pool ----
+
+db_pool_size = Gauge(
+    "db_pool_size", "Configured pool size, summed over live workers",
+    ["pool"], multiprocess_mode="livesum",
+)
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out", "Connections currently checked out",
+    ["pool"], multiprocess_mode="livesum",
+)
+db_pool_checkouts = Counter("db_pool_checkouts_total", "Connection checkouts", ["pool"])
+db_pool_timeouts = Counter("db_pool_timeouts_total", "Checkouts that hit the pool timeout", ["pool"])
+db_pool_wait = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection",
+    ["pool"], buckets=DEFAULT_BUCKETS,
+)
+
+# ---- caches ----
+
+cache_requests = Counter("cache_requests_total", "Cache lookups by result", ["cache", "result"])
+
+
+def router_prefix(path: str) -> str:
+    for prefix in ROUTER_PREFIXES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return prefix
+    return "other"
+
+
+def observe_request(prefix: str, method: str, status: int, elapsed: float) -> None:
+    http_requests.labels(prefix, method, str(status)).inc()
+    http_latency.labels(prefix).observe(elapsed)
+    if status >= 500:
+        http_errors.labels(prefix).inc()
+
+
+class _CacheHitRatioCollector:
+    """cache_hit_ratio derived at scrape time from the cache_requests counters.
+
+    Reading the source registry means the ratio is over the merged
+    counters in multiprocess mode, not just the scraped worker's.
+    """
+
+    def __init__(self, source):
+        self.source = source
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        hits = {}
+        totals = {}
+        for family in self.source.collect():
+            if family.name != "cache_requests":
+                continue
+            for sample in family.samples:
+                if not sample.name.endswith("_total"):
+                    continue
+                cache = sample.labels["cache"]
+                totals[cache] = totals.get(cache, 0.0) + sample.value
+                if sample.labels["result"] == "hit":
+                    hits[cache] = hits.get(cache, 0.0) + sample.value
+
+        ratio = GaugeMetricFamily("cache_hit_ratio", "Cache hits over lookups", labels=["cache"])
+        for cache, total in sorted(totals.items()):
+            ratio.add_metric([cache], hits.get(cache, 0.0) / total if total else 0.0)
+        yield ratio
+
+
+_registries = None
+
+
+def _get_registries() -> tuple:
+    global _registries
+    if _registries is None:
+        if MULTIPROCESS:
+            source = CollectorRegistry()
+            multiprocess.MultiProcessCollector(source)
+        else:
+            source = REGISTRY
+        derived = CollectorRegistry()
+        derived.register(_CacheHitRatioCollector(source))
+        _registries = (source, derived)
+    return _registries
+
+
+def render() -> tuple:
+    """(body, content_type) in the Prometheus text exposition format."""
+    source, derived = _get_registries()
+    return generate_latest(source) + generate_latest(derived), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    # Drops this worker's livesum gauges from the merged view
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,36 @@
+# src/core/responses.py
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def orjson_available() -> bool:
+    return orjson is not None
+
+
+def render_json(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    # What starlette's JSONResponse writes
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """The app's default response class: JSON rendered by orjson when installed.
+
+    Routes with a response_model hand this plain data already serialised by
+    pydantic, so nothing passes through jsonable_encoder; orjson then writes
+    the bytes several times faster than json.dumps. Without orjson this is
+    the stock JSONResponse.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
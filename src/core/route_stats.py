@@ -0,0 +1,41 @@
+# src/core/route_stats.py
+import threading
+
+from src.core.metrics import Histogram
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+_routes = {}
+_lock = threading.Lock()
+
+
+def _route(route: str) -> dict:
+    histograms = _routes.get(route)
+    if histograms is None:
+        with _lock:
+            histograms = _routes.setdefault(route, {
+                "latency_seconds": Histogram(),
+                "db_seconds": Histogram(),
+                "queries": Histogram(QUERY_COUNT_BUCKETS),
+                "rows": Histogram(ROW_BUCKETS),
+            })
+    return histograms
+
+
+def observe(route: str, latency: float, counter) -> None:
+    histograms = _route(route)
+    histograms["latency_seconds"].observe(latency)
+    histograms["db_seconds"].observe(counter.duration)
+    histograms["queries"].observe(counter.count)
+    histograms["rows"].observe(counter.rows)
+
+
+def stats() -> dict:
+    with _lock:
+        routes = dict(_routes)
+
+    return {
+        route: {name: h.snapshot() for name, h in histograms.items()}
+        for route, histograms in sorted(routes.items())
+    }
@@ -0,0 +1,96 @@
+# src/core/startup.py
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+# Imported first by main.py, so it must stay cheap: nothing from the app here
+logger = logging.getLogger("src.core.startup")
+
+_process_started = time.perf_counter()
+_imports = []
+_warm_up = []
+_ready_at = None
+
+
+@contextmanager
+def timed_import(name: str):
+    """Record how long the imports inside the block took (including their dependencies)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _imports.append({"module": name, "seconds": round(time.perf_counter() - start, 4)})
+
+
+def warm(step: str, fn, *args) -> bool:
+    """Run one warm-up step; failures are recorded, never raised."""
+    start = time.perf_counter()
+    error = None
+    try:
+        fn(*args)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        logger.warning("warm-up step %s failed: %s", step, error)
+    _warm_up.append({
+        "step": step,
+        "seconds": round(time.perf_counter() - start, 4),
+        "error": error,
+    })
+    return error is None
+
+
+def _fill_pool(engine) -> None:
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = [engine.connect() for _ in range(size)]
+    for connection in connections:
+        connection.close()
+
+
+def warm_up(material_files: list) -> None:
+    """Check the schema, open pooled connections and fill caches before serving.
+
+    Called from the app's lifespan. Every step is best-effort: a worker whose
+    database is briefly unreachable still starts, and the schema check runs
+    again on the first request.
+    """
+    from src.core import auth, hashing, material_cache, material_search
+    from src.core.config import settings
+    from src.db import migrations, pool_stats
+    from src.db.database import engine
+
+    warm("schema_version", migrations.check, engine)
+
+    if settings.STARTUP_WARM_UP:
+        for name, pool_engine in pool_stats.engines().items():
+            # Async engines' pools can only be filled from the event loop
+            if not pool_engine.dialect.is_async:
+                warm(f"pool:{name}", _fill_pool, pool_engine)
+        # Loads the revocation list
+        warm("token_revocations", auth.is_revoked, "")
+        for path in material_files:
+            file_name = os.path.basename(path)
+            warm(f"material_pages:{file_name}", material_cache.get_pages, path)
+            warm(f"material_index:{file_name}", material_search.get_index, path)
+        warm("hashing_workers", hashing.warm_up)
+
+    mark_ready()
+
+
+def mark_ready() -> None:
+    global _ready_at
+    _ready_at = time.perf_counter()
+    logger.info(
+        "ready in %.3fs (imports %.3fs, warm-up %.3fs)",
+        _ready_at - _process_started,
+        sum(i["seconds"] for i in _imports),
+        sum(w["seconds"] for w in _warm_up),
+    )
+
+
+def report() -> dict:
+    return {
+        "ready_seconds": round(_ready_at - _process_started, 4) if _ready_at else None,
+        "imports": sorted(_imports, key=lambda i: i["seconds"], reverse=True),
+        "warm_up": list(_warm_up),
+    }
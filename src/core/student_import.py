@@ -0,0 +1,153 @@
+# src/core/student_import.py
+from pydantic import ValidationError
+from sqlalchemy import insert, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.core import college_counters, dashboard_snapshot
+from src.db import ids
+from src.db.models import Branch, Student, User, UserRole
+from src.schemas.student_schema import StudentCreateSchema
+
+CHUNK_SIZE = 500
+
+
+def format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+    )
+
+
+def check_chunk(db: Session, sdb: Session, branch: Branch, rows: list, seen: dict) -> tuple:
+    """Validate one chunk of (line_no, row) pairs against the upload and the database.
+
+    `seen` carries the emails and roll numbers accepted by earlier chunks
+    of the same upload. Returns (accepted, errors), `accepted` being
+    (line_no, StudentCreateSchema) pairs ready for insert_chunk once their
+    passwords are hashed.
+    """
+    errors = []
+    valid = []
+
+    for line_no, row in rows:
+        if isinstance(row, Exception):
+            errors.append({"line": line_no, "error": str(row)})
+            continue
+
+        row.setdefault("college_id", branch.college_id)
+        row.setdefault("branch_id", branch.id)
+        try:
+            student = StudentCreateSchema(**row)
+        except ValidationError as e:
+            errors.append({"line": line_no, "error": format_validation_error(e)})
+            continue
+
+        if student.branch_id != branch.id or student.college_id != branch.college_id:
+            errors.append({"line": line_no, "error": "Row belongs to a different branch or college"})
+            continue
+        if student.email in seen["emails"]:
+            errors.append({"line": line_no, "error": "Duplicate email in upload"})
+            continue
+        if student.roll_number in seen["rolls"]:
+            errors.append({"line": line_no, "error": "Duplicate roll number in upload"})
+            continue
+
+        seen["emails"].add(student.email)
+        seen["rolls"].add(student.roll_number)
+        valid.append((line_no, student))
+
+    if not valid:
+        return [], errors
+
+    # One round trip for both duplicate checks against existing data, or
+    # one per database when student rows are on a shard
+    emails = [s.email for _, s in valid]
+    rolls = [s.roll_number for _, s in valid]
+    email_query = select(literal("email"), User.email).where(User.email.in_(emails))
+    roll_query = select(literal("roll"), Student.roll_number).where(
+        Student.college_id == branch.college_id,
+        Student.roll_number.in_(rolls),
+    )
+    if sdb is db:
+        existing = db.execute(union_all(email_query, roll_query)).all()
+    else:
+        existing = db.execute(email_query).all() + sdb.execute(roll_query).all()
+    taken_emails = {value for kind, value in existing if kind == "email"}
+    taken_rolls = {value for kind, value in existing if kind == "roll"}
+
+    accepted = []
+    for line_no, student in valid:
+        if student.email in taken_emails:
+            errors.append({"line": line_no, "error": "Email already registered"})
+        elif student.roll_number in taken_rolls:
+            errors.append({
+                "line": line_no,
+                "error": f"Roll number '{student.roll_number}' already exists in this college",
+            })
+        else:
+            accepted.append((line_no, student))
+
+    return accepted, errors
+
+
+def insert_chunk(db: Session, sdb: Session, branch: Branch, accepted: list, hashes: list) -> tuple:
+    """Insert the rows check_chunk accepted, `hashes` being their password hashes.
+
+    Users go to `db`, student rows to the college's shard session `sdb`
+    (the same session unless the college is sharded). Returns
+    (imported_count, errors).
+    """
+    if not accepted:
+        return 0, []
+
+    errors = []
+
+    try:
+        # Part of the primary's transaction: rolled back with the users
+        student_ids = ids.allocate(db, ids.STUDENT, len(accepted))
+        db.execute(insert(User), [
+            {
+                "email": s.email,
+                "password_hash": password_hash,
+                "phone": s.phone,
+                "role": UserRole.STUDENT,
+            }
+            for (_, s), password_hash in zip(accepted, hashes)
+        ])
+        # MySQL has no RETURNING for executemany, so read the new ids back
+        user_ids = dict(
+            db.query(User.email, User.id)
+            .filter(User.email.in_([s.email for _, s in accepted]))
+            .all()
+        )
+        sdb.execute(insert(Student), [
+            {
+                "id": student_id,
+                "user_id": user_ids[s.email],
+                "college_id": s.college_id,
+                "branch_id": s.branch_id,
+                "roll_number": s.roll_number,
+                "first_name": s.first_name,
+                "last_name": s.last_name,
+                "date_of_birth": s.date_of_birth,
+                "gender": s.gender,
+                "current_year": s.current_year,
+            }
+            for (_, s), student_id in zip(accepted, student_ids)
+        ])
+        college_counters.increment(db, branch.college_id, students=len(accepted))
+        dashboard_snapshot.bump_generation(db, branch.college_id)
+        # Shard first: if it fails the users and counters roll back with it
+        sdb.commit()
+        db.commit()
+    except IntegrityError:
+        # A concurrent insert won a race on one of the unique keys
+        sdb.rollback()
+        db.rollback()
+        errors.extend(
+            {"line": line_no, "error": "Failed to create student"} for line_no, _ in accepted
+        )
+        return 0, errors
+
+    dashboard_snapshot.invalidate(branch.college_id)
+    return len(accepted), errors
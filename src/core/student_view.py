@@ -0,0 +1,45 @@
+# src/core/student_view.py
+from src.core.cache import TTLCache
+from src.core.config import settings
+
+# Cached dashboards are tagged with Student.dashboard_generation, which the
+# marks recompute bumps in the same transaction as the marks, percentages
+# and CGPA it writes. A worker that missed the in-process delete still sees
+# the mismatch on its next read. The generation also makes the ETag, so a
+# conditional request is answered from one indexed lookup.
+# Entries and ETags are keyed on (college_id, student_id): students created
+# before ids came from the global sequence may share an id across shards,
+# but a college lives on exactly one shard.
+backend = TTLCache(
+    maxsize=settings.STUDENT_DASHBOARD_CACHE_MAX_ENTRIES,
+    ttl=settings.STUDENT_DASHBOARD_CACHE_TTL_SECONDS,
+    name="student_view",
+)
+
+
+def set_backend(new_backend) -> None:
+    global backend
+    backend = new_backend
+
+
+def etag(college_id: int, student_id: int, generation: int) -> str:
+    return f'"c{college_id}-s{student_id}-g{generation}"'
+
+
+def get(college_id: int, student_id: int, generation: int):
+    return backend.get_current(
+        (college_id, student_id), lambda dashboard: dashboard["generation"] == generation
+    )
+
+
+def put(college_id: int, student_id: int, dashboard: dict) -> None:
+    backend.set((college_id, student_id), dashboard)
+
+
+def invalidate(college_id: int, *student_ids: int) -> None:
+    for student_id in student_ids:
+        backend.delete((college_id, student_id))
+
+
+def stats() -> dict:
+    return backend.stats()
@@ -0,0 +1,79 @@
+# src/core/uploads.py
+import codecs
+import csv
+import json
+
+
+async def iter_lines(request):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def parse_csv_header(line: str) -> list:
+    return [name.strip() for name in next(csv.reader([line]))]
+
+
+def parse_csv_line(header: list, line: str) -> dict:
+    values = next(csv.reader([line]))
+    if len(values) != len(header):
+        raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+    # Empty CSV cells mean "not given" for the optional fields
+    return {k: v for k, v in zip(header, values) if v != ""}
+
+
+def parse_ndjson_line(line: str) -> dict:
+    row = json.loads(line)
+    if not isinstance(row, dict):
+        raise ValueError("Each NDJSON line must be an object")
+    return row
+
+
+def upload_format(request, format=None) -> str:
+    if format is not None:
+        return format
+    content_type = request.headers.get("content-type", "")
+    return "ndjson" if "json" in content_type else "csv"
+
+
+async def iter_chunks(request, format: str, chunk_size: int):
+    """Yield lists of (line_no, row) from a streamed CSV/NDJSON body.
+
+    Rows that fail to parse are passed through as the exception so the
+    caller can report them against their line number.
+    """
+    header = None
+    chunk = []
+    line_no = 0
+
+    async for line in iter_lines(request):
+        line_no += 1
+        if not line.strip():
+            continue
+
+        if format == "csv" and header is None:
+            header = parse_csv_header(line)
+            continue
+
+        try:
+            if format == "csv":
+                row = parse_csv_line(header, line)
+            else:
+                row = parse_ndjson_line(line)
+        except ValueError as e:
+            row = e
+        chunk.append((line_no, row))
+
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
@@ -1,17 +1,107 @@
 # src/db/database.py
+import functools
+import inspect
+
+from fastapi import Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from src.core.config import settings
+from src.db import pool_stats, query_counter, replicas
 
-DATABASE_URL = (
+DATABASE_URL = settings.DB_URL or (
     f"mysql+pymysql://{settings.DB_USERNAME}:{settings.DB_PASSWORD}"
     f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
 )
 
-engine = create_engine(DATABASE_URL, echo=False, future=True)
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+def engine_options(url: str) -> dict:
+    options = dict(POOL_OPTIONS)
+    if make_url(url).get_backend_name() == "sqlite":
+        # Pooled connections move between threadpool threads
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+ASYNC_DATABASE_URL = async_url(DATABASE_URL)
+
+POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+engine = create_engine(
+    DATABASE_URL, echo=False, future=True, poolclass=pool_stats.TimedQueuePool,
+    **engine_options(DATABASE_URL)
+)
+pool_stats.register("primary", engine)
+query_counter.install(engine)
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, echo=False, poolclass=pool_stats.TimedAsyncQueuePool,
+        **engine_options(ASYNC_DATABASE_URL)
+    )
+    pool_stats.register("async", async_engine)
+    query_counter.install(async_engine)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def _add_replica(name: str, url: str) -> None:
+    replica_engine = create_engine(
+        url, echo=False, future=True, poolclass=pool_stats.TimedQueuePool, **engine_options(url)
+    )
+    pool_stats.register(name, replica_engine)
+    query_counter.install(replica_engine)
+
+    replica_async_sessions = None
+    if settings.DB_ASYNC:
+        replica_async_engine = create_async_engine(
+            async_url(url), echo=False, poolclass=pool_stats.TimedAsyncQueuePool,
+            **engine_options(url)
+        )
+        pool_stats.register(f"{name}_async", replica_async_engine)
+        query_counter.install(replica_async_engine)
+        replica_async_sessions = async_sessionmaker(
+            bind=replica_async_engine, autoflush=False, expire_on_commit=False
+        )
+
+    replicas.add(replicas.Replica(
+        name,
+        replica_engine,
+        sessionmaker(bind=replica_engine, autocommit=False, autoflush=False),
+        replica_async_sessions,
+    ))
+
+
+for index, replica_url in enumerate(u.strip() for u in settings.DB_REPLICA_URLS.split(",") if u.strip()):
+    _add_replica(f"replica{index}", replica_url)
+
 
 def get_db():
     db = SessionLocal()
@@ -19,3 +109,73 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db(request: Request):
+    """Session for read-only routes: a healthy replica, else the primary.
+
+    Clients that wrote within READ_YOUR_WRITES_SECONDS stay on the primary.
+    """
+    replica = None if replicas.recently_wrote(request) else replicas.pick()
+    db = replica.session_factory() if replica else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    replica = None if replicas.recently_wrote(request) else replicas.pick()
+    session_factory = replica.async_session_factory if replica else AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
+
+
+# For handlers that must be coroutines anyway (e.g. to await other work):
+# depend on get_session and push ORM code through run_db.
+get_session = get_async_db if settings.DB_ASYNC else get_db
+
+
+async def run_db(db, fn, *args):
+    """Run sync ORM code `fn(session, *args)` without blocking the event loop."""
+    if settings.DB_ASYNC:
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
+
+
+def async_capable(endpoint):
+    """Serve a `db: Session = Depends(get_db)` route from the async engine when DB_ASYNC is on.
+
+    Routes on get_read_db keep reading from replicas, through their async engines.
+
+    The handler body is unchanged: it runs through AsyncSession.run_sync, so
+    its queries go over the async driver on the event loop instead of
+    occupying a threadpool slot. With DB_ASYNC off the endpoint is returned
+    as is.
+    """
+    if not settings.DB_ASYNC:
+        return endpoint
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    async_dependencies = {get_db: get_async_db, get_read_db: get_async_read_db}
+    signature = inspect.signature(endpoint)
+    parameters = [
+        p.replace(
+            annotation=AsyncSession,
+            default=Depends(async_dependencies.get(p.default.dependency, get_async_db)),
+        ) if p.name == "db" else p
+        for p in signature.parameters.values()
+    ]
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, db, **kwargs):
+        return await db.run_sync(lambda session: endpoint(*args, db=session, **kwargs))
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    return wrapper
@@ -0,0 +1,40 @@
+# src/db/ids.py
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from src.db.models import IdSequence
+
+# Student rows are spread over the primary and the shards and a college can
+# move between them, so their ids come from one sequence on the primary
+# instead of each database's own AUTO_INCREMENT. Ids stay globally unique on
+# every backend and a move copies them unchanged.
+STUDENT = "student"
+
+
+def allocate(db: Session, name: str, count: int = 1) -> list:
+    """Reserve `count` consecutive ids in `db`'s transaction on the primary.
+
+    Taken through the caller's session, so under DB_ASYNC it goes over the
+    request's async connection rather than blocking the event loop on a
+    second one, and on SQLite it never waits on the request's own write
+    lock. The sequence row stays locked until the caller commits; ids of a
+    transaction that rolls back are handed out again.
+    """
+    # The UPDATE takes the row lock, so the read below sees only our bump
+    db.execute(
+        update(IdSequence).where(IdSequence.name == name)
+        .values(next_id=IdSequence.next_id + count)
+    )
+    next_id = db.scalar(select(IdSequence.next_id).where(IdSequence.name == name))
+    if next_id is None:
+        raise RuntimeError(f"No id sequence '{name}'; run python -m src.db.migrations upgrade")
+    return list(range(next_id - count, next_id))
+
+
+def advance(conn, name: str, past: int) -> None:
+    """Move the sequence beyond `past`, for tools that insert explicit ids."""
+    conn.execute(
+        update(IdSequence)
+        .where(IdSequence.name == name, IdSequence.next_id <= past)
+        .values(next_id=past + 1)
+    )
@@ -0,0 +1,200 @@
+# src/db/migrations.py
+"""Versioned schema migrations.
+
+    python -m src.db.migrations upgrade     # the primary, then every shard
+    python -m src.db.migrations status
+
+Workers no longer create tables at import: run `upgrade` as a deploy step
+before starting them. Applied steps are recorded in schema_version; the app
+checks that version lazily, once per process (see check()).
+
+Step 1 creates whatever tables are missing from the current models, so a
+fresh database is complete after it and the later steps find nothing to do.
+The later steps bring databases created by older builds up to date. When
+models.py changes, add a step that makes the same change idempotently.
+"""
+import argparse
+import threading
+from datetime import datetime
+
+from sqlalchemy import func, inspect, select, text, update
+from sqlalchemy.schema import CreateColumn
+
+from src.db import ids
+from src.db.models import Base, Branch, College, IdSequence, SchemaVersion, Student
+
+
+class SchemaOutOfDate(Exception):
+    pass
+
+
+def _add_columns(conn, metadata, table_name: str, names: list) -> list:
+    inspector = inspect(conn)
+    if not inspector.has_table(table_name):
+        return []
+    existing = {c["name"] for c in inspector.get_columns(table_name)}
+    table = metadata.tables[table_name]
+    quote = conn.dialect.identifier_preparer.quote
+
+    added = []
+    for name in names:
+        if name in existing:
+            continue
+        column_ddl = CreateColumn(table.c[name]).compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {quote(table_name)} ADD COLUMN {column_ddl}"))
+        added.append(name)
+    return added
+
+
+def _add_indexes(conn, metadata, table_name: str, names: list) -> None:
+    inspector = inspect(conn)
+    if not inspector.has_table(table_name):
+        return
+    existing = {i["name"] for i in inspector.get_indexes(table_name)}
+    for index in metadata.tables[table_name].indexes:
+        if index.name in names and index.name not in existing:
+            index.create(conn)
+
+
+# ---- steps: (conn, metadata, primary) ----
+
+def _baseline(conn, metadata, primary: bool) -> None:
+    metadata.create_all(conn)
+
+
+def _college_counters(conn, metadata, primary: bool) -> None:
+    added = _add_columns(
+        conn, metadata, "college", ["dashboard_generation", "total_students", "total_branches"]
+    )
+    if primary and "total_students" in added:
+        # Databases this old predate sharding, so the primary holds every
+        # student; backfill the counters from the source tables
+        conn.execute(update(College).values(
+            total_students=select(func.count(Student.id))
+            .where(Student.college_id == College.id).scalar_subquery(),
+            total_branches=select(func.count(Branch.id))
+            .where(Branch.college_id == College.id).scalar_subquery(),
+        ))
+
+
+def _student_ranks(conn, metadata, primary: bool) -> None:
+    # Students added before this step have no rank; reads count it from the index
+    _add_columns(conn, metadata, "student", ["cgpa_rank", "dashboard_generation"])
+    _add_indexes(
+        conn, metadata, "student",
+        ["idx_student_college_cgpa", "idx_student_college_year_cgpa", "idx_student_branch_cgpa"],
+    )
+
+
+def _student_id_sequence(conn, metadata, primary: bool) -> None:
+    # Shards take their student ids from the primary's sequence
+    if not primary:
+        return
+    IdSequence.__table__.create(conn, checkfirst=True)
+    if conn.scalar(select(IdSequence.next_id).where(IdSequence.name == ids.STUDENT)) is not None:
+        return
+
+    from src.db import shards
+
+    # Start past every id already handed out by any database's AUTO_INCREMENT
+    highest = conn.scalar(select(func.max(Student.id))) or 0
+    for shard in shards.all_shards().values():
+        with shard.engine.connect() as shard_conn:
+            if inspect(shard_conn).has_table(Student.__tablename__):
+                highest = max(highest, shard_conn.scalar(select(func.max(Student.id))) or 0)
+    conn.execute(IdSequence.__table__.insert().values(name=ids.STUDENT, next_id=highest + 1))
+
+
+def _user_token_revocation(conn, metadata, primary: bool) -> None:
+    if primary:
+        _add_columns(conn, metadata, "revoked_token", ["not_before"])
+
+
+MIGRATIONS = [
+    (1, "baseline tables", _baseline),
+    (2, "college counters and dashboard generation", _college_counters),
+    (3, "student ranks and dashboard generation", _student_ranks),
+    (4, "global student id sequence", _student_id_sequence),
+    (5, "per-user token revocation", _user_token_revocation),
+]
+HEAD = MIGRATIONS[-1][0]
+
+
+def current_version(conn) -> int:
+    if not inspect(conn).has_table(SchemaVersion.__tablename__):
+        return 0
+    return conn.scalar(select(func.max(SchemaVersion.version))) or 0
+
+
+def upgrade(engine, metadata=Base.metadata, primary: bool = True) -> list:
+    """Apply every pending step, each in its own transaction. Returns the applied versions."""
+    with engine.connect() as conn:
+        version = current_version(conn)
+
+    version_table = metadata.tables[SchemaVersion.__tablename__]
+    applied = []
+    for number, name, step in MIGRATIONS:
+        if number <= version:
+            continue
+        with engine.begin() as conn:
+            step(conn, metadata, primary)
+            conn.execute(version_table.insert().values(
+                version=number, name=name, applied_at=datetime.utcnow()
+            ))
+        applied.append(number)
+    return applied
+
+
+# ---- runtime check ----
+
+_verified = False
+_verify_lock = threading.Lock()
+
+
+def verified() -> bool:
+    return _verified
+
+
+def check(engine) -> None:
+    """Raise SchemaOutOfDate when the database is behind this build.
+
+    Runs on first use rather than at import, and is remembered once it
+    passes, so a worker boots without the database and later requests cost
+    nothing. Connection errors propagate and the check is retried.
+    """
+    global _verified
+    if _verified:
+        return
+    with _verify_lock:
+        if _verified:
+            return
+        with engine.connect() as conn:
+            version = current_version(conn)
+        if version < HEAD:
+            raise SchemaOutOfDate(
+                f"Database schema is at version {version}, this build needs {HEAD}; "
+                "run python -m src.db.migrations upgrade"
+            )
+        _verified = True
+
+
+if __name__ == "__main__":
+    from src.db import shards
+    from src.db.database import engine
+
+    parser = argparse.ArgumentParser(description="Schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("upgrade")
+    commands.add_parser("status")
+    args = parser.parse_args()
+
+    targets = [(shards.DEFAULT_SHARD, engine, Base.metadata, True)] + [
+        (name, shard.engine, shards.shard_metadata, False) for name, shard in shards.all_shards().items()
+    ]
+    for name, target_engine, metadata, primary in targets:
+        if args.command == "upgrade":
+            applied = upgrade(target_engine, metadata, primary)
+            print(f"{name}: applied {applied or 'nothing'}, now at version {HEAD}")
+        else:
+            with target_engine.connect() as conn:
+                print(f"{name}: version {current_version(conn)} of {HEAD}")
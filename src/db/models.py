@@ -61,6 +61,9 @@ class College(Base):
     email = Column(String(255))
     website = Column(String(255))
     is_active = Column(Boolean, default=True)
+    dashboard_generation = Column(Integer, nullable=False, default=0, server_default="0")
+    total_students = Column(Integer, nullable=False, default=0, server_default="0")
+    total_branches = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -94,6 +97,7 @@ class Branch(Base):
     college = relationship("College", back_populates="branches")
     courses = relationship("Course", back_populates="branch", cascade="all, delete-orphan")
     students = relationship("Student", back_populates="branch")
+    materials = relationship("Material", back_populates="branch", cascade="all, delete-orphan")
 
 
 class Course(Base):
@@ -115,6 +119,7 @@ class Course(Base):
     branch = relationship("Branch", back_populates="courses")
     subjects = relationship("Subject", back_populates="course", cascade="all, delete-orphan")
     student_courses = relationship("StudentCourse", back_populates="course", cascade="all, delete-orphan")
+    materials = relationship("Material", back_populates="course", cascade="all, delete-orphan")
 
 
 class Subject(Base):
@@ -143,6 +148,11 @@ class Student(Base):
         UniqueConstraint("college_id", "roll_number", name="uq_college_student_roll"),
         Index("idx_student_college_id", "college_id"),
         Index("idx_student_branch_id", "branch_id"),
+        # Leaderboards read these backwards (cgpa DESC, id DESC), so a top-N
+        # per college, college year or branch touches only N index entries
+        Index("idx_student_college_cgpa", "college_id", "cgpa"),
+        Index("idx_student_college_year_cgpa", "college_id", "current_year", "cgpa"),
+        Index("idx_student_branch_cgpa", "branch_id", "cgpa"),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -156,6 +166,11 @@ class Student(Base):
     gender = Column(String(20))
     current_year = Column(Integer, default=1)
     cgpa = Column(Float, default=0.0)
+    # Competition rank by CGPA within the college, rewritten whenever CGPA is
+    # recomputed; NULL for students added since
+    cgpa_rank = Column(Integer)
+    # Bumped with every marks/enrollment change; tags the cached dashboard
+    dashboard_generation = Column(Integer, nullable=False, default=0, server_default="0")
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -203,3 +218,64 @@ class StudentMarks(Base):
 
     student = relationship("Student", back_populates="student_marks")
     subject = relationship("Subject", back_populates="marks")
+
+
+class Material(Base):
+    __tablename__ = "material"
+    __table_args__ = (
+        Index("idx_material_branch_id", "branch_id"),
+        Index("idx_material_course_id", "course_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    branch_id = Column(Integer, ForeignKey("branch.id", ondelete="CASCADE"), nullable=False)
+    course_id = Column(Integer, ForeignKey("course.id", ondelete="CASCADE"))
+    title = Column(String(255), nullable=False)
+    file_path = Column(String(500), nullable=False)
+    content_type = Column(String(100), default="application/pdf")
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    branch = relationship("Branch", back_populates="materials")
+    course = relationship("Course", back_populates="materials")
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_token"
+    __table_args__ = (
+        Index("idx_revoked_token_expires_at", "expires_at"),
+    )
+
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime, nullable=False)
+    # Set on "user:<id>" rows: every token of that user issued at or before
+    # this time is revoked (see auth.revoke_user_tokens)
+    not_before = Column(DateTime)
+
+
+class CollegeShard(Base):
+    # Colleges without a row here live on the primary ("default" shard)
+    __tablename__ = "college_shard"
+
+    college_id = Column(Integer, ForeignKey("college.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(String(64), nullable=False)
+    moving = Column(Boolean, nullable=False, default=False, server_default="0")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class SchemaVersion(Base):
+    # One row per applied migration; see src/db/migrations.py
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(255), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+
+class IdSequence(Base):
+    # Ids for rows spread over the primary and the shards; see src/db/ids.py
+    __tablename__ = "id_sequence"
+
+    name = Column(String(64), primary_key=True)
+    next_id = Column(Integer, nullable=False)
@@ -0,0 +1,9 @@
+# src/db/pagination.py
+
+
+def keyset_page(rows, limit: int):
+    # Callers fetch limit + 1 rows; the extra one only tells us another page exists
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = rows[-1].id if has_more else None
+    return rows, next_cursor
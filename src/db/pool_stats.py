@@ -0,0 +1,102 @@
+# src/db/pool_stats.py
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from src.core import prometheus_metrics
+from src.core.metrics import Histogram
+
+_engines = {}
+_checkouts = {}
+_hold_histograms = {}
+
+
+class _TimedGetMixin:
+    # _do_get is where a QueuePool blocks when every connection is checked
+    # out, so timing it gives the per-checkout queueing delay.
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = Histogram()
+        self.timeouts = 0
+
+    def _do_get(self):
+        # Set by register(); pools created outside it are only timed locally
+        name = getattr(self, "metrics_name", None)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            if name:
+                prometheus_metrics.db_pool_timeouts.labels(name).inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.wait_histogram.observe(elapsed)
+            if name:
+                prometheus_metrics.db_pool_wait.labels(name).observe(elapsed)
+
+
+class TimedQueuePool(_TimedGetMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedGetMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def register(name: str, engine) -> None:
+    sync_engine = getattr(engine, "sync_engine", engine)
+    _engines[name] = sync_engine
+    _checkouts[name] = 0
+    _hold_histograms[name] = Histogram()
+
+    sync_engine.pool.metrics_name = name
+    if isinstance(sync_engine.pool, QueuePool):
+        prometheus_metrics.db_pool_size.labels(name).set(sync_engine.pool.size())
+    checked_out_gauge = prometheus_metrics.db_pool_checked_out.labels(name)
+    checkouts_counter = prometheus_metrics.db_pool_checkouts.labels(name)
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _checkouts[name] += 1
+        checkouts_counter.inc()
+        checked_out_gauge.inc()
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            checked_out_gauge.dec()
+            _hold_histograms[name].observe(time.perf_counter() - checked_out_at)
+
+
+def engines() -> dict:
+    return dict(_engines)
+
+
+def pool_stats() -> dict:
+    stats = {}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        stats[name] = {
+            "pool_class": type(pool).__name__,
+            "total_checkouts": _checkouts[name],
+            "hold_seconds": _hold_histograms[name].snapshot(),
+        }
+        if not isinstance(pool, QueuePool):
+            continue
+
+        stats[name].update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "timeouts": getattr(pool, "timeouts", 0),
+        })
+        if hasattr(pool, "wait_histogram"):
+            stats[name]["wait_seconds"] = pool.wait_histogram.snapshot()
+    return stats
@@ -0,0 +1,71 @@
+# src/db/query_counter.py
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from src.db import slow_query
+
+_current = ContextVar("query_counter", default=None)
+
+
+class QueryCounter:
+    def __init__(self, parent=None, label=None):
+        self.count = 0
+        self.duration = 0.0
+        self.rows = 0
+        self.parent = parent
+        self.label = label or (parent.label if parent else None)
+
+
+@contextmanager
+def count_queries(label=None):
+    """Count statements executed in this context, e.g. `with count_queries() as q: ...; assert q.count == 3`.
+
+    Besides the statement count the counter collects total DB time in
+    seconds and the rows reported back by the driver for SELECTs. The
+    counter object is shared with threadpool and greenlet hops made from
+    inside the block, since those copy the current context. Nested blocks
+    also count towards the enclosing ones.
+    """
+    counter = QueryCounter(_current.get(), label)
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context rather than the pooled connection, so a
+    # statement that raises leaves nothing behind for the next one to pop
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context._query_started_at
+
+    # Only buffered SELECT results have a meaningful rowcount; SQLite
+    # reports -1 for those and is simply not counted
+    rows = 0
+    if cursor.description is not None and cursor.rowcount > 0:
+        rows = cursor.rowcount
+
+    counter = _current.get()
+    label = counter.label if counter else None
+    while counter is not None:
+        counter.count += 1
+        counter.duration += duration
+        counter.rows += rows
+        counter = counter.parent
+
+    options = context.execution_options
+    streaming = bool(options.get("stream_results") or options.get("yield_per"))
+    slow_query.record(conn, statement, parameters, duration, executemany, label, streaming)
+
+
+def install(engine) -> None:
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
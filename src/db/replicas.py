@@ -0,0 +1,152 @@
+# src/db/replicas.py
+import itertools
+import threading
+import time
+from datetime import datetime
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+
+# Read replicas registered by src/db/database.py. Requests never wait on a
+# health check: a background thread pings every replica and pick() only
+# hands out the ones that answered last time.
+
+
+class Replica:
+    def __init__(self, name, engine, session_factory, async_session_factory=None):
+        self.name = name
+        self.engine = engine
+        self.session_factory = session_factory
+        self.async_session_factory = async_session_factory
+        self.healthy = True
+        self.last_error = None
+        self.checked_at = None
+        self.reads = 0
+
+
+_replicas = []
+_round_robin = itertools.count()
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def add(replica: Replica) -> None:
+    _replicas.append(replica)
+
+
+def enabled() -> bool:
+    return bool(_replicas)
+
+
+def check(replica: Replica) -> bool:
+    try:
+        with replica.engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+        replica.healthy = True
+        replica.last_error = None
+    except Exception as e:
+        replica.healthy = False
+        replica.last_error = str(e)
+    replica.checked_at = datetime.utcnow()
+    return replica.healthy
+
+
+def _monitor_loop() -> None:
+    while True:
+        for replica in _replicas:
+            check(replica)
+        time.sleep(settings.DB_REPLICA_HEALTH_INTERVAL)
+
+
+def _ensure_monitor() -> None:
+    global _monitor
+    if _monitor is not None:
+        return
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = threading.Thread(target=_monitor_loop, name="replica-health", daemon=True)
+            _monitor.start()
+
+
+def pick():
+    """Next healthy replica in round-robin order, or None to use the primary."""
+    if not _replicas:
+        return None
+    _ensure_monitor()
+
+    healthy = [r for r in _replicas if r.healthy]
+    if not healthy:
+        return None
+    replica = healthy[next(_round_robin) % len(healthy)]
+    replica.reads += 1
+    return replica
+
+
+# ---- read-your-writes ----
+# A successful write stamps the client with a short-lived cookie; reads that
+# carry it go to the primary until it expires, so replication lag cannot
+# hide what the same client just created. Being a cookie it holds across
+# workers without any shared state.
+#
+# API clients on bearer tokens often keep no cookies, so the window is also
+# recorded against the token's subject. That record lives in this worker
+# only: a read served by another worker within the window still goes to a
+# replica unless the client sends the cookie (or _recent_writers is backed
+# by a shared store, see TTLCache).
+
+READ_PRIMARY_COOKIE = "db_read_primary_until"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+_recent_writers = TTLCache(maxsize=100000, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+
+def _subject(request):
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+
+    from fastapi import HTTPException
+
+    from src.core.auth import decode_access_token
+
+    try:
+        return decode_access_token(token.strip())["sub"]
+    except HTTPException:
+        return None
+
+
+def recently_wrote(request) -> bool:
+    if not _replicas:
+        return False
+    try:
+        if float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    subject = _subject(request)
+    return subject is not None and _recent_writers.get(subject) is not None
+
+
+def remember_write(request, response) -> None:
+    if not _replicas or request.method not in WRITE_METHODS or response.status_code >= 400:
+        return
+    window = settings.READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        READ_PRIMARY_COOKIE, str(time.time() + window), max_age=window, httponly=True, samesite="lax"
+    )
+    subject = _subject(request)
+    if subject is not None:
+        _recent_writers.set(subject, True)
+
+
+def stats() -> list:
+    return [
+        {
+            "name": r.name,
+            "healthy": r.healthy,
+            "last_error": r.last_error,
+            "checked_at": r.checked_at,
+            "reads": r.reads,
+        }
+        for r in _replicas
+    ]
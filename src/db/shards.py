@@ -0,0 +1,526 @@
+# src/db/shards.py
+import argparse
+import asyncio
+import contextvars
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import ForeignKeyConstraint, MetaData, create_engine, delete, func, insert, or_, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.db import database, migrations, pool_stats, query_counter
+from src.db.models import (
+    Branch, College, CollegeShard, Course, SchemaVersion, Student, StudentCourse, StudentMarks,
+    Subject,
+)
+from src.db.upsert import upsert
+
+# Student-scale rows live only on their college's shard. The primary stays
+# the source of truth for everything else; the reference rows those tables
+# are joined against (college, branch, course, subject) are mirrored onto
+# the shard, so queries over student data run unchanged on a shard session.
+# Shard schemas carry no foreign keys: users and reference rows are owned
+# by the primary.
+
+DEFAULT_SHARD = "default"
+
+REFERENCE_MODELS = (College, Branch, Course, Subject)
+DISTRIBUTED_MODELS = (Student, StudentCourse, StudentMarks)
+
+# Student ids come from the primary's sequence (src/db/ids.py), so they are
+# unique across shards and a college's students keep their ids when it moves.
+# Enrollment and marks ids are local to each database and renumbered on a move.
+
+shard_metadata = MetaData()
+for _model in REFERENCE_MODELS + DISTRIBUTED_MODELS:
+    _table = _model.__table__.to_metadata(shard_metadata)
+    for _constraint in [c for c in _table.constraints if isinstance(c, ForeignKeyConstraint)]:
+        _table.constraints.discard(_constraint)
+    _table.foreign_keys.clear()
+    for _column in _table.columns:
+        _column.foreign_keys.clear()
+# Shards track their own migrations
+SchemaVersion.__table__.to_metadata(shard_metadata)
+
+
+class Shard:
+    def __init__(self, name, index, engine, session_factory, async_session_factory=None):
+        self.name = name
+        self.index = index
+        self.engine = engine
+        self.session_factory = session_factory
+        self.async_session_factory = async_session_factory
+
+
+_shards = {}
+
+
+def _add_shard(name: str, index: int, url: str) -> None:
+    engine = create_engine(
+        url, echo=False, future=True, poolclass=pool_stats.TimedQueuePool,
+        **database.engine_options(url)
+    )
+    pool_stats.register(f"shard_{name}", engine)
+    query_counter.install(engine)
+
+    async_session_factory = None
+    if settings.DB_ASYNC:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        async_engine = create_async_engine(
+            database.async_url(url), echo=False, poolclass=pool_stats.TimedAsyncQueuePool,
+            **database.engine_options(url)
+        )
+        pool_stats.register(f"shard_{name}_async", async_engine)
+        query_counter.install(async_engine)
+        async_session_factory = async_sessionmaker(
+            bind=async_engine, autoflush=False, expire_on_commit=False
+        )
+
+    _shards[name] = Shard(
+        name, index, engine,
+        sessionmaker(bind=engine, autocommit=False, autoflush=False),
+        async_session_factory,
+    )
+
+
+for _index, _pair in enumerate(p.strip() for p in settings.DB_SHARD_URLS.split(",") if p.strip()):
+    _name, _, _url = _pair.partition("=")
+    _add_shard(_name.strip(), _index + 1, _url.strip())
+
+
+def enabled() -> bool:
+    return bool(_shards)
+
+
+def names() -> list:
+    return [DEFAULT_SHARD] + list(_shards)
+
+
+def all_shards() -> dict:
+    return dict(_shards)
+
+
+# ---- shard map ----
+
+_map = TTLCache(maxsize=10000, ttl=settings.SHARD_MAP_TTL_SECONDS, name="shard_map")
+
+
+def lookup(db: Session, college_id: int) -> tuple:
+    """(shard name, moving) for a college."""
+    if not _shards:
+        return DEFAULT_SHARD, False
+
+    entry = _map.get(college_id)
+    if entry is None:
+        row = db.query(CollegeShard.shard, CollegeShard.moving).filter(
+            CollegeShard.college_id == college_id
+        ).first()
+        entry = (row.shard, row.moving) if row else (DEFAULT_SHARD, False)
+        _map.set(college_id, entry)
+    return entry
+
+
+def _open(db: Session, shard: Shard) -> Session:
+    # Handlers served by async_capable run inside AsyncSession.run_sync; a
+    # shard session on the shard's async engine works there without
+    # blocking the event loop
+    if shard.async_session_factory is not None and db.get_bind().dialect.is_async:
+        return shard.async_session_factory().sync_session
+    return shard.session_factory()
+
+
+@contextmanager
+def session(db: Session, college_id: int, write: bool = False):
+    """Session on the shard holding `college_id`'s student data.
+
+    For colleges on the primary this is `db` itself, so single-shard
+    deployments keep one session and one transaction per request.
+    """
+    name, moving = lookup(db, college_id)
+    if write and moving:
+        raise HTTPException(
+            status_code=503,
+            detail="College data is being moved, try again shortly",
+            headers={"Retry-After": str(settings.SHARD_MAP_TTL_SECONDS)},
+        )
+    if name == DEFAULT_SHARD:
+        yield db
+        return
+
+    shard = _shards.get(name)
+    if shard is None:
+        raise HTTPException(status_code=500, detail=f"Unknown shard '{name}'")
+    sdb = _open(db, shard)
+    try:
+        yield sdb
+    finally:
+        sdb.close()
+
+
+@asynccontextmanager
+async def session_async(db: Session, college_id: int, write: bool = False):
+    """`session` for async handlers on a sync `db`: entered and left in the threadpool."""
+    shard_session = session(db, college_id, write)
+    sdb = await run_in_threadpool(shard_session.__enter__)
+    try:
+        yield sdb
+    except BaseException:
+        if not await run_in_threadpool(shard_session.__exit__, *sys.exc_info()):
+            raise
+    else:
+        await run_in_threadpool(shard_session.__exit__, None, None, None)
+
+
+def open_session(db: Session, college_id: int) -> Session:
+    """A new session on the college's shard, for work that outlives `db`.
+
+    Colleges on the primary get a session on whatever engine `db` uses,
+    so a request served from a replica keeps reading from it; a shard
+    session is picked the same way (see _open).
+    """
+    name, _ = lookup(db, college_id)
+    if name == DEFAULT_SHARD:
+        return Session(bind=db.get_bind(), autoflush=False)
+    return _open(db, _shards[name])
+
+
+def _session_factory(name: str):
+    return database.SessionLocal if name == DEFAULT_SHARD else _shards[name].session_factory
+
+
+# ---- scatter-gather ----
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.SHARD_SCATTER_WORKERS, thread_name_prefix="shard-scatter"
+                )
+    return _executor
+
+
+def _run_on(name: str, fn, args):
+    db = _session_factory(name)()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+async def _run_on_async(name: str, fn, args):
+    factory = database.AsyncSessionLocal if name == DEFAULT_SHARD else _shards[name].async_session_factory
+    async with factory() as db:
+        return await db.run_sync(fn, *args)
+
+
+async def scatter_async(fn, *args) -> dict:
+    """scatter() over the async engines, gathered on the event loop."""
+    shard_names = names()
+    results = await asyncio.gather(*(_run_on_async(name, fn, args) for name in shard_names))
+    return dict(zip(shard_names, results))
+
+
+def scatter(fn, *args) -> dict:
+    """Run `fn(session, *args)` on every shard in parallel, {shard name: result}.
+
+    The primary is included as the default shard. Each call runs in a copy
+    of the caller's context so its queries still count towards the request.
+    Called from code running under AsyncSession.run_sync (async_capable
+    handlers, run_db), it awaits scatter_async instead of blocking the event
+    loop on the thread pool.
+    """
+    if settings.DB_ASYNC and in_greenlet():
+        return await_only(scatter_async(fn, *args))
+    if not _shards:
+        return {DEFAULT_SHARD: _run_on(DEFAULT_SHARD, fn, args)}
+
+    executor = _get_executor()
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, _run_on, name, fn, args)
+        for name in names()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+def _student_scope(db: Session, user_id: int):
+    return db.query(Student.college_id, Student.branch_id).filter(Student.user_id == user_id).first()
+
+
+def find_student(user_id: int):
+    """(college_id, branch_id) of a student user on any non-default shard, or None."""
+    if not _shards:
+        return None
+    for name, row in scatter(_student_scope, user_id).items():
+        if name != DEFAULT_SHARD and row is not None:
+            return row
+    return None
+
+
+# ---- keeping mirrors in sync ----
+
+def _row(obj) -> dict:
+    return {c.key: getattr(obj, c.key) for c in obj.__mapper__.column_attrs}
+
+
+def _copy_reference(sdb: Session, model, rows: list) -> None:
+    columns = [c.key for c in model.__mapper__.column_attrs if c.key != "id"]
+    upsert(sdb, model, rows, conflict_columns=["id"], update_columns=columns)
+
+
+def mirror(db: Session, college_id: int, *objects) -> None:
+    """Copy freshly written reference rows of a college to its shard.
+
+    Call after the primary commit; a no-op for colleges on the primary.
+    """
+    name, _ = lookup(db, college_id)
+    if name == DEFAULT_SHARD or not objects:
+        return
+
+    by_model = {}
+    for obj in objects:
+        by_model.setdefault(type(obj), []).append(_row(obj))
+
+    sdb = _open(db, _shards[name])
+    try:
+        for model in REFERENCE_MODELS:
+            _copy_reference(sdb, model, by_model.get(model, []))
+        sdb.commit()
+    finally:
+        sdb.close()
+
+
+def invalidate(college_id: int) -> None:
+    _map.delete(college_id)
+
+
+# ---- admin tooling ----
+
+def init_shard(name: str) -> None:
+    """Migrate the shard schema."""
+    migrations.upgrade(_shards[name].engine, shard_metadata, primary=False)
+
+
+def _reference_rows(db: Session, college_id: int) -> dict:
+    branch_ids = select(Branch.id).where(Branch.college_id == college_id)
+    course_ids = select(Course.id).where(Course.branch_id.in_(branch_ids))
+    return {
+        College: db.query(College).filter(College.id == college_id).all(),
+        Branch: db.query(Branch).filter(Branch.college_id == college_id).all(),
+        Course: db.query(Course).filter(Course.branch_id.in_(branch_ids)).all(),
+        Subject: db.query(Subject).filter(Subject.course_id.in_(course_ids)).all(),
+    }
+
+
+def sync_reference(db: Session, college_id: int) -> None:
+    """Re-copy every reference row of a college to its shard."""
+    name, _ = lookup(db, college_id)
+    if name == DEFAULT_SHARD:
+        return
+    mirror(db, college_id, *[obj for rows in _reference_rows(db, college_id).values() for obj in rows])
+
+
+def _set_mapping(db: Session, college_id: int, shard: str, moving: bool) -> None:
+    db.query(CollegeShard).filter(CollegeShard.college_id == college_id).delete()
+    if shard != DEFAULT_SHARD or moving:
+        db.add(CollegeShard(college_id=college_id, shard=shard, moving=moving))
+    db.commit()
+    invalidate(college_id)
+
+
+def _colliding_students(source: Session, target: Session, college_id: int, batch_size: int) -> int:
+    """Students of the college whose id or user_id the target already holds."""
+    result = source.execute(
+        select(Student.id, Student.user_id)
+        .where(Student.college_id == college_id)
+        .execution_options(stream_results=True)
+    )
+    collisions = 0
+    for rows in result.partitions(batch_size):
+        collisions += target.scalar(select(func.count(Student.id)).where(or_(
+            Student.id.in_([r.id for r in rows]),
+            Student.user_id.in_([r.user_id for r in rows]),
+        )))
+    return collisions
+
+
+def _without_id(model):
+    return [c for c in model.__table__.c if c.name != "id"]
+
+
+def _copy_distributed(source: Session, target: Session, college_id: int, batch_size: int) -> dict:
+    student_ids = select(Student.id).where(Student.college_id == college_id)
+    queries = {
+        Student: select(Student.__table__).where(Student.college_id == college_id),
+        # Nothing refers to these ids; the target numbers the rows itself
+        StudentCourse: select(*_without_id(StudentCourse))
+        .where(StudentCourse.student_id.in_(student_ids)),
+        StudentMarks: select(*_without_id(StudentMarks))
+        .where(StudentMarks.student_id.in_(student_ids)),
+    }
+    copied = {}
+    for model, query in queries.items():
+        copied[model] = 0
+        result = source.execute(query.execution_options(stream_results=True))
+        for rows in result.partitions(batch_size):
+            target.execute(insert(model.__table__), [dict(r._mapping) for r in rows])
+            copied[model] += len(rows)
+    return copied
+
+
+def move_college(college_id: int, target: str, wait: bool = True, batch_size: int = 1000) -> dict:
+    """Move a college's student data to `target` and repoint the shard map.
+
+    Writes for the college are refused while it is marked as moving; the
+    tool waits one shard-map TTL so every worker has seen the flag before
+    copying. Student ids are globally unique and copied as is; the move
+    aborts before copying anything if the target already holds one of them.
+    """
+    from src.core import dashboard_snapshot
+
+    if target != DEFAULT_SHARD and target not in _shards:
+        raise ValueError(f"Unknown shard '{target}'")
+
+    db = database.SessionLocal()
+    try:
+        if db.query(College.id).filter(College.id == college_id).first() is None:
+            raise ValueError(f"College {college_id} not found")
+        invalidate(college_id)
+        source, _ = lookup(db, college_id)
+        if source == target:
+            return {"college_id": college_id, "shard": target, "moved": False}
+
+        _set_mapping(db, college_id, source, moving=True)
+        if wait:
+            time.sleep(settings.SHARD_MAP_TTL_SECONDS)
+
+        source_db = _session_factory(source)()
+        target_db = _session_factory(target)()
+        try:
+            collisions = _colliding_students(source_db, target_db, college_id, batch_size)
+            if collisions:
+                raise ValueError(
+                    f"{collisions} students of college {college_id} collide with rows on '{target}'"
+                )
+            if target != DEFAULT_SHARD:
+                for model, objects in _reference_rows(db, college_id).items():
+                    _copy_reference(target_db, model, [_row(obj) for obj in objects])
+            copied = _copy_distributed(source_db, target_db, college_id, batch_size)
+            target_db.commit()
+        except Exception:
+            target_db.rollback()
+            _set_mapping(db, college_id, source, moving=False)
+            raise
+        finally:
+            target_db.close()
+
+        _set_mapping(db, college_id, target, moving=False)
+        dashboard_snapshot.bump_generation(db, college_id)
+        db.commit()
+        dashboard_snapshot.invalidate(college_id)
+
+        # The source copy is now unreachable; drop it
+        try:
+            student_ids = select(Student.id).where(Student.college_id == college_id)
+            source_db.execute(delete(StudentMarks).where(StudentMarks.student_id.in_(student_ids)))
+            source_db.execute(delete(StudentCourse).where(StudentCourse.student_id.in_(student_ids)))
+            source_db.execute(delete(Student).where(Student.college_id == college_id))
+            if source != DEFAULT_SHARD:
+                reference = _reference_rows(source_db, college_id)
+                for model in reversed(REFERENCE_MODELS):
+                    ids = [obj.id for obj in reference[model]]
+                    source_db.execute(delete(model).where(model.id.in_(ids)))
+            source_db.commit()
+        finally:
+            source_db.close()
+
+        return {
+            "college_id": college_id,
+            "from": source,
+            "shard": target,
+            "moved": True,
+            "rows": {model.__tablename__: count for model, count in copied.items()},
+            "moved_at": datetime.utcnow().isoformat(),
+        }
+    finally:
+        db.close()
+
+
+def college_student_counts(db: Session) -> list:
+    return db.query(Student.college_id, func.count(Student.id)).group_by(Student.college_id).all()
+
+
+def owned_counts(db: Session) -> dict:
+    """{shard: [(college_id, student_count)]} gathered from every shard in parallel.
+
+    Rows a shard holds for a college mapped elsewhere (a move in progress
+    or an interrupted cleanup) are left out.
+    """
+    mapping = dict(db.query(CollegeShard.college_id, CollegeShard.shard).all())
+    return {
+        name: [(college_id, count) for college_id, count in rows
+               if mapping.get(college_id, DEFAULT_SHARD) == name]
+        for name, rows in scatter(college_student_counts).items()
+    }
+
+
+def shard_stats(db: Session) -> list:
+    return [
+        {
+            "shard": name,
+            "colleges": len(rows),
+            "students": sum(count for _, count in rows),
+        }
+        for name, rows in owned_counts(db).items()
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shard maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list")
+    init = commands.add_parser("init")
+    init.add_argument("shard")
+    sync = commands.add_parser("sync")
+    sync.add_argument("college_id", type=int)
+    move = commands.add_parser("move")
+    move.add_argument("college_id", type=int)
+    move.add_argument("shard")
+    move.add_argument("--no-wait", action="store_true", help="skip waiting for workers to see the move flag")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        session_ = database.SessionLocal()
+        try:
+            for entry in shard_stats(session_):
+                print(f"{entry['shard']}: {entry['colleges']} colleges, {entry['students']} students")
+        finally:
+            session_.close()
+    elif args.command == "init":
+        init_shard(args.shard)
+        print(f"Initialised shard {args.shard}")
+    elif args.command == "sync":
+        session_ = database.SessionLocal()
+        try:
+            sync_reference(session_, args.college_id)
+        finally:
+            session_.close()
+        print(f"Synced reference rows for college {args.college_id}")
+    else:
+        print(move_college(args.college_id, args.shard, wait=not args.no_wait))
@@ -0,0 +1,58 @@
+# src/db/slow_query.py
+import json
+import logging
+
+from src.core.config import settings
+
+logger = logging.getLogger("src.db.slow_query")
+
+EXPLAIN_PREFIX = {
+    "mysql": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+
+def explain(conn, statement: str, parameters) -> list:
+    """Plan rows for a SELECT, run on a raw cursor of the same connection.
+
+    Going through the DBAPI cursor keeps the EXPLAIN itself out of the
+    query counters and out of this log.
+    """
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None:
+        return []
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def record(
+    conn, statement: str, parameters, duration: float, executemany: bool, label=None, streaming: bool = False
+) -> None:
+    if duration * 1000 < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    entry = {
+        "event": "slow_query",
+        "duration_ms": round(duration * 1000, 3),
+        "request": label,
+        "statement": statement,
+        "executemany": executemany,
+    }
+    # A streamed result is still open on this connection: on an unbuffered
+    # cursor pymysql would read and discard the rest of it before the EXPLAIN
+    if streaming:
+        entry["plan_skipped"] = "streamed result"
+    elif settings.SLOW_QUERY_EXPLAIN and not executemany and statement.lstrip()[:6].upper() == "SELECT":
+        try:
+            entry["plan"] = explain(conn, statement, parameters)
+        except Exception as e:
+            entry["plan_error"] = str(e)
+
+    logger.warning(json.dumps(entry, default=str))
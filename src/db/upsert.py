@@ -0,0 +1,40 @@
+# src/db/upsert.py
+from sqlalchemy.orm import Session
+
+
+def _dialect_insert(db: Session, model):
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return dialect, insert(model)
+
+
+def upsert(db: Session, model, rows: list, conflict_columns: list, update_columns: list) -> None:
+    """executemany INSERT that updates `update_columns` when a unique key already exists."""
+    if not rows:
+        return
+    dialect, stmt = _dialect_insert(db, model)
+    if dialect == "mysql":
+        # MySQL picks the conflicting unique key itself
+        stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_columns})
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={c: stmt.excluded[c] for c in update_columns},
+        )
+    db.execute(stmt, rows)
+
+
+def insert_ignore(db: Session, model, rows: list, conflict_columns: list) -> None:
+    if not rows:
+        return
+    dialect, stmt = _dialect_insert(db, model)
+    if dialect == "mysql":
+        stmt = stmt.prefix_with("IGNORE")
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+    db.execute(stmt, rows)
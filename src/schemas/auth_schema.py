@@ -11,5 +11,7 @@ class LoginResponse(BaseModel):
     role: str
     college_id: Optional[int] = None
     branch_id: Optional[int] = None
+    access_token: str
+    token_type: str = "bearer"
  
  
\ No newline at end of file
@@ -1,6 +1,6 @@
 # src/schemas/college_schema.py
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 
 
 class CollegeCreateSchema(BaseModel):
@@ -11,3 +11,42 @@ class CollegeCreateSchema(BaseModel):
     phone: Optional[str] = None
     email: Optional[EmailStr] = None
     website: Optional[str] = None
+
+
+class LeaderboardEntrySchema(BaseModel):
+    rank: int
+    college_rank: Optional[int] = None
+    student_name: str
+    roll_number: str
+    branch_name: str
+    current_year: Optional[int] = None
+    cgpa: Optional[float] = None
+
+
+class BranchStudentCountSchema(BaseModel):
+    branch_name: str
+    student_count: int
+
+
+class YearStudentCountSchema(BaseModel):
+    year: Optional[int] = None
+    student_count: int
+
+
+class CollegeDashboardResponse(BaseModel):
+    college_name: str
+    collage_id: int
+    generation: int
+    total_students: int
+    average_cgpa: float
+    students_per_branch: List[BranchStudentCountSchema]
+    students_per_year: List[YearStudentCountSchema]
+    student_performance_list: List[LeaderboardEntrySchema]
+
+
+class LeaderboardResponse(BaseModel):
+    college_id: int
+    branch_id: Optional[int] = None
+    year: Optional[int] = None
+    total_students: int
+    leaders: List[LeaderboardEntrySchema]
@@ -0,0 +1,16 @@
+# src/schemas/marks_schema.py
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional
+
+
+class MarksRowSchema(BaseModel):
+    student_id: Optional[int] = None
+    roll_number: Optional[str] = None
+    subject_id: int
+    marks_obtained: float = Field(ge=0)
+
+    @model_validator(mode="after")
+    def check_student_reference(self):
+        if self.student_id is None and not self.roll_number:
+            raise ValueError("student_id or roll_number is required")
+        return self
@@ -0,0 +1,19 @@
+# src/schemas/material_schema.py
+from pydantic import BaseModel
+from typing import Optional
+
+
+class MaterialCreateSchema(BaseModel):
+    branch_id: int
+    course_id: Optional[int] = None
+    title: str
+    file_path: str
+    content_type: str = "application/pdf"
+
+
+class MaterialPagesResponse(BaseModel):
+    file_name: str
+    total_pages: int
+    page_from: int
+    page_to: int
+    content: str
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -18,3 +18,31 @@ class StudentCreateSchema(BaseModel):
     date_of_birth: Optional[datetime] = None
     gender: Optional[str] = None
     current_year: int = 1
+
+
+class SubjectMarksSchema(BaseModel):
+    subject: str
+    marks_obtained: Optional[float] = None
+    total_marks: Optional[float] = None
+    percentage: Optional[float] = None
+
+
+class CourseProgressSchema(BaseModel):
+    course_id: int
+    completed: Optional[bool] = None
+    percentage: Optional[float] = None
+
+
+class StudentDashboardResponse(BaseModel):
+    student_name: str
+    roll_number: str
+    branch: str
+    college: str
+    collage_city: Optional[str] = None
+    collage_state: Optional[str] = None
+    generation: int
+    current_year: Optional[int] = None
+    cgpa: Optional[float] = None
+    total_subjects: int
+    subject_marks: List[SubjectMarksSchema]
+    course_progress: List[CourseProgressSchema]
@@ -0,0 +1,60 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# Settings are read when src.core.config is first imported, so the test
+# database and secrets must be in the environment before any src import.
+_db_dir = tempfile.mkdtemp(prefix="crt-be-tests-")
+os.environ.setdefault("DB_URL", f"sqlite:///{os.path.join(_db_dir, 'test.db')}")
+for name, value in {
+    "DB_USERNAME": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "3306",
+    "DB_NAME": "test",
+    "SECRET_KEY": "test-secret-at-least-thirty-two-bytes",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "SMTP_EMAIL": "test@example.com",
+    "SMTP_PASSWORD": "test",
+    "STARTUP_WARM_UP": "false",
+    "SLOW_QUERY_EXPLAIN": "false",
+}.items():
+    os.environ.setdefault(name, value)
+
+import asyncio
+
+import pytest
+
+from src.db import migrations
+from src.db.database import SessionLocal, engine
+from src.db.models import Base
+
+
+@pytest.fixture(scope="session")
+def schema():
+    # The app's own migrations, so seeded rows such as id_sequence exist
+    migrations.upgrade(engine)
+    yield
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def db(schema):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def async_sessions(schema):
+    """Sessions on the async driver, as DB_ASYNC handlers get them via run_sync."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from src.db.database import ASYNC_DATABASE_URL
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+    yield async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(async_engine.dispose())
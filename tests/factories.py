@@ -0,0 +1,84 @@
+# tests/factories.py
+import itertools
+
+from src.core.auth import Principal
+from src.db import ids
+from src.db.models import Branch, BranchType, College, Course, Student, Subject, User, UserRole
+
+_serial = itertools.count(1)
+
+
+def user(db, role: UserRole) -> User:
+    row = User(email=f"user{next(_serial)}@example.com", password_hash="x", role=role)
+    db.add(row)
+    db.flush()
+    return row
+
+
+def student(db, branch: Branch, roll_number: str, **fields) -> Student:
+    row = Student(
+        id=ids.allocate(db, ids.STUDENT)[0],
+        user_id=user(db, UserRole.STUDENT).id,
+        college_id=branch.college_id,
+        branch_id=branch.id,
+        roll_number=roll_number,
+        first_name="Test",
+        last_name="Student",
+        **fields,
+    )
+    db.add(row)
+    db.flush()
+    return row
+
+
+def college(db, branches: int = 1, students_per_year: int = 1) -> tuple:
+    """A committed college with `branches` branches, each with an admin and
+    `students_per_year` students in years 1 and 2. Returns (college, branches).
+    """
+    admin = user(db, UserRole.COLLEGE_ADMIN)
+    code = next(_serial)
+    row = College(college_name=f"College {code}", college_code=f"C{code}", college_admin_id=admin.id)
+    db.add(row)
+    db.flush()
+
+    branch_rows = []
+    for branch_type in list(BranchType)[:branches]:
+        branch = Branch(
+            college_id=row.id,
+            branch_type=branch_type,
+            branch_name=branch_type.value.upper(),
+            branch_admin_id=user(db, UserRole.BRANCH_ADMIN).id,
+        )
+        db.add(branch)
+        db.flush()
+        branch_rows.append(branch)
+        for year in (1, 2):
+            for n in range(students_per_year):
+                student(db, branch, f"{branch_type.value}-{year}-{n}", current_year=year, cgpa=7.5)
+    db.commit()
+    return row, branch_rows
+
+
+def college_admin(row: College) -> Principal:
+    return Principal(user_id=row.college_admin_id, role=UserRole.COLLEGE_ADMIN, college_id=row.id)
+
+
+def branch_admin(branch: Branch) -> Principal:
+    return Principal(
+        user_id=branch.branch_admin_id, role=UserRole.BRANCH_ADMIN,
+        college_id=branch.college_id, branch_id=branch.id,
+    )
+
+
+def subjects(db, branch: Branch, *total_marks: float) -> list:
+    """A committed course in `branch` with one subject per `total_marks` value."""
+    course = Course(branch_id=branch.id, course_name=f"Course {next(_serial)}", year=1)
+    db.add(course)
+    db.flush()
+    rows = [
+        Subject(course_id=course.id, subject_name=f"Subject {next(_serial)}", total_marks=total)
+        for total in total_marks
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
@@ -0,0 +1,42 @@
+# tests/test_async_writes.py
+"""Write handlers run through run_sync under DB_ASYNC: nothing they call may
+block the event loop on a second, sync connection."""
+import asyncio
+
+from src.api.branch_admin_router import _insert_student
+from src.db.models import Student
+from src.schemas.student_schema import StudentCreateSchema
+from tests import factories
+
+CONCURRENCY = 4
+
+
+def test_concurrent_student_creation_on_async_sessions(db, async_sessions):
+    college, (branch,) = factories.college(db, 1, students_per_year=0)
+
+    payloads = [
+        StudentCreateSchema(
+            email=f"async{n}@example.com",
+            password="Secret@123",
+            college_id=college.id,
+            branch_id=branch.id,
+            roll_number=f"async-{n}",
+            first_name="Async",
+            last_name="Student",
+        )
+        for n in range(CONCURRENCY)
+    ]
+
+    async def create(payload):
+        async with async_sessions() as session:
+            return await session.run_sync(_insert_student, payload, "hash")
+
+    async def create_all():
+        return await asyncio.gather(*(create(p) for p in payloads))
+
+    results = asyncio.run(asyncio.wait_for(create_all(), timeout=30))
+
+    student_ids = {r["student_id"] for r in results}
+    assert len(student_ids) == CONCURRENCY
+    db.expire_all()
+    assert db.query(Student).filter(Student.id.in_(student_ids)).count() == CONCURRENCY
@@ -0,0 +1,29 @@
+# tests/test_auth.py
+import calendar
+from datetime import datetime, timedelta
+
+from src.core import auth
+from src.db.models import RevokedToken
+
+
+def test_revoking_twice_updates_the_existing_row(db):
+    expires_at = datetime.utcnow() + timedelta(minutes=5)
+    auth.revoke_token(db, "jti-twice", expires_at)
+    auth.revoke_token(db, "jti-twice", expires_at + timedelta(minutes=5))
+
+    db.expire_all()
+    assert db.get(RevokedToken, "jti-twice").expires_at == expires_at + timedelta(minutes=5)
+    assert auth.is_revoked("jti-twice")
+
+
+def test_revoking_a_user_twice_moves_not_before(db):
+    auth.revoke_user_tokens(db, 4242)
+    first = db.get(RevokedToken, "user:4242").not_before
+    auth.revoke_user_tokens(db, 4242)
+
+    db.expire_all()
+    row = db.get(RevokedToken, "user:4242")
+    assert row.not_before >= first
+    issued_at = calendar.timegm(row.not_before.utctimetuple())
+    assert auth.is_revoked("other-jti", 4242, issued_at)
+    assert not auth.is_revoked("other-jti", 4242, issued_at + 1)
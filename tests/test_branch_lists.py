@@ -0,0 +1,32 @@
+# tests/test_branch_lists.py
+import pytest
+from fastapi import HTTPException
+
+from src.api.branch_admin_router import get_branch_courses, get_branch_students
+from src.core.auth import Principal
+from src.db.models import UserRole
+from tests import factories
+
+LISTS = (get_branch_courses, get_branch_students)
+
+
+@pytest.mark.parametrize("handler", LISTS)
+def test_missing_branch_is_404(db, handler):
+    college, _ = factories.college(db, 1)
+    principal = Principal(user_id=1, role=UserRole.BRANCH_ADMIN, college_id=college.id, branch_id=10**6)
+    with pytest.raises(HTTPException) as e:
+        handler(principal=principal, after=None, db=db)
+    assert e.value.status_code == 404
+
+
+def test_total_only_on_first_page(db):
+    _, (branch,) = factories.college(db, 1, students_per_year=2)
+    principal = factories.branch_admin(branch)
+
+    first = get_branch_students(principal=principal, limit=2, after=None, db=db)
+    assert first["total_students"] == 4
+    assert first["next_cursor"] is not None
+
+    second = get_branch_students(principal=principal, limit=2, after=first["next_cursor"], db=db)
+    assert second["total_students"] is None
+    assert len(second["students"]) == 2
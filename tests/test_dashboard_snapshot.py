@@ -0,0 +1,43 @@
+# tests/test_dashboard_snapshot.py
+import threading
+
+from src.core import dashboard_snapshot
+from src.core.cache import TTLCache
+
+THREADS = 8
+READS = 2000
+
+
+def test_stats_count_every_read_across_threads(monkeypatch):
+    monkeypatch.setattr(dashboard_snapshot, "backend", TTLCache(maxsize=16, ttl=300))
+
+    def reader(college_id):
+        for n in range(READS):
+            generation = n // 2
+            if n % 2 == 0:
+                dashboard_snapshot.put(college_id, {"generation": generation})
+                dashboard_snapshot.get(college_id, generation + 1)  # stale
+            else:
+                dashboard_snapshot.get(college_id, generation)  # dropped by the stale read
+
+    threads = [threading.Thread(target=reader, args=(college_id,)) for college_id in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = dashboard_snapshot.stats()
+    assert stats["hits"] == 0
+    assert stats["misses"] == THREADS * READS
+    assert stats["stale_reads"] == THREADS * READS // 2
+    assert stats["size"] == 0
+
+
+def test_current_snapshot_is_a_hit(monkeypatch):
+    monkeypatch.setattr(dashboard_snapshot, "backend", TTLCache(maxsize=16, ttl=300))
+    dashboard_snapshot.put(1, {"generation": 3})
+
+    assert dashboard_snapshot.get(1, 3) == {"generation": 3}
+    assert dashboard_snapshot.get(1, 4) is None
+    assert dashboard_snapshot.get(1, 3) is None
+    assert dashboard_snapshot.stats() == {"size": 0, "hits": 1, "misses": 2, "stale_reads": 1}
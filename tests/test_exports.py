@@ -0,0 +1,58 @@
+# tests/test_exports.py
+import io
+
+import pytest
+
+from src.core import exports, marks_import
+from src.db.database import SessionLocal
+from tests import factories
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture
+def colleges(db):
+    """(a college with students, marks and courses, an empty college)."""
+    college, (branch,) = factories.college(db, 1, students_per_year=3)
+    subjects = factories.subjects(db, branch, 100, 50)
+    rows = [
+        {"roll_number": f"{branch.branch_type.value}-{year}-{n}", "subject_id": s.id, "marks_obtained": 40}
+        for year in (1, 2) for n in range(3) for s in subjects
+    ]
+    _, errors, affected = marks_import.import_chunk(db, branch.id, list(enumerate(rows, 1)))
+    assert errors == []
+    marks_import.recompute(db, db, college.id, affected)
+
+    empty, _ = factories.college(db, 0)
+    return college, empty
+
+
+def _table(dataset: str, college_id: int):
+    body = b"".join(exports.stream(SessionLocal(), dataset, college_id, "parquet"))
+    return pq.read_table(io.BytesIO(body))
+
+
+@pytest.mark.parametrize("dataset, rows", [("students", 6), ("marks", 12), ("courses", 1)])
+def test_parquet_round_trip(colleges, monkeypatch, dataset, rows):
+    # Several row groups, one per batch
+    monkeypatch.setattr(exports, "BATCH_SIZE", 5)
+    college, empty = colleges
+    columns = [c.name for c in exports.DATASETS[dataset](college.id).selected_columns]
+
+    table = _table(dataset, college.id)
+    assert table.num_rows == rows
+    assert table.column_names == columns
+
+    db = SessionLocal()
+    try:
+        expected = [
+            [exports._plain(v) for v in row]
+            for row in db.execute(exports.DATASETS[dataset](college.id)).all()
+        ]
+    finally:
+        db.close()
+    assert [list(row.values()) for row in table.to_pylist()] == expected
+
+    empty_table = _table(dataset, empty.id)
+    assert empty_table.num_rows == 0
+    assert empty_table.schema == table.schema
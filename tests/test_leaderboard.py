@@ -0,0 +1,49 @@
+# tests/test_leaderboard.py
+import pytest
+
+from src.core import leaderboard
+from src.db.models import Student
+from tests import factories
+
+CGPAS = [9.1, 7.5, 9.1, None, 6.0, 7.5, 8.2]
+
+
+def _ranks(db, college_id) -> dict:
+    db.expire_all()
+    return dict(db.query(Student.id, Student.cgpa_rank).filter(Student.college_id == college_id).all())
+
+
+@pytest.fixture
+def college(db):
+    college, (branch,) = factories.college(db, 1, students_per_year=0)
+    for n, cgpa in enumerate(CGPAS):
+        factories.student(db, branch, f"r{n}", cgpa=cgpa)
+    db.commit()
+    return college
+
+
+def test_sql_ranking_matches_python_fallback(db, college):
+    assert leaderboard._ranks_in_sql(db)
+
+    assert leaderboard._recompute_ranks_in_python(db, college.id) == len(CGPAS)
+    expected = _ranks(db, college.id)
+    db.query(Student).filter(Student.college_id == college.id).update({Student.cgpa_rank: None})
+
+    assert leaderboard.recompute_ranks(db, college.id) == len(CGPAS)
+    assert _ranks(db, college.id) == expected
+    by_cgpa = {cgpa: expected[s.id] for s, cgpa in zip(
+        db.query(Student).filter(Student.college_id == college.id).order_by(Student.id), CGPAS
+    )}
+    assert by_cgpa == {9.1: 1, 8.2: 3, 7.5: 4, 6.0: 6, None: 7}
+
+
+def test_sql_ranking_updates_only_moved_rows(db, college):
+    leaderboard.recompute_ranks(db, college.id)
+    assert leaderboard.recompute_ranks(db, college.id) == 0
+
+    lowest = db.query(Student).filter(Student.college_id == college.id, Student.cgpa == 6.0).one()
+    lowest.cgpa = 9.5
+    db.flush()
+    # Everyone above 6.0 moves down one place, plus the student who moved up
+    assert leaderboard.recompute_ranks(db, college.id) == 6
+    assert _ranks(db, college.id)[lowest.id] == 1
@@ -0,0 +1,122 @@
+# tests/test_marks_import.py
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from src.api.branch_admin_router import bulk_upload_marks
+from src.core import dashboard_snapshot, marks_import, student_view
+from src.db.models import College, Student, StudentCourse, StudentMarks
+from tests import factories
+
+
+@pytest.fixture
+def branch(db):
+    _, (branch,) = factories.college(db, 1, students_per_year=0)
+    return branch
+
+
+def _upload(db, branch, rows):
+    count, errors, affected = marks_import.import_chunk(db, branch.id, list(enumerate(rows, 1)))
+    if affected:
+        marks_import.recompute(db, db, branch.college_id, affected)
+    return count, errors
+
+
+def _generation(db, college_id):
+    db.expire_all()
+    return db.query(College.dashboard_generation).filter(College.id == college_id).scalar()
+
+
+def test_upsert_replaces_marks_for_the_same_student_and_subject(db, branch):
+    student = factories.student(db, branch, "r1")
+    (subject,) = factories.subjects(db, branch, 100)
+
+    _upload(db, branch, [{"student_id": student.id, "subject_id": subject.id, "marks_obtained": 40}])
+    count, errors = _upload(db, branch, [
+        {"roll_number": "r1", "subject_id": subject.id, "marks_obtained": 50},
+        {"student_id": student.id, "subject_id": subject.id, "marks_obtained": 70},
+    ])
+
+    assert (count, errors) == (1, [])
+    marks = db.query(StudentMarks).filter(StudentMarks.student_id == student.id).all()
+    assert [(m.marks_obtained, m.percentage) for m in marks] == [(70, 70.0)]
+    assert db.query(StudentCourse).filter(StudentCourse.student_id == student.id).count() == 1
+
+
+def test_upload_recomputes_cgpa_and_invalidates_caches(db, branch):
+    student = factories.student(db, branch, "r1")
+    first, second = factories.subjects(db, branch, 100, 100)
+    _upload(db, branch, [{"student_id": student.id, "subject_id": first.id, "marks_obtained": 80}])
+    db.expire_all()
+    assert db.get(Student, student.id).cgpa == 8.0
+
+    generation = _generation(db, branch.college_id)
+    dashboard_snapshot.put(branch.college_id, {"generation": generation})
+    student_view.put(branch.college_id, student.id, {"cgpa": 8.0})
+
+    _upload(db, branch, [{"student_id": student.id, "subject_id": second.id, "marks_obtained": 53}])
+
+    db.expire_all()
+    assert db.get(Student, student.id).cgpa == 6.65
+    assert db.get(Student, student.id).cgpa_rank == 1
+    assert _generation(db, branch.college_id) == generation + 1
+    assert dashboard_snapshot.get(branch.college_id, generation) is None
+    assert student_view.get(branch.college_id, student.id, db.get(Student, student.id).dashboard_generation) is None
+
+
+def test_subject_without_positive_total_marks_is_a_row_error(db, branch):
+    student = factories.student(db, branch, "r1")
+    (subject,) = factories.subjects(db, branch, 0)
+
+    count, errors = _upload(db, branch, [{"student_id": student.id, "subject_id": subject.id, "marks_obtained": 0}])
+
+    assert count == 0
+    assert errors == [{"line": 1, "error": "Subject has no positive total_marks"}]
+    assert db.query(StudentMarks).filter(StudentMarks.student_id == student.id).count() == 0
+
+
+def _request(body: bytes) -> Request:
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": []}, receive)
+
+
+def test_recompute_runs_when_a_later_chunk_fails(db, branch, monkeypatch):
+    first, second = factories.student(db, branch, "r1"), factories.student(db, branch, "r2")
+    (subject,) = factories.subjects(db, branch, 100)
+    db.commit()
+
+    import_chunk = marks_import.import_chunk
+    calls = []
+
+    def failing_second_chunk(sdb, branch_id, rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("chunk failed")
+        return import_chunk(sdb, branch_id, rows)
+
+    monkeypatch.setattr(marks_import, "CHUNK_SIZE", 1)
+    monkeypatch.setattr(marks_import, "import_chunk", failing_second_chunk)
+
+    body = (
+        "student_id,subject_id,marks_obtained\n"
+        f"{first.id},{subject.id},90\n"
+        f"{second.id},{subject.id},60\n"
+    ).encode()
+    with pytest.raises(RuntimeError):
+        asyncio.run(bulk_upload_marks(
+            _request(body), principal=factories.branch_admin(branch), format="csv", db=db
+        ))
+
+    db.expire_all()
+    # The first chunk committed, so its student's CGPA is current
+    assert db.get(Student, first.id).cgpa == 9.0
+    assert db.query(StudentMarks).filter(StudentMarks.student_id == second.id).count() == 0
@@ -0,0 +1,29 @@
+# tests/test_query_counts.py
+"""The college admin reads must not issue a query per branch."""
+from src.api.college_admin_router import college_dashboard, get_all_branch_admins
+from src.core.auth import Principal
+from src.db.models import BranchType
+from src.db.query_counter import count_queries
+from tests import factories
+
+
+def _queries(handler, db, principal: Principal) -> int:
+    with count_queries() as q:
+        handler(principal=principal, db=db)
+    return q.count
+
+
+def _assert_flat(db, handler):
+    one, _ = factories.college(db, 1)
+    many, _ = factories.college(db, len(BranchType))
+    assert _queries(handler, db, factories.college_admin(one)) == _queries(
+        handler, db, factories.college_admin(many)
+    )
+
+
+def test_college_dashboard_query_count_does_not_grow_with_branches(db):
+    _assert_flat(db, college_dashboard)
+
+
+def test_branch_admins_query_count_does_not_grow_with_branches(db):
+    _assert_flat(db, get_all_branch_admins)
@@ -0,0 +1,95 @@
+# tests/test_replicas.py
+"""Read routing between the primary and replicas, on separate SQLite files."""
+import pytest
+from sqlalchemy import create_engine
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.core.auth import create_access_token
+from src.db import database, migrations, replicas
+from src.db.models import UserRole
+from tests import factories
+
+
+def _request(method="GET", cookies=None, token=None) -> Request:
+    headers = []
+    if cookies:
+        headers.append((b"cookie", "; ".join(f"{k}={v}" for k, v in cookies.items()).encode()))
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return Request({"type": "http", "method": method, "path": "/", "headers": headers})
+
+
+def _read_db(request: Request) -> str:
+    """Database file get_read_db serves `request` from."""
+    sessions = database.get_read_db(request)
+    db = next(sessions)
+    try:
+        return db.get_bind().url.database
+    finally:
+        sessions.close()
+
+
+@pytest.fixture
+def replica_files(schema, tmp_path, monkeypatch):
+    """Two migrated replica databases registered in place of any configured ones."""
+    monkeypatch.setattr(replicas, "_replicas", [])
+    # Health is set by the tests, not the background monitor
+    monkeypatch.setattr(replicas, "_monitor", object())
+    replicas._recent_writers.clear()
+
+    paths = []
+    for n in range(2):
+        path = str(tmp_path / f"replica{n}.db")
+        url = f"sqlite:///{path}"
+        migrations.upgrade(create_engine(url))
+        database._add_replica(f"test-replica{n}", url)
+        paths.append(path)
+    return paths
+
+
+def test_round_robin_over_healthy_replicas(replica_files):
+    served = [_read_db(_request()) for _ in range(4)]
+    assert served[0] != served[1]
+    assert sorted(served) == sorted(replica_files * 2)
+
+
+def test_unhealthy_replica_falls_back(replica_files):
+    replicas._replicas[0].engine = create_engine("sqlite:////nonexistent-dir/replica.db")
+    assert not replicas.check(replicas._replicas[0])
+    assert {_read_db(_request()) for _ in range(3)} == {replica_files[1]}
+
+    replicas._replicas[1].healthy = False
+    assert _read_db(_request()) == database.engine.url.database
+
+
+def test_reads_inside_the_window_go_to_the_primary(replica_files):
+    primary = database.engine.url.database
+    assert _read_db(_request()) in replica_files
+
+    response = Response(status_code=201)
+    replicas.remember_write(_request("POST"), response)
+    cookie = response.headers["set-cookie"].split(";")[0]
+    name, _, value = cookie.partition("=")
+    assert _read_db(_request(cookies={name: value})) == primary
+
+    # Outside the window the replicas serve reads again
+    expired = {replicas.READ_PRIMARY_COOKIE: "1"}
+    assert _read_db(_request(cookies=expired)) in replica_files
+
+
+def test_bearer_clients_without_cookies_read_their_writes(replica_files, db):
+    user = factories.user(db, UserRole.APP_ADMIN)
+    db.commit()
+    token = create_access_token(user.id, UserRole.APP_ADMIN)
+    other = create_access_token(user.id + 1, UserRole.APP_ADMIN)
+
+    replicas.remember_write(_request("POST", token=token), Response(status_code=200))
+    assert _read_db(_request(token=token)) == database.engine.url.database
+    assert _read_db(_request(token=other)) in replica_files
+
+
+def test_failed_writes_do_not_pin_the_primary(replica_files):
+    response = Response(status_code=400)
+    replicas.remember_write(_request("POST"), response)
+    assert "set-cookie" not in response.headers